@@ -0,0 +1,29 @@
+"""
+A1-Overlay: split raw TX/MI workbooks, merge them into ALL_MERGED.xlsx and
+draw the charts — as a library, a CLI (python -m a1_overlay) or the GUI.
+
+Submodules are imported on first use, so `import a1_overlay` is cheap and
+never pulls in pandas or tkinter by itself.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "split_excel_file": "split",
+    "iter_split_sheets": "split",
+    "split_files_parallel": "parallel",
+    "batch_merge_split_files": "merge",
+    "merge_final_batches": "merge",
+    "split_and_merge": "fused",
+    "incremental_merge": "incremental",
+    "add_charts_to_merged_excel": "charts",
+    "render_previews": "preview",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,219 @@
+"""Columnar (Parquet / Arrow IPC) sidecar cache for _SPLIT.xlsx files."""
+
+import importlib.util
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .compact import compact_frame
+from .reader import read_sheet_frame
+from .zipindex import SheetIndex
+
+# ============================================================
+# Columnar Split Cache (Parquet / Arrow IPC sidecar)
+# ============================================================
+# <name>_SPLIT.xlsx  →  <name>_SPLIT.cache/
+#                         _sheets.json    sheet order + file per sheet
+#                         0000.parquet …  one table per split sheet
+#
+# Split sheets mix text (labels) and numbers in the same column, so every
+# column j is stored as a float64 column "j" plus, only when needed, a text
+# column "j:s" holding the non-numeric cells. Needs pyarrow (optional).
+
+CACHE_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+CACHE_MANIFEST = "_sheets.json"
+
+
+def split_cache_dir(split_path):
+    return os.path.splitext(split_path)[0] + ".cache"
+
+
+def _is_number(v):
+    return isinstance(v, (int, float, np.integer, np.floating)) \
+        and not isinstance(v, (bool, np.bool_))
+
+
+def _trim_like_xlsx(df):
+    """Drop trailing all-empty rows/columns, as an xlsx write + read would."""
+    filled = df.notna().to_numpy()
+    rows = np.flatnonzero(filled.any(axis=1))
+    cols = np.flatnonzero(filled.any(axis=0))
+    if len(rows) == 0:
+        return df.iloc[:0, :0]
+    return df.iloc[:rows[-1] + 1, :cols[-1] + 1]
+
+
+def _frame_to_arrow(df):
+    import pyarrow as pa
+
+    df = _trim_like_xlsx(df)
+    arrays, names = [], []
+    for j in range(df.shape[1]):
+        col = df.iloc[:, j]
+
+        if col.dtype.kind in "fiu":
+            arrays.append(pa.array(col.to_numpy(dtype=np.float64)))
+            names.append(str(j))
+            continue
+
+        vals = col.to_numpy(dtype=object)
+        is_num = np.fromiter((_is_number(v) for v in vals), dtype=bool, count=len(vals))
+        num = np.full(len(vals), np.nan)
+        num[is_num] = vals[is_num].astype(np.float64)
+        txt = [None if m or pd.isna(v) else str(v) for v, m in zip(vals, is_num)]
+
+        arrays.append(pa.array(num))
+        names.append(str(j))
+        if any(t is not None for t in txt):
+            arrays.append(pa.array(txt, type=pa.string()))
+            names.append(f"{j}:s")
+
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def _arrow_to_frame(table):
+    names = set(table.column_names)
+    cols = {}
+    for name in table.column_names:
+        if name.endswith(":s"):
+            continue
+        num = table.column(name).to_numpy()
+        if f"{name}:s" in names:
+            txt = table.column(f"{name}:s").to_numpy(zero_copy_only=False)
+            col = num.astype(object)
+            mask = pd.notna(txt)
+            col[mask] = txt[mask]
+            num = col
+        cols[int(name)] = num
+    return pd.DataFrame(cols)
+
+
+def write_split_cache(sheets, split_path, cache_format="parquet"):
+    """Write (sheet_name, DataFrame) pairs as the columnar cache of split_path."""
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    ext = CACHE_FORMATS[cache_format]
+    cache_dir = split_cache_dir(split_path)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # drop the old manifest first: a half-written cache must never look fresh
+    manifest_path = os.path.join(cache_dir, CACHE_MANIFEST)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    entries = []
+    for i, (name, df) in enumerate(sheets):
+        fname = f"{i:04d}{ext}"
+        table = _frame_to_arrow(df)
+        path = os.path.join(cache_dir, fname)
+        if cache_format == "parquet":
+            pq.write_table(table, path)
+        else:
+            feather.write_feather(table, path, compression="uncompressed")
+        entries.append({"sheet": name, "file": fname})
+
+    keep = {e["file"] for e in entries}
+    for fname in os.listdir(cache_dir):
+        if fname not in keep:
+            os.remove(os.path.join(cache_dir, fname))
+
+    with open(manifest_path, "w", encoding="utf-8") as fp:
+        json.dump({"format": cache_format, "sheets": entries}, fp, ensure_ascii=False)
+
+    return cache_dir
+
+
+def _fresh_cache(split_path):
+    """
+    (format, {sheet_name: table file}) of the columnar cache, or None when
+    there is no cache, it is older than the xlsx, or pyarrow is not installed.
+    """
+    manifest_path = os.path.join(split_cache_dir(split_path), CACHE_MANIFEST)
+    try:
+        if os.path.getmtime(manifest_path) < os.path.getmtime(split_path):
+            return None
+    except OSError:
+        return None
+    if importlib.util.find_spec("pyarrow") is None:
+        return None
+
+    with open(manifest_path, encoding="utf-8") as fp:
+        manifest = json.load(fp)
+
+    cache_dir = os.path.dirname(manifest_path)
+    return manifest["format"], {e["sheet"]: os.path.join(cache_dir, e["file"])
+                                for e in manifest["sheets"]}
+
+
+def _read_table(cache_format, path, dtype=None):
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    if cache_format == "parquet":
+        table = pq.read_table(path)
+    else:
+        table = feather.read_table(path, memory_map=True)
+    df = _arrow_to_frame(table)
+    return compact_frame(df, dtype) if dtype else df
+
+
+def read_split_cache(split_path, dtype=None):
+    """
+    {sheet_name: DataFrame} from the columnar cache, or None when there is no
+    fresh cache (see _fresh_cache).
+    dtype ("float64" / "float32"): CompactSheets instead of DataFrames.
+    """
+    cache = _fresh_cache(split_path)
+    if cache is None:
+        return None
+    cache_format, files = cache
+    return {sheet: _read_table(cache_format, path, dtype) for sheet, path in files.items()}
+
+
+class SplitSheets:
+    """
+    One sheet at a time from a _SPLIT.xlsx: from the columnar cache when it
+    is fresh (one table file per sheet), else through the workbook's sheet
+    index (zipindex.py), which streams only that sheet's XML part.
+    dtype ("float64" / "float32"): read() returns CompactSheets.
+    """
+
+    def __init__(self, split_path, dtype=None):
+        self.path = split_path
+        self.dtype = dtype
+        self._cache = _fresh_cache(split_path)
+        self._index = SheetIndex(split_path) if self._cache is None else None
+
+    @property
+    def sheetnames(self):
+        return list(self._cache[1]) if self._cache else self._index.sheetnames
+
+    def read(self, sheet_name):
+        if self._cache:
+            cache_format, files = self._cache
+            return _read_table(cache_format, files[sheet_name], self.dtype)
+        df = read_sheet_frame(self._index, sheet_name)
+        return compact_frame(df, self.dtype) if self.dtype else df
+
+    def close(self):
+        if self._index:
+            self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_split_sheets(split_path, dtype=None):
+    """
+    All sheets of a _SPLIT.xlsx, from the columnar cache when it is fresh.
+    dtype ("float64" / "float32"): as CompactSheets, each sheet compacted as
+    soon as it is read, so only one object-dtype sheet exists at a time.
+    """
+    with SplitSheets(split_path, dtype) as src:
+        return {sh: src.read(sh) for sh in src.sheetnames}
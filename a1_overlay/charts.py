@@ -0,0 +1,262 @@
+"""Native xlsxwriter charts (the old Draw_MultiCharts_Final layout)."""
+
+import os
+import re
+
+import numpy as np
+
+from .compact import CompactSheet, numeric_rows
+from .downsample import downsample_series, pack_series
+from .manifest import load_merge_manifest, save_merge_manifest
+from .passthrough import RawSheet, copy_raw_sheets
+from .profiling import NULL
+from .reader import open_workbook, read_sheet_frame
+from .shard import INDEX_SHEET, ShardedWriter, shard_path
+from .sharedx import has_xy_pairs, x_groups
+from .zipindex import SheetIndex
+
+# ============================================================
+# Native Charts (xlsxwriter, replaces the Excel COM/VBA pass)
+# ============================================================
+# Same layout the old Draw_MultiCharts_Final macro produced:
+# - XY scatter, smooth lines, no markers
+# - every two columns (X, Y) from row 6 down is one series, named by row 1
+# - at most 200 series per chart, charts stacked from H2 (900 x 500 pt, 50 pt gap)
+# - log X axis starting at 100, major + minor grid lines, legend at the bottom
+# Charts are emitted while ALL_MERGED.xlsx is written; no Excel needed.
+#
+# chart_points=N (optional): series longer than N points are reduced with
+# log-X LTTB (downsample.py) into a hidden sheet _ChartData<n> next to the
+# data sheet, and the charts plot that; the data sheet keeps every row.
+
+CHART_FIRST_ROW = 6
+CHART_MAX_SERIES = 200
+CHART_WIDTH, CHART_HEIGHT, CHART_GAP = 900, 500, 50  # points
+
+CHART_DATA_PREFIX = "_ChartData"
+_CHART_DATA_RE = re.compile(re.escape(CHART_DATA_PREFIX) + r"\d+$")
+
+_PX = 96 / 72  # xlsxwriter sizes charts in pixels
+
+
+def chart_series(df, first_row=CHART_FIRST_ROW):
+    """
+    (x_col, y_col, last_row) for every X/Y pair the macro would plot (in a
+    shared-X sheet: every Y against the X column of its group).
+    Columns are 0-based, last_row is the 1-based Excel row of the last value.
+    """
+    if df.shape[0] < first_row:
+        return []
+    if isinstance(df, CompactSheet):  # the body may be a memmap (spill.py): no full mask
+        in_row = np.flatnonzero(df.filled_row(first_row - 1))
+    else:
+        filled = df.notna().to_numpy()
+        in_row = np.flatnonzero(filled[first_row - 1])
+    if len(in_row) == 0:
+        return []
+    last_col = in_row[-1]
+
+    # last non-empty row of every column (End(xlUp)), 0 when empty
+    if isinstance(df, CompactSheet):
+        last_rows = df.last_rows()
+    else:
+        last_rows = np.where(filled.any(axis=0),
+                             filled.shape[0] - np.argmax(filled[::-1], axis=0), 0)
+
+    series = []
+    for x, ys in x_groups(df):
+        if last_rows[x] >= first_row:
+            series += [(x, y, int(last_rows[x])) for y in ys if y <= last_col]
+    return series
+
+
+def series_values(frame, series, first_row=CHART_FIRST_ROW):
+    """
+    [(x, y)] float arrays of the given chart_series entries, from first_row
+    to each series' last row. Only their columns are read from the frame.
+    """
+    cols = sorted({c for x, y, _ in series for c in (x, y)})
+    pos = {c: i for i, c in enumerate(cols)}
+    part = frame.take(cols) if isinstance(frame, CompactSheet) else frame.iloc[:, cols]
+    values = numeric_rows(part, first_row - 1, max(last for _, _, last in series))
+    return [(values[:last - first_row + 1, pos[x]], values[:last - first_row + 1, pos[y]])
+            for x, y, last in series]
+
+
+def is_chart_data_sheet(sheet_name):
+    """True for the hidden _ChartData<n> sheets (regenerated, never merged)."""
+    return _CHART_DATA_RE.match(sheet_name) is not None
+
+
+def write_chart_data(writer, frame, series, chart_points, first_row=CHART_FIRST_ROW):
+    """
+    Downsample the series of one sheet into a hidden chart-data sheet of
+    writer (a StreamWriter). → (data sheet name, [(x, y, last)] in it), or
+    None when no series is longer than chart_points.
+    """
+    if not series or max(last - first_row + 1 for _, _, last in series) <= chart_points:
+        return None
+
+    # one chart's worth of columns at a time: only those are read from the frame
+    reduced = []
+    for start in range(0, len(series), CHART_MAX_SERIES):
+        pairs = series_values(frame, series[start:start + CHART_MAX_SERIES], first_row)
+        reduced += downsample_series(pairs, chart_points)
+        del pairs
+    block = pack_series(reduced)
+
+    n = sum(1 for name in writer.sheets if is_chart_data_sheet(name)) + 1
+    data_name = f"{CHART_DATA_PREFIX}{n}"
+    ws = writer.write_frame(CompactSheet(np.empty((0, block.shape[1]), dtype=object), block),
+                            data_name)
+    ws.hide()
+
+    filled = ~np.isnan(block)
+    lasts = np.where(filled.any(axis=0), len(block) - np.argmax(filled[::-1], axis=0), 1)
+    return data_name, [(2 * i, 2 * i + 1, int(lasts[2 * i])) for i in range(len(series))]
+
+
+def add_sheet_charts(workbook, worksheet, sheet_name, series,
+                     first_row=CHART_FIRST_ROW, data=None):
+    """
+    Insert the stacked scatter charts for one sheet.
+    data: (sheet name, series) from write_chart_data; the points are taken
+    from there (from row 1), the series names still from sheet_name.
+    """
+
+    data_name, data_series = data if data else (sheet_name, series)
+    data_first = 1 if data else first_row
+
+    for n, start in enumerate(range(0, len(series), CHART_MAX_SERIES)):
+        chart = workbook.add_chart({"type": "scatter", "subtype": "smooth"})
+
+        for (_, y, _), (dx, dy, last) in zip(series[start:start + CHART_MAX_SERIES],
+                                             data_series[start:start + CHART_MAX_SERIES]):
+            chart.add_series({
+                "name": [sheet_name, 0, y],
+                "categories": [data_name, data_first - 1, dx, last - 1, dx],
+                "values": [data_name, data_first - 1, dy, last - 1, dy],
+            })
+
+        chart.set_title({"name": f"Chart {n + 1}"})
+        chart.set_x_axis({
+            "log_base": 10,
+            "min": 100,
+            "crossing": 100,
+            "label_position": "low",
+            "major_gridlines": {"visible": True},
+            "minor_gridlines": {"visible": True},
+        })
+        chart.set_y_axis({
+            "major_gridlines": {"visible": True},
+            "minor_gridlines": {"visible": True},
+        })
+        chart.set_legend({"position": "bottom"})
+        chart.set_plotarea({"layout": {
+            "x": 40 / CHART_WIDTH,
+            "y": 40 / CHART_HEIGHT,
+            "width": (CHART_WIDTH - 60) / CHART_WIDTH,
+            "height": (CHART_HEIGHT - 120) / CHART_HEIGHT,
+        }})
+        chart.set_size({"width": round(CHART_WIDTH * _PX),
+                        "height": round(CHART_HEIGHT * _PX)})
+
+        worksheet.insert_chart("H2", chart, {
+            "y_offset": round(n * (CHART_HEIGHT + CHART_GAP) * _PX),
+            "object_position": 3,  # don't move or size with cells
+        })
+
+
+def _charted(sheet_name):
+    """Sheets that get charts; the others are copied as they are."""
+    return has_xy_pairs(sheet_name) and sheet_name != INDEX_SHEET
+
+
+def write_merged_sheet(writer, sheet_name, df, charts=True, chart_points=None):
+    """
+    Write one ALL_MERGED sheet through a ShardedWriter (sharded when wider
+    than Excel allows), plus its charts (Summary / Shard_Index: none).
+    chart_points: downsample the charted series to at most that many points.
+    """
+    pieces = writer.write_merged(df, sheet_name)
+    if charts and _charted(sheet_name):
+        for stream, worksheet, name, frame in pieces:
+            series = chart_series(frame)
+            data = write_chart_data(stream, frame, series, chart_points) if chart_points else None
+            add_sheet_charts(stream.book, worksheet, name, series, data=data)
+
+
+def _merged_books(excel_path):
+    """excel_path and its file shards (ALL_MERGED_002.xlsx, …), as far as they exist."""
+    paths, part = [excel_path], 2
+    while os.path.exists(shard_path(excel_path, part)):
+        paths.append(shard_path(excel_path, part))
+        part += 1
+    return paths
+
+
+def add_charts_to_merged_excel(excel_path, chart_points=None, progress_callback=None,
+                               status_callback=None, instrument=None):
+    """
+    (Re)draw the charts of an existing ALL_MERGED.xlsx and its file shards:
+    every XY sheet is read once and the workbook rewritten with charts,
+    replacing the file. Other sheets (Summary, Shard_Index) are copied
+    from the old file as they are (passthrough.py). Old chart-data sheets
+    are dropped and rebuilt for chart_points.
+    """
+
+    inst = instrument or NULL
+    output_dir = os.path.dirname(excel_path)
+    manifest = load_merge_manifest(output_dir) \
+        if os.path.basename(excel_path) == "ALL_MERGED.xlsx" else None
+
+    books = []
+    for path in _merged_books(excel_path):
+        with SheetIndex(path) as index:
+            books.append((path, [sh for sh in index.sheetnames
+                                 if not is_chart_data_sheet(sh)]))
+    total = sum(len(sheets) for _, sheets in books)
+
+    cur = 0
+    for path, sheets in books:
+        tmp_path = path + ".tmp.xlsx"
+        raw = {}
+        wb = open_workbook(path)
+        try:
+            writer = ShardedWriter(tmp_path)
+            for sh in sheets:
+                cur += 1
+                if status_callback:
+                    status_callback(f"產生圖表 → {sh}  ({cur}/{total})")
+                if not _charted(sh):  # placeholder, replaced by the old part below
+                    raw[sh] = RawSheet(path, sh)
+                    writer.write_merged(CompactSheet(np.empty((0, 0), dtype=object),
+                                                     np.empty((0, 0))), sh)
+                else:
+                    with inst.timer("read", sheet=sh):
+                        df = read_sheet_frame(wb, sh)
+                    with inst.timer("write", sheet=sh):
+                        write_merged_sheet(writer, sh, df, chart_points=chart_points)
+                    del df
+                if progress_callback:
+                    progress_callback(cur, total)
+            with inst.timer("write"):
+                writer.close()
+                if raw:
+                    copy_raw_sheets(tmp_path, raw)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            wb.close()
+
+        os.replace(tmp_path, path)
+
+    if manifest:  # same data, new file: keep the incremental merge usable
+        save_merge_manifest(output_dir, manifest["inputs"], manifest["sheets"],
+                            manifest["duplicates"], manifest.get("shared_x", False))
+
+    if status_callback:
+        status_callback("所有分頁圖表已完成！")
+    return True
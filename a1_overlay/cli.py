@@ -0,0 +1,312 @@
+"""
+Command line entry point (no GUI, no Excel):
+
+    python -m a1_overlay split  "raw/*.xlsx" -o out -j 8
+    python -m a1_overlay merge  -o out                    (out/*_SPLIT.xlsx)
+    python -m a1_overlay chart  out/ALL_MERGED.xlsx
+    python -m a1_overlay preview out/ALL_MERGED.xlsx -j 8 (images + index.html)
+    python -m a1_overlay run    "raw/*.xlsx" -o out -j 8  (split + merge, one shot)
+
+Every run writes a JSON timing report next to its output (ALL_MERGED.report.json,
+SPLIT.report.json for split); --profile / --trace-memory add cProfile and
+tracemalloc data to it.
+
+Pipeline modules (pandas, openpyxl, ...) are imported by the subcommand that
+needs them, so --help and argument errors return immediately.
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+from .events import JsonlLogger, ProgressBus, StatusPrinter
+from .profiling import Instrument, report_path
+
+
+def expand_inputs(patterns):
+    """Expand glob patterns (cron does not always run through a shell)."""
+    files = []
+    for pat in patterns:
+        matches = sorted(glob.glob(pat, recursive=True))
+        if not matches and os.path.isfile(pat):
+            matches = [pat]
+        files += [os.path.abspath(f) for f in matches if f.lower().endswith((".xlsx", ".xlsm"))]
+    return list(dict.fromkeys(files))  # de-duplicate, keep order
+
+
+class Reporter:
+    """
+    Progress bus for one CLI run: status lines go to stderr (unless -q),
+    every event to --events FILE (JSON lines). Drained on a background
+    thread so printing / logging never slows the pipeline.
+    Also owns the run's Instrument (None with --no-report).
+    """
+
+    def __init__(self, args, stage):
+        self.stage = stage
+        self.instrument = None
+        if not args.no_report:
+            self.instrument = Instrument(args.profile, args.trace_memory)
+            self.instrument.meta.update(command=stage, argv=sys.argv[1:])
+        self.bus = ProgressBus()
+        handlers = [] if args.quiet else [StatusPrinter(sys.stderr)]
+        self.log = JsonlLogger(args.events) if args.events else None
+        if self.log:
+            handlers.append(self.log)
+        self.status, self.progress = self.bus.callbacks(stage)
+        self._stop = self.bus.start_consumer(handlers)
+
+    def __enter__(self):
+        if self.instrument:
+            self.instrument.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop()
+        if self.log:
+            self.log.close()
+
+    def write_report(self, output_dir, name="ALL_MERGED", **meta):
+        """Stop the instrument and write <output_dir>/<name>.report.json."""
+        if not self.instrument:
+            return None
+        self.instrument.stop()
+        self.instrument.meta.update(meta)
+        return self.instrument.write_report(report_path(output_dir, name))
+
+
+def _chart_points(text):
+    n = int(text)
+    if n < 3:
+        raise argparse.ArgumentTypeError("needs at least 3 points (first, last and one between)")
+    return n
+
+
+def _output_dir(args, inputs):
+    out = args.output_dir or (os.path.dirname(inputs[0]) if inputs else os.getcwd())
+    os.makedirs(out, exist_ok=True)
+    return out
+
+
+# ============================================================
+# Subcommands
+# ============================================================
+
+def cmd_split(args):
+    from .parallel import split_files_parallel
+
+    inputs = [f for f in expand_inputs(args.inputs) if not f.endswith("_SPLIT.xlsx")]
+    if not inputs:
+        print("no input workbooks matched", file=sys.stderr)
+        return 2
+
+    out = _output_dir(args, inputs)
+    with Reporter(args, "split") as rep:
+        results = split_files_parallel(
+            inputs, out, workers=args.workers,
+            progress_callback=rep.progress,
+            eta_callback=rep.bus.eta_callback("split"),
+            result_callback=rep.bus.result_callback("split"),
+            job_args=(args.cache, not args.no_plans, args.verify_plans),
+            instrument=rep.instrument)
+        rep.write_report(out, "SPLIT", inputs=len(inputs),
+                         failed=sum(1 for r in results if r["error"]))
+
+    return 1 if any(r["error"] for r in results) else 0
+
+
+def cmd_merge(args):
+    from .incremental import incremental_merge
+    from .utils import default_workers
+
+    out = _output_dir(args, [])
+    split_files = expand_inputs(args.inputs or [os.path.join(out, "*_SPLIT.xlsx")])
+    if not split_files:
+        print("no _SPLIT.xlsx files matched", file=sys.stderr)
+        return 2
+
+    with Reporter(args, "merge") as rep:
+        ok, result = incremental_merge(
+            split_files, out, batch_size=args.batch_size, rebuild=args.rebuild,
+            charts=not args.no_charts, shard_mode=args.shard,
+            dtype="float32" if args.float32 else "float64", chart_points=args.chart_points,
+            shared_x=args.shared_x, workers=args.workers or default_workers(),
+            memory_budget=args.memory_budget * 2**20 if args.memory_budget else None,
+            spill_limit=args.spill * 2**20 if args.spill else None, spill_dir=args.spill_dir,
+            progress_callback=rep.progress, status_callback=rep.status,
+            instrument=rep.instrument)
+        rep.write_report(out, inputs=len(split_files), ok=ok, result=result)
+    print(result)
+    return 0 if ok else 1
+
+
+def cmd_chart(args):
+    from .charts import add_charts_to_merged_excel
+
+    path = args.workbook or os.path.join(args.output_dir or os.getcwd(), "ALL_MERGED.xlsx")
+    if not os.path.exists(path):
+        print(f"{path} does not exist", file=sys.stderr)
+        return 2
+
+    with Reporter(args, "chart") as rep:
+        add_charts_to_merged_excel(os.path.abspath(path), chart_points=args.chart_points,
+                                   progress_callback=rep.progress,
+                                   status_callback=rep.status, instrument=rep.instrument)
+        rep.write_report(os.path.dirname(os.path.abspath(path)),
+                         os.path.splitext(os.path.basename(path))[0] + ".chart")
+    return 0
+
+
+def cmd_preview(args):
+    from .preview import render_previews
+
+    path = args.workbook or os.path.join(args.output_dir or os.getcwd(), "ALL_MERGED.xlsx")
+    if not os.path.exists(path):
+        print(f"{path} does not exist", file=sys.stderr)
+        return 2
+
+    path = os.path.abspath(path)
+    with Reporter(args, "preview") as rep:
+        ok, result = render_previews(path, fmt=args.format, points=args.points,
+                                     workers=args.workers, progress_callback=rep.progress,
+                                     status_callback=rep.status, instrument=rep.instrument)
+        rep.write_report(os.path.dirname(path),
+                         os.path.splitext(os.path.basename(path))[0] + ".preview")
+    print(result)
+    return 0 if ok else 1
+
+
+def cmd_run(args):
+    from .fused import split_and_merge
+
+    inputs = [f for f in expand_inputs(args.inputs) if not f.endswith("_SPLIT.xlsx")]
+    if not inputs:
+        print("no input workbooks matched", file=sys.stderr)
+        return 2
+
+    out = _output_dir(args, inputs)
+    with Reporter(args, "run") as rep:
+        ok, result = split_and_merge(
+            inputs, out, workers=args.workers,
+            keep_split=args.keep_split, charts=not args.no_charts, shard_mode=args.shard,
+            dtype="float32" if args.float32 else "float64",
+            chart_points=args.chart_points, shared_x=args.shared_x,
+            spill_limit=args.spill * 2**20 if args.spill else None, spill_dir=args.spill_dir,
+            plans=not args.no_plans, verify_plans=args.verify_plans,
+            progress_callback=rep.progress, status_callback=rep.status,
+            instrument=rep.instrument)
+        rep.write_report(out, inputs=len(inputs), ok=ok, result=result)
+    print(result)
+    return 0 if ok else 1
+
+
+# ============================================================
+# Argument parsing
+# ============================================================
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="a1_overlay",
+        description="Split TX/MI workbooks, merge into ALL_MERGED.xlsx, draw charts.")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-o", "--output-dir",
+                        help="output folder (default: folder of the first input)")
+    common.add_argument("-q", "--quiet", action="store_true",
+                        help="no status messages on stderr")
+    common.add_argument("--events", metavar="FILE",
+                        help="append every progress event to FILE (JSON lines)")
+    common.add_argument("--no-report", action="store_true",
+                        help="do not write the JSON timing report")
+    common.add_argument("--profile", action="store_true",
+                        help="run under cProfile (top functions in the report, "
+                             "full stats in .report.prof)")
+    common.add_argument("--trace-memory", action="store_true",
+                        help="trace Python allocations with tracemalloc "
+                             "(this process only; slow)")
+
+    workers = argparse.ArgumentParser(add_help=False)
+    workers.add_argument("-j", "--workers", type=int, default=None,
+                         help="worker processes (default: CPU count - 1)")
+
+    chart_points = argparse.ArgumentParser(add_help=False)
+    chart_points.add_argument("--chart-points", type=_chart_points, default=None, metavar="N",
+                              help="plot at most N points per series (log-X LTTB into "
+                                   "hidden _ChartData sheets; the data sheets keep every row)")
+
+    shared_x = argparse.ArgumentParser(add_help=False)
+    shared_x.add_argument("--shared-x", action="store_true",
+                          help="store every distinct X column once per sheet, "
+                               "its Y columns after it")
+
+    memory = argparse.ArgumentParser(add_help=False)
+    memory.add_argument("--spill", type=int, default=0, metavar="MB",
+                        help="build merged sheets larger than this in memory-mapped files")
+    memory.add_argument("--spill-dir", default=None,
+                        help="folder for the spill files (default: OUTPUT_DIR)")
+    memory.add_argument("--float32", action="store_true",
+                        help="hold merged numbers as float32 (half the memory, ~7 digits)")
+
+    plans = argparse.ArgumentParser(add_help=False)
+    plans.add_argument("--no-plans", action="store_true",
+                       help="do not reuse / store split plans (OUTPUT_DIR/.split_plans)")
+    plans.add_argument("--verify-plans", action="store_true",
+                       help="re-detect every replayed sheet and fall back on any difference")
+
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("split", parents=[common, workers, plans],
+                       help="raw workbooks → <name>_SPLIT.xlsx")
+    p.add_argument("inputs", nargs="+", help="input files or glob patterns")
+    p.add_argument("--cache", choices=["parquet", "arrow"], default=None,
+                   help="also write the columnar split cache")
+    p.set_defaults(func=cmd_split)
+
+    p = sub.add_parser("merge", parents=[common, workers, memory, chart_points, shared_x],
+                       help="_SPLIT.xlsx files → ALL_MERGED.xlsx (incremental)")
+    p.add_argument("inputs", nargs="*",
+                   help="_SPLIT.xlsx files or globs (default: OUTPUT_DIR/*_SPLIT.xlsx)")
+    p.add_argument("--batch-size", type=int, default=25)
+    p.add_argument("--memory-budget", type=int, default=0, metavar="MB",
+                   help="size batches to fit this much memory instead of --batch-size")
+    p.add_argument("--rebuild", action="store_true", help="ignore the merge manifest")
+    p.add_argument("--no-charts", action="store_true")
+    p.add_argument("--shard", choices=["sheet", "file"], default="sheet",
+                   help="sheets past 16,384 columns: <sheet>_part2… (sheet) "
+                        "or ALL_MERGED_002.xlsx… (file)")
+    p.set_defaults(func=cmd_merge)
+
+    p = sub.add_parser("chart", parents=[common, chart_points],
+                       help="(re)draw the charts of ALL_MERGED.xlsx")
+    p.add_argument("workbook", nargs="?",
+                   help="workbook to chart (default: OUTPUT_DIR/ALL_MERGED.xlsx)")
+    p.set_defaults(func=cmd_chart)
+
+    p = sub.add_parser("preview", parents=[common, workers],
+                       help="PNG/SVG images of the charts + index.html (needs matplotlib)")
+    p.add_argument("workbook", nargs="?",
+                   help="workbook to draw (default: OUTPUT_DIR/ALL_MERGED.xlsx)")
+    p.add_argument("--format", choices=["png", "svg"], default="png")
+    p.add_argument("--points", type=_chart_points, default=2000, metavar="N",
+                   help="reduce longer series to N points (log-X LTTB) before drawing")
+    p.set_defaults(func=cmd_preview)
+
+    p = sub.add_parser("run", parents=[common, workers, memory, plans, chart_points,
+                                                 shared_x],
+                       help="split + merge in one pass, no intermediate files")
+    p.add_argument("inputs", nargs="+", help="input files or glob patterns")
+    p.add_argument("--keep-split", action="store_true",
+                   help="also write _SPLIT.xlsx files (debugging)")
+    p.add_argument("--no-charts", action="store_true")
+    p.add_argument("--shard", choices=["sheet", "file"], default="sheet",
+                   help="sheets past 16,384 columns: <sheet>_part2… (sheet) "
+                        "or ALL_MERGED_002.xlsx… (file)")
+    p.set_defaults(func=cmd_run)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,181 @@
+"""Compact sheets: a small object header block over a contiguous float body."""
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# Compact Sheets (header block + float64 / float32 body)
+# ============================================================
+# pd.read_excel(header=None) gives object columns for every split sheet,
+# because the label rows (file name, xxx(123), Freq / Val, units) sit on top
+# of the numbers: every value is a boxed Python float, ~40 bytes a cell.
+#
+# A CompactSheet keeps the rows down to the last one holding anything other
+# than a number as an object array (`header`, a handful of rows), and the
+# rest as one C-contiguous float array (`body`, 8 or 4 bytes a cell, NaN for
+# empty cells). Side-by-side merges are then array copies, and the writer
+# streams the body without looking at single cells.
+#
+# float32 halves the body again but rounds the values (about 7 digits).
+
+NUMERIC_DTYPES = ("float64", "float32")
+SCAN_ROWS = 4096  # body rows looked at per step (a spilled body pages in from disk)
+
+_NUMERIC_KINDS = {"floating", "integer", "mixed-integer-float", "empty"}  # infer_dtype
+
+
+def _is_number(v):
+    return isinstance(v, (int, float, np.integer, np.floating)) \
+        and not isinstance(v, (bool, np.bool_))
+
+
+def split_numbers(values):
+    """
+    2-D array → (float64 array, NaN where not a number; mask of the other
+    non-empty cells). Numeric arrays are converted without a per-cell step.
+    """
+    if values.dtype.kind in "fiu":
+        return values.astype(np.float64, copy=False), None
+
+    flat = values.ravel()
+    if pd.api.types.infer_dtype(flat, skipna=True) in _NUMERIC_KINDS:
+        return values.astype(np.float64), None  # object column below the labels
+    is_num = np.fromiter(map(_is_number, flat), dtype=bool, count=len(flat))
+    nums = np.full(len(flat), np.nan)
+    nums[is_num] = flat[is_num].astype(np.float64)
+    other = ~is_num & pd.notna(flat)
+    return nums.reshape(values.shape), other.reshape(values.shape)
+
+
+class CompactSheet:
+    """
+    header: object array (h, n), cells exactly as read (labels, NaN, numbers)
+    body:   float array (rows - h, n), NaN for empty cells
+    """
+
+    __slots__ = ("header", "body")
+
+    def __init__(self, header, body):
+        self.header = header
+        self.body = body
+
+    @property
+    def shape(self):
+        return (self.header.shape[0] + self.body.shape[0], self.body.shape[1])
+
+    @property
+    def size(self):
+        rows, cols = self.shape
+        return rows * cols
+
+    @property
+    def nbytes(self):
+        return self.header.nbytes + self.body.nbytes
+
+    def row(self, i):
+        h = self.header.shape[0]
+        return self.header[i].tolist() if i < h else self.body[i - h].tolist()
+
+    def columns(self, start, stop):
+        """Columns start:stop (views, no copy)."""
+        return CompactSheet(self.header[:, start:stop], self.body[:, start:stop])
+
+    def filled(self):
+        """Non-empty cells as a bool array (df.notna() of the full sheet)."""
+        return np.vstack([pd.notna(self.header), ~np.isnan(self.body)])
+
+    def filled_row(self, i):
+        """Non-empty cells of row i (filled()[i] without the full array)."""
+        h = self.header.shape[0]
+        return pd.notna(self.header[i]) if i < h else ~np.isnan(self.body[i - h])
+
+    def last_rows(self):
+        """
+        1-based last non-empty row of every column, 0 when empty (what
+        filled() gives with End(xlUp)), reading the body SCAN_ROWS at a time.
+        """
+        head = pd.notna(self.header)
+        last = np.where(head.any(axis=0), len(head) - np.argmax(head[::-1], axis=0), 0)
+        for r0 in range(0, self.body.shape[0], SCAN_ROWS):
+            chunk = ~np.isnan(self.body[r0:r0 + SCAN_ROWS])
+            hit = chunk.any(axis=0)
+            top = len(head) + r0 + len(chunk)
+            last[hit] = top - np.argmax(chunk[::-1], axis=0)[hit]
+        return last
+
+    def take(self, cols):
+        """Columns cols (a list) as a new CompactSheet (copies)."""
+        return CompactSheet(self.header[:, cols], self.body[:, cols])
+
+    def to_frame(self):
+        return pd.DataFrame(np.vstack([self.header, self.body.astype(object)]))
+
+
+def compact_frame(df, dtype="float64"):
+    """DataFrame (as pd.read_excel(header=None) returns it) → CompactSheet."""
+    values = df.to_numpy()
+    if values.ndim != 2 or values.size == 0:
+        return CompactSheet(np.empty((0, df.shape[1]), dtype=object),
+                            np.empty((0, df.shape[1]), dtype=dtype))
+
+    nums, other = split_numbers(values)
+    text_rows = np.flatnonzero(other.any(axis=1)) if other is not None else []
+    h = int(text_rows[-1]) + 1 if len(text_rows) else 0
+    # ±inf stay in the body; the writer turns them into text like to_excel does
+    header = values[:h].astype(object)
+    body = np.ascontiguousarray(nums[h:], dtype=dtype)
+    return CompactSheet(header, body)
+
+
+def as_compact(sheet, dtype="float64"):
+    return sheet if isinstance(sheet, CompactSheet) else compact_frame(sheet, dtype)
+
+
+def hstack(sheets, dtype="float64", alloc=None):
+    """
+    pd.concat(frames, axis=1, ignore_index=True) for CompactSheets: shorter
+    sheets are padded with empty cells, a sheet with fewer header rows moves
+    its first body rows into the merged header.
+    alloc(shape, dtype): where the merged body goes (spill.py), default memory.
+    """
+    h = max((s.header.shape[0] for s in sheets), default=0)
+    rows = max((s.shape[0] for s in sheets), default=0)
+    width = sum(s.shape[1] for s in sheets)
+
+    header = np.full((h, width), np.nan, dtype=object)
+    body = (alloc or np.empty)((rows - h, width), dtype=dtype)
+    c = 0
+    for s in sheets:
+        w = s.shape[1]
+        sh = s.header.shape[0]
+        lifted = s.body[:h - sh]  # body rows that fall into the merged header
+        header[:sh, c:c + w] = s.header
+        header[sh:sh + len(lifted), c:c + w] = lifted
+        rest = s.body[h - sh:]
+        body[:len(rest), c:c + w] = rest
+        body[len(rest):, c:c + w] = np.nan
+        c += w
+    return CompactSheet(header, body)
+
+
+def numeric_rows(sheet, start, stop):
+    """
+    Rows start:stop of a DataFrame or CompactSheet as a float64 array, NaN
+    for every cell that is not a number.
+    """
+    if not isinstance(sheet, CompactSheet):
+        return split_numbers(sheet.iloc[start:stop].to_numpy())[0]
+    h = sheet.header.shape[0]
+    if start >= h:
+        return sheet.body[start - h:stop - h].astype(np.float64, copy=False)
+    top = split_numbers(sheet.header[start:stop])[0]
+    if stop <= h:
+        return top
+    return np.vstack([top, sheet.body[:stop - h]])
+
+
+def prepend_row(sheet, row):
+    """A new first row (the file-name header of merged sheets)."""
+    top = np.full((1, sheet.shape[1]), np.nan, dtype=object)
+    top[0, :len(row)] = row
+    return CompactSheet(np.vstack([top, sheet.header]), sheet.body)
@@ -0,0 +1,98 @@
+"""Chart-data reduction: log-X-aware LTTB downsampling of X/Y series."""
+
+import numpy as np
+
+# ============================================================
+# Curve Downsampling (Largest-Triangle-Three-Buckets, log X)
+# ============================================================
+# A chart plots at most CHART_MAX_SERIES series of every row; dense sweeps
+# make ALL_MERGED.xlsx slow to open and render. LTTB keeps the first and the
+# last point and, for every bucket in between, the point spanning the
+# largest triangle with the point kept before it and the mean of the next
+# bucket, so peaks, dips and edges survive. X is taken as log10(X) (the
+# charts use a log X axis), otherwise the low decades would be thinned to
+# nothing.
+#
+# Series of equal length are reduced together: the bucket loop runs once
+# per output point, every step is array arithmetic over all those series.
+
+MIN_POINTS = 3
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Rows kept by LTTB for m series at once.
+    x, y: (m, n) float arrays, points in plotting order; → (m, n_out) indices.
+    """
+    m, n = x.shape
+    if n_out >= n:
+        return np.broadcast_to(np.arange(n), (m, n))
+    if n_out < MIN_POINTS:
+        raise ValueError(f"need at least {MIN_POINTS} points, not {n_out}")
+
+    every = (n - 2) / (n_out - 2)
+    edges = (np.arange(n_out - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    out = np.empty((m, n_out), dtype=np.int64)
+    out[:, 0] = 0
+    out[:, -1] = n - 1
+    rows = np.arange(m)
+    a = np.zeros(m, dtype=np.int64)
+
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo = hi
+        nhi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[:, nlo:nhi].mean(axis=1)
+        avg_y = y[:, nlo:nhi].mean(axis=1)
+
+        ax, ay = x[rows, a], y[rows, a]
+        bx, by = x[:, lo:hi], y[:, lo:hi]
+        area = np.abs((ax - avg_x)[:, None] * (by - ay[:, None])
+                      - (ax[:, None] - bx) * (avg_y - ay)[:, None])
+        a = lo + area.argmax(axis=1)
+        out[:, i + 1] = a
+    return out
+
+
+def downsample_series(pairs, n_out, log_x=True):
+    """
+    [(x, y)] 1-D float arrays → [(x, y)] with at most n_out points each, in
+    their original order. Points a log X axis cannot show (NaN, X <= 0) are
+    dropped first.
+    """
+    clean = []
+    for x, y in pairs:
+        keep = np.isfinite(x) & np.isfinite(y)
+        if log_x:
+            keep &= x > 0
+        clean.append((x[keep], y[keep]))
+
+    out = [None] * len(clean)
+    by_length = {}
+    for i, (x, _) in enumerate(clean):
+        if len(x) <= n_out:
+            out[i] = clean[i]
+        else:
+            by_length.setdefault(len(x), []).append(i)
+
+    for group in by_length.values():
+        xs = np.stack([clean[i][0] for i in group])
+        ys = np.stack([clean[i][1] for i in group])
+        idx = lttb_indices(np.log10(xs) if log_x else xs, ys, n_out)
+        rows = np.arange(len(group))[:, None]
+        kx, ky = xs[rows, idx], ys[rows, idx]
+        for j, i in enumerate(group):
+            out[i] = (kx[j], ky[j])
+    return out
+
+
+def pack_series(pairs):
+    """[(x, y)] → (rows, 2 * series) float array, X/Y side by side, NaN padded."""
+    rows = max((len(x) for x, _ in pairs), default=0)
+    block = np.full((rows, 2 * len(pairs)), np.nan)
+    for i, (x, y) in enumerate(pairs):
+        block[:len(x), 2 * i] = x
+        block[:len(y), 2 * i + 1] = y
+    return block
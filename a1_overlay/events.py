@@ -0,0 +1,194 @@
+"""
+Thread-safe progress events.
+
+Workers publish structured events (stage, item, bytes, elapsed, ...) on a
+ProgressBus; the GUI drains it on the Tk main loop (TkProgressPump), the CLI
+and log files drain it on a background thread (start_consumer). Publishing
+never blocks and never touches a widget, so a flood of per-sheet status
+messages costs the workers almost nothing.
+"""
+
+import json
+import threading
+import time
+from collections import namedtuple
+
+# ============================================================
+# Events
+# ============================================================
+# kind:
+#   status   - free text for the status line          (coalesced)
+#   progress - current / total                        (coalesced)
+#   eta      - estimated seconds left, in `elapsed`   (coalesced)
+#   result   - one item finished (file, batch, sheet)  (always kept)
+#   done / warning / error - end of a stage            (always kept)
+
+ProgressEvent = namedtuple(
+    "ProgressEvent",
+    "seq ts stage kind item current total bytes elapsed message")
+
+COALESCED = {"status", "progress", "eta"}
+
+
+def event_to_dict(ev):
+    d = ev._asdict()
+    d.pop("seq")
+    return {k: v for k, v in d.items() if v is not None}
+
+
+# ============================================================
+# Bus
+# ============================================================
+
+class ProgressBus:
+    """
+    Many publishers (any thread / callback), one or more drainers.
+
+    Coalescing: for status/progress/eta only the newest pending event per
+    (stage, kind) is kept, so a consumer that drains 10x per second sees at
+    most 10 updates per second no matter how fast workers publish.
+    Everything else (results, done, errors) is queued and delivered in order.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._latest = {}   # (stage, kind) → newest coalesced event
+        self._queue = []    # events that are never dropped
+        self._started = {}  # stage → start time (for `elapsed`)
+
+    def publish(self, stage, kind, item=None, current=None, total=None,
+                bytes=None, elapsed=None, message=None):
+        now = time.time()
+        with self._lock:
+            self._seq += 1
+            start = self._started.setdefault(stage, now)
+            if elapsed is None:
+                elapsed = now - start
+            ev = ProgressEvent(self._seq, now, stage, kind, item, current, total,
+                               bytes, elapsed, message)
+            if kind in COALESCED:
+                self._latest[(stage, kind)] = ev
+            else:
+                self._queue.append(ev)
+
+    def drain(self):
+        """All pending events, oldest first."""
+        with self._lock:
+            events = self._queue + list(self._latest.values())
+            self._queue = []
+            self._latest = {}
+        events.sort(key=lambda ev: ev.seq)
+        return events
+
+    def reset(self, stage):
+        """Restart the elapsed clock of a stage."""
+        with self._lock:
+            self._started[stage] = time.time()
+
+    # ---------- adapters for the pipeline's callback arguments ----------
+    def callbacks(self, stage):
+        """(status_callback, progress_callback) that publish on this bus."""
+        self.reset(stage)
+
+        def status(msg):
+            self.publish(stage, "status", message=msg)
+
+        def progress(cur, total):
+            self.publish(stage, "progress", current=cur, total=total)
+
+        return status, progress
+
+    def eta_callback(self, stage):
+        return lambda remain: self.publish(stage, "eta", elapsed=remain)
+
+    def result_callback(self, stage):
+        """For split_files_parallel(result_callback=...)."""
+        def result(res):
+            self.publish(stage, "result", item=res["input"], bytes=res["bytes"],
+                         elapsed=res["seconds"], message=res["error"])
+        return result
+
+    # ---------- background consumer (CLI, log file) ----------
+    def start_consumer(self, handlers, interval=0.2):
+        """
+        Drain every `interval` seconds on a daemon thread and pass each event
+        to every handler. Returns a stop() function that flushes what is left.
+        """
+        stop_flag = threading.Event()
+
+        def dispatch():
+            for ev in self.drain():
+                for h in handlers:
+                    h(ev)
+
+        def loop():
+            while not stop_flag.wait(interval):
+                dispatch()
+
+        t = threading.Thread(target=loop, daemon=True)
+        t.start()
+
+        def stop():
+            stop_flag.set()
+            t.join()
+            dispatch()
+
+        return stop
+
+
+# ============================================================
+# Consumers
+# ============================================================
+
+class TkProgressPump:
+    """Drain a bus on the Tk main loop (root.after) and call handler(event)."""
+
+    def __init__(self, root, bus, handler, interval_ms=100):
+        self.root = root
+        self.bus = bus
+        self.handler = handler
+        self.interval_ms = interval_ms
+        self.root.after(self.interval_ms, self._tick)
+
+    def _tick(self):
+        try:
+            for ev in self.bus.drain():
+                self.handler(ev)
+        finally:
+            self.root.after(self.interval_ms, self._tick)
+
+
+class JsonlLogger:
+    """Append every event as one JSON line (for later analysis)."""
+
+    def __init__(self, path):
+        self.fp = open(path, "a", encoding="utf-8")
+
+    def __call__(self, ev):
+        self.fp.write(json.dumps(event_to_dict(ev), ensure_ascii=False) + "\n")
+        self.fp.flush()
+
+    def close(self):
+        self.fp.close()
+
+
+class StatusPrinter:
+    """Print status / results / errors to a stream (CLI)."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __call__(self, ev):
+        if ev.kind == "status":
+            text = ev.message
+        elif ev.kind == "result":
+            if ev.message:  # a failed item carries its error text
+                text = f"FAILED {ev.item}: {ev.message}"
+            else:
+                text = f"done {ev.item} ({ev.elapsed:.1f} s)"
+        elif ev.kind in ("done", "warning", "error"):
+            text = f"[{ev.stage}] {ev.message}"
+        else:
+            return
+        print(text, file=self.stream, flush=True)
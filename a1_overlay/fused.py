@@ -0,0 +1,146 @@
+"""One-shot split + merge straight into ALL_MERGED.xlsx."""
+
+import os
+
+from .charts import write_merged_sheet
+from .compact import compact_frame, prepend_row
+from .parallel import split_files_parallel
+from .plans import plan_dir
+from .profiling import NULL
+from .shard import ShardedWriter
+from .sharedx import has_xy_pairs, share_x
+from .spill import SpillStore
+from .split import iter_split_sheets, split_base_name, write_split_file
+from .utils import sanitize
+
+# ============================================================
+# One-shot Split + Merge (no intermediate files)
+# ============================================================
+
+def split_to_sheets(input_path, output_dir, keep_split=False, plans=False,
+                    verify_plans=False, parsed_dir=None, instrument=None):
+    """
+    Split one workbook in memory → [(sheet_name, DataFrame), ...].
+    keep_split=True also writes the usual _SPLIT.xlsx (debugging only).
+    plans=True reuses split plans stored in <output_dir>/.split_plans.
+    parsed_dir: pre-parsed workbooks to use when present (prefetch.py).
+    """
+    sheets = list(iter_split_sheets(input_path, instrument,
+                                    plan_dir(output_dir) if plans else None, verify_plans,
+                                    parsed_dir=parsed_dir))
+    if keep_split:
+        out_path = os.path.join(output_dir, f"{split_base_name(input_path)}_SPLIT.xlsx")
+        write_split_file(sheets, out_path, instrument)
+    return sheets
+
+
+def split_and_merge(input_paths, output_dir, workers=None, keep_split=False,
+                    charts=True, plans=False, verify_plans=False, shard_mode="sheet",
+                    dtype="float64", chart_points=None, shared_x=False, spill_limit=None,
+                    spill_dir=None, parsed_dir=None, progress_callback=None, status_callback=None, instrument=None):
+    """
+    Split every input and merge the blocks straight into ALL_MERGED.xlsx.
+
+    Same result as split → batch merge → final merge, but each workbook's
+    split blocks go directly into per-sheet column accumulators instead of
+    being written to _SPLIT.xlsx / MERGE_BATCH_n.xlsx and parsed back.
+    Blocks are compacted to dtype as they arrive and joined like the final
+    merge does (compact.py); spill_limit / spill_dir: see SpillStore.
+    Only sheets present in every input are kept, in the first input's order;
+    inputs that fail to split are left out (like a missing _SPLIT.xlsx).
+    plans / verify_plans: see split_to_sheets. Sheets wider than Excel
+    allows are sharded (shard_mode, see shard.py). chart_points: downsample
+    charted series (see charts.py). shared_x: store every distinct X column
+    once (see sharedx.py). parsed_dir: see split_to_sheets.
+    """
+
+    inst = instrument or NULL
+    n = len(input_paths)
+    index = {f: i for i, f in enumerate(input_paths)}
+    names = [split_base_name(f) for f in input_paths]
+
+    columns = {}        # sheet → [block of input 0, block of input 1, ...]
+    orders = [None] * n # sheet order of every successfully split input
+    common = None       # sheets seen in every input so far
+    failed = []
+
+    def collect(res):
+        nonlocal common
+        if res["error"]:
+            failed.append(res)
+            return
+
+        i = index[res["input"]]
+        sheets = res["output"]
+        res["output"] = None  # accumulators own the blocks from here on
+
+        orders[i] = [name for name, _ in sheets]
+        common = set(orders[i]) if common is None else common & set(orders[i])
+
+        for name, df in sheets:
+            if name in common:
+                with inst.timer("transform", sheet=name):
+                    columns.setdefault(name, [None] * n)[i] = compact_frame(df, dtype)
+        del sheets
+
+        for name in list(columns):  # drop sheets that can no longer be merged
+            if name not in common:
+                del columns[name]
+
+    if status_callback:
+        status_callback(f"拆分 {n} 個檔案（不產生中間檔）…")
+
+    split_files_parallel(
+        input_paths, output_dir, workers=workers,
+        progress_callback=progress_callback, status_callback=status_callback,
+        result_callback=collect,
+        job=split_to_sheets, job_args=(keep_split, plans, verify_plans, parsed_dir), instrument=instrument
+    )
+
+    done = [i for i in range(n) if orders[i] is not None]
+    if not done:
+        return False, "所有檔案拆分失敗：\n" + "\n".join(
+            f"{os.path.basename(r['input'])}：{r['error']}" for r in failed[:20])
+
+    out_path = os.path.join(output_dir, "ALL_MERGED.xlsx")
+    writer = ShardedWriter(out_path, shard_mode, status_callback)
+
+    sheet_order = [sh for sh in orders[done[0]] if sh in common]
+    for cur, sh in enumerate(sheet_order, start=1):
+
+        if status_callback:
+            status_callback(f"合併 Sheet：{sh}")
+
+        with SpillStore(spill_limit, spill_dir or output_dir, dtype) as store:
+            # header row with the source file name over each of its columns
+            header_row = []
+            for i in done:
+                block, columns[sh][i] = columns[sh][i], None
+                header_row += [names[i]] * block.shape[1]
+                store.append(block)
+                del block
+            del columns[sh]
+            if store.spilled:
+                inst.count("spilled_sheets", sheet=sh)
+
+            with inst.timer("transform", sheet=sh):
+                merged = prepend_row(store.sheet(), header_row)
+                name = sanitize(sh)
+                if shared_x and has_xy_pairs(name):
+                    merged = share_x(merged, alloc=store.alloc)
+            inst.count("cells", merged.size, sheet=sh)
+
+            with inst.timer("write", sheet=sh):
+                write_merged_sheet(writer, name, merged, charts, chart_points)
+            del merged
+
+        if progress_callback:
+            progress_callback(cur, len(sheet_order))
+
+    with inst.timer("write"):
+        writer.close()
+
+    if failed and status_callback:
+        status_callback(f"注意：{len(failed)} 個檔案拆分失敗，未納入合併")
+
+    return True, out_path
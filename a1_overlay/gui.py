@@ -0,0 +1,542 @@
+"""Tkinter front end (folder selection, file list, progress, ETA)."""
+
+import multiprocessing
+import os
+import pathlib
+import threading
+import tkinter as tk
+import webbrowser
+from tkinter import filedialog, messagebox
+from tkinter import ttk
+
+from .events import ProgressBus, TkProgressPump
+from .profiling import Instrument, report_path
+from .utils import default_workers
+
+# Pipeline modules (pandas, openpyxl, ...) are imported by the handler that
+# needs them, as cli.py does, so the window opens without loading them.
+
+# ============================================================
+# GUI (Folder Selection, File List, Progress, ETA)
+# ============================================================
+
+class App:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Excel TX/MI 拆分＋批次合併＋自動畫圖工具（穩定版）")
+
+        self.file_list = []          # all excel files in selected folder
+        self.selected_files = []     # user selected files
+        self.output_dir = ""         # default = same as folder
+        self.drag_start_index = None # for sliding multi-select
+
+        # Worker threads never touch widgets: they publish on the bus and
+        # the pump applies the (coalesced) events on the Tk main loop.
+        self.bus = ProgressBus()
+        TkProgressPump(root, self.bus, self.on_event)
+
+        # Selected workbooks are parsed in the background while the user is
+        # still choosing, so the split starts on warm data (prefetch.py).
+        self.prefetcher = None  # created on first use (get_prefetcher)
+        self.prefetch_job = None
+        root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # =====================================================
+        # UI Layout
+        # =====================================================
+        frm = tk.Frame(root)
+        frm.pack(padx=10, pady=10)
+
+        # -------- Folder Select --------
+        tk.Button(frm, text="選擇來源資料夾", command=self.pick_folder)\
+            .grid(row=0, column=0, sticky="w")
+
+        self.folder_label = tk.Label(frm, text="未選擇來源資料夾")
+        self.folder_label.grid(row=0, column=1, padx=10, sticky="w")
+
+        # -------- Output Folder --------
+        tk.Button(frm, text="變更輸出資料夾", command=self.change_output)\
+            .grid(row=1, column=0, sticky="w")
+
+        self.output_label = tk.Label(frm, text="輸出資料夾：未設定")
+        self.output_label.grid(row=1, column=1, padx=10, sticky="w")
+
+        # -------- Worker processes --------
+        wfrm = tk.Frame(frm)
+        wfrm.grid(row=0, column=2, sticky="e")
+        tk.Label(wfrm, text="平行處理數：").pack(side=tk.LEFT)
+        self.workers = tk.IntVar(value=default_workers())
+        tk.Spinbox(wfrm, from_=1, to=os.cpu_count() or 1, width=4,
+                   textvariable=self.workers).pack(side=tk.LEFT)
+
+        # -------- Merge memory budget (MB, 0 = fixed 25 files per batch) --------
+        tk.Label(wfrm, text="  合併記憶體上限 MB：").pack(side=tk.LEFT)
+        self.memory_mb = tk.IntVar(value=0)
+        tk.Spinbox(wfrm, from_=0, to=262144, increment=512, width=7,
+                   textvariable=self.memory_mb).pack(side=tk.LEFT)
+
+        # -------- Merged sheets: spill to disk past N MB (0 = never), float32 --------
+        tk.Label(wfrm, text="  溢寫到磁碟 MB：").pack(side=tk.LEFT)
+        self.spill_mb = tk.IntVar(value=0)
+        tk.Spinbox(wfrm, from_=0, to=262144, increment=512, width=7,
+                   textvariable=self.spill_mb).pack(side=tk.LEFT)
+        self.float32 = tk.BooleanVar(value=False)
+        tk.Checkbutton(wfrm, text="float32", variable=self.float32).pack(side=tk.LEFT)
+
+        # -------- File Listbox --------
+        tk.Label(frm, text="請選擇要處理的 Excel：").grid(row=2, column=0, sticky="w")
+
+        self.listbox = tk.Listbox(frm, width=80, height=12,
+                                  selectmode=tk.MULTIPLE)
+        self.listbox.grid(row=3, column=0, columnspan=3, pady=5)
+
+        # -- Standard selection update --
+        self.listbox.bind("<<ListboxSelect>>", self.update_selected_count)
+
+        # -- Enable sliding multi-select (拖曳反白選取功能) --
+        self.listbox.bind("<Button-1>", self.drag_start)
+        self.listbox.bind("<B1-Motion>", self.drag_motion)
+
+        # -------- Select All / None --------
+        tk.Button(frm, text="全選", command=self.select_all)\
+            .grid(row=4, column=0, sticky="w")
+
+        tk.Button(frm, text="全不選", command=self.select_none)\
+            .grid(row=4, column=1, sticky="w")
+
+        self.count_label = tk.Label(frm, text="已選擇：0 個檔案")
+        self.count_label.grid(row=4, column=2, sticky="e")
+
+        # -------- Progress Bar --------
+        self.progress = ttk.Progressbar(frm, length=450, mode="determinate")
+        self.progress.grid(row=5, column=0, columnspan=3, pady=5)
+
+        # ETA
+        self.eta_label = tk.Label(frm, text="", fg="green")
+        self.eta_label.grid(row=6, column=0, columnspan=3)
+
+        # Status messages
+        self.status = tk.Label(frm, text="", fg="blue")
+        self.status.grid(row=7, column=0, columnspan=3)
+
+        # -------- Action Buttons --------
+        tk.Button(frm, text="開始拆分", command=self.start_split)\
+            .grid(row=8, column=0, pady=10)
+
+        tk.Button(frm, text="合併 SPLIT → ALL_MERGED.xlsx",
+                  command=self.start_merge)\
+            .grid(row=8, column=1, pady=10)
+
+        tk.Button(frm, text="重新產生所有圖表",
+                  command=self.start_charts)\
+            .grid(row=8, column=2, pady=10)
+
+        # -------- One-shot split + merge --------
+        tk.Button(frm, text="拆分＋合併（一次完成，不產生中間檔）",
+                  command=self.start_split_merge)\
+            .grid(row=9, column=0, columnspan=2, sticky="w")
+
+        self.split_cache = tk.BooleanVar(value=False)
+        tk.Checkbutton(frm, text="同時輸出 Parquet 快取（加速合併）",
+                       variable=self.split_cache)\
+            .grid(row=10, column=0, columnspan=2, sticky="w")
+
+        self.full_rebuild = tk.BooleanVar(value=False)
+        tk.Checkbutton(frm, text="合併時完整重建（忽略 manifest）",
+                       variable=self.full_rebuild)\
+            .grid(row=10, column=2, sticky="e")
+
+        self.keep_split = tk.BooleanVar(value=False)
+        tk.Checkbutton(frm, text="保留 _SPLIT.xlsx（除錯用）",
+                       variable=self.keep_split)\
+            .grid(row=9, column=2, sticky="e")
+
+        self.prefetch = tk.BooleanVar(value=True)
+        tk.Checkbutton(frm, text="選取時先在背景解析檔案（加速拆分）",
+                       variable=self.prefetch, command=self.schedule_prefetch)\
+            .grid(row=11, column=0, columnspan=2, sticky="w")
+
+        tk.Button(frm, text="圖表預覽（PNG + HTML，免開 Excel）",
+                  command=self.start_previews)\
+            .grid(row=11, column=2, sticky="e")
+
+
+    # ============================================================
+    # Folder Selection
+    # ============================================================
+    def pick_folder(self):
+        folder = filedialog.askdirectory(title="選擇來源資料夾")
+        if not folder:
+            return
+
+        self.folder_label.config(text=folder)
+        self.output_dir = folder
+        self.output_label.config(text=f"輸出資料夾：{folder}")
+
+        self.file_list = []
+        self.selected_files = []
+        self.listbox.delete(0, tk.END)
+
+        # Load all Excel files
+        for fname in os.listdir(folder):
+            if fname.lower().endswith((".xlsx", ".xlsm")):
+                fullpath = os.path.join(folder, fname)
+                self.file_list.append(fullpath)
+                self.listbox.insert(tk.END, fullpath)
+
+        self.update_selected_count()
+
+
+    # ============================================================
+    # Output Folder
+    # ============================================================
+    def change_output(self):
+        folder = filedialog.askdirectory(title="選擇輸出資料夾")
+        if folder:
+            self.output_dir = folder
+            self.output_label.config(text=f"輸出資料夾：{folder}")
+
+
+    # ============================================================
+    # Selection tools
+    # ============================================================
+    def select_all(self):
+        self.listbox.select_set(0, tk.END)
+        self.update_selected_count()
+
+    def select_none(self):
+        self.listbox.select_clear(0, tk.END)
+        self.update_selected_count()
+
+    # Update selected count
+    def update_selected_count(self, event=None):
+        idxs = self.listbox.curselection()
+        self.selected_files = [self.listbox.get(i) for i in idxs]
+        self.count_label.config(text=f"已選擇：{len(self.selected_files)} 個檔案")
+        self.schedule_prefetch()
+
+
+    # ============================================================
+    # Background pre-parse of the selection
+    # ============================================================
+    def schedule_prefetch(self):
+        """Follow the selection once it has settled (drag-select fires per row)."""
+        if self.prefetch_job is not None:
+            self.root.after_cancel(self.prefetch_job)
+        self.prefetch_job = self.root.after(500, self.run_prefetch)
+
+    def get_prefetcher(self):
+        if self.prefetcher is None:
+            from .prefetch import PREFETCH_WORKERS, Prefetcher
+            self.prefetcher = Prefetcher(workers=min(PREFETCH_WORKERS, default_workers()))
+        return self.prefetcher
+
+    def run_prefetch(self):
+        self.prefetch_job = None
+        if self.prefetcher or self.prefetch.get():
+            self.get_prefetcher().update(self.selected_files if self.prefetch.get() else ())
+
+    def stop_prefetch(self):
+        """The real run starts: drop what is still queued (running parses finish)."""
+        if self.prefetch_job is not None:
+            self.root.after_cancel(self.prefetch_job)
+            self.prefetch_job = None
+        if self.prefetcher:
+            self.prefetcher.cancel()
+
+    def parsed_dir(self):
+        """Parse cache the splits may read from: only with prefetching on."""
+        return self.get_prefetcher().cache_dir if self.prefetch.get() else None
+
+    def on_close(self):
+        if self.prefetcher:
+            self.prefetcher.close()
+        self.root.destroy()
+
+
+    # ============================================================
+    # Drag-Select (拖曳連續選取功能)
+    # ============================================================
+    def drag_start(self, event):
+        widget = event.widget
+        self.drag_start_index = widget.nearest(event.y)
+
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(self.drag_start_index)
+        self.update_selected_count()
+
+    def drag_motion(self, event):
+        widget = event.widget
+        current_index = widget.nearest(event.y)
+
+        start = min(self.drag_start_index, current_index)
+        end = max(self.drag_start_index, current_index)
+
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(start, end)
+        self.update_selected_count()
+
+
+    # ============================================================
+    # Progress events (workers publish, the Tk main loop applies them)
+    # ============================================================
+    def on_event(self, ev):
+        """Runs on the Tk main loop only (see TkProgressPump)."""
+        if ev.kind == "status":
+            self.status.config(text=ev.message)
+        elif ev.kind == "progress":
+            self.progress["maximum"] = ev.total
+            self.progress["value"] = ev.current
+        elif ev.kind == "eta":
+            self.eta_label.config(text=f"預估剩餘時間：約 {ev.elapsed:.1f} 秒")
+        elif ev.kind == "done":
+            self.status.config(text=ev.message.splitlines()[0])
+            messagebox.showinfo("完成", ev.message)
+        elif ev.kind == "warning":
+            self.status.config(text=ev.message.splitlines()[0])
+            messagebox.showwarning("完成", ev.message)
+        elif ev.kind == "error":
+            self.status.config(text=f"錯誤：{ev.message}")
+            messagebox.showerror("錯誤", ev.message)
+
+    def run_stage(self, stage, target, *args):
+        """Run target(*args) on a worker thread; an exception becomes an error event."""
+
+        def runner():
+            try:
+                target(*args)
+            except Exception as e:
+                self.bus.publish(stage, "error", message=f"{type(e).__name__}: {e}")
+
+        threading.Thread(target=runner, daemon=True).start()
+
+    def save_report(self, stage, inst, output_dir, name="ALL_MERGED", **meta):
+        """Write the run's timing report next to its output (never fatal)."""
+        inst.stop()
+        inst.meta.update(command=stage, **meta)
+        try:
+            inst.write_report(report_path(output_dir, name))
+        except OSError as e:
+            self.bus.publish(stage, "status", message=f"無法寫入效能報告：{e}")
+
+
+    # ============================================================
+    # Split
+    # ============================================================
+    def start_split(self):
+        if not self.selected_files:
+            messagebox.showwarning("提醒", "請先選擇要拆分的 Excel 檔案！")
+            return
+
+        self.stop_prefetch()
+        self.status.config(text="開始拆分...")
+        self.progress["value"] = 0
+        self.progress["maximum"] = len(self.selected_files)
+
+        cache_format = "parquet" if self.split_cache.get() else None
+        self.run_stage("split", self.process_split_thread,
+                       list(self.selected_files), self.output_dir,
+                       self.workers.get(), cache_format, self.parsed_dir())
+
+    def process_split_thread(self, files, output_dir, workers, cache_format, parsed_dir):
+        from .parallel import split_files_parallel
+
+        update_status, update_progress = self.bus.callbacks("split")
+        inst = Instrument().start()
+
+        results = split_files_parallel(
+            files,
+            output_dir,
+            workers=workers,
+            progress_callback=update_progress,
+            status_callback=update_status,
+            eta_callback=self.bus.eta_callback("split"),
+            result_callback=self.bus.result_callback("split"),
+            # reuse split plans of repeated layouts; take what the prefetcher parsed
+            job_args=(cache_format, True, False, True, parsed_dir),
+            instrument=inst
+        )
+
+        failed = [r for r in results if r["error"]]
+        self.save_report("split", inst, output_dir, "SPLIT",
+                         inputs=len(files), failed=len(failed))
+        if failed:
+            self.bus.publish(
+                "split", "warning",
+                message="拆分完成，但以下檔案失敗：\n" +
+                "\n".join(f"{os.path.basename(r['input'])}：{r['error']}" for r in failed[:20])
+            )
+        else:
+            self.bus.publish("split", "done", message="全部拆分完成！")
+
+
+    # ============================================================
+    # MERGE
+    # ============================================================
+    def start_merge(self):
+        split_files = [
+            os.path.join(self.output_dir, f)
+            for f in os.listdir(self.output_dir)
+            if f.endswith("_SPLIT.xlsx")
+        ]
+
+        if not split_files:
+            messagebox.showwarning("提醒", "找不到任何 _SPLIT.xlsx！")
+            return
+
+        self.status.config(text="開始合併...")
+        self.progress["value"] = 0
+
+        self.run_stage("merge", self.process_merge_thread,
+                       split_files, self.output_dir, self.full_rebuild.get(),
+                       self.memory_mb.get() * 2**20, self.workers.get(),
+                       *self.merge_memory())
+
+    def merge_memory(self):
+        """(dtype, spill_limit) of the merged sheets, from the option widgets."""
+        return ("float32" if self.float32.get() else "float64",
+                self.spill_mb.get() * 2**20 or None)
+
+    def process_merge_thread(self, split_files, output_dir, rebuild, memory_budget, workers,
+                             dtype, spill_limit):
+        from .incremental import incremental_merge
+
+        update_status, update_progress = self.bus.callbacks("merge")
+        inst = Instrument().start()
+
+        ok, result = incremental_merge(
+            split_files,
+            output_dir,
+            batch_size=25,
+            rebuild=rebuild,
+            memory_budget=memory_budget or None,
+            dtype=dtype,
+            workers=workers,
+            spill_limit=spill_limit,
+            progress_callback=update_progress,
+            status_callback=update_status,
+            instrument=inst
+        )
+        self.save_report("merge", inst, output_dir, inputs=len(split_files), ok=ok)
+
+        if ok:
+            self.bus.publish("merge", "done", message=f"合併完成！輸出檔案：{result}")
+        else:
+            self.bus.publish("merge", "error", message=result)
+
+
+    # ============================================================
+    # SPLIT + MERGE (one shot)
+    # ============================================================
+    def start_split_merge(self):
+        if not self.selected_files:
+            messagebox.showwarning("提醒", "請先選擇要處理的 Excel 檔案！")
+            return
+
+        self.stop_prefetch()
+        self.status.config(text="開始拆分＋合併...")
+        self.progress["value"] = 0
+        self.progress["maximum"] = len(self.selected_files)
+
+        self.run_stage("split_merge", self.process_split_merge_thread,
+                       list(self.selected_files), self.output_dir,
+                       self.workers.get(), self.keep_split.get(), self.parsed_dir(),
+                       *self.merge_memory())
+
+    def process_split_merge_thread(self, files, output_dir, workers, keep_split,
+                                   parsed_dir, dtype, spill_limit):
+        from .fused import split_and_merge
+
+        update_status, update_progress = self.bus.callbacks("split_merge")
+        inst = Instrument().start()
+
+        ok, result = split_and_merge(
+            files,
+            output_dir,
+            workers=workers,
+            keep_split=keep_split,
+            plans=True,
+            dtype=dtype,
+            spill_limit=spill_limit,
+            parsed_dir=parsed_dir,
+            progress_callback=update_progress,
+            status_callback=update_status,
+            instrument=inst
+        )
+        self.save_report("split_merge", inst, output_dir, inputs=len(files), ok=ok)
+
+        if ok:
+            self.bus.publish("split_merge", "done", message=f"拆分＋合併完成！輸出檔案：{result}")
+        else:
+            self.bus.publish("split_merge", "error", message=result)
+
+
+    # ============================================================
+    # Charts (merges already draw them; this redraws an existing file)
+    # ============================================================
+    def start_charts(self):
+        excel_path = os.path.join(self.output_dir, "ALL_MERGED.xlsx")
+        if not os.path.exists(excel_path):
+            messagebox.showwarning("提醒", "ALL_MERGED.xlsx 不存在，請先執行合併！")
+            return
+
+        self.status.config(text="開始產生圖表...")
+        self.progress["value"] = 0
+
+        self.run_stage("chart", self.process_chart_thread, excel_path)
+
+    def process_chart_thread(self, excel_path):
+        from .charts import add_charts_to_merged_excel
+
+        update_status, update_progress = self.bus.callbacks("chart")
+
+        add_charts_to_merged_excel(
+            excel_path,
+            progress_callback=update_progress,
+            status_callback=update_status
+        )
+
+        self.bus.publish("chart", "done", message="所有圖表已成功產生！")
+
+    def start_previews(self):
+        excel_path = os.path.join(self.output_dir, "ALL_MERGED.xlsx")
+        if not os.path.exists(excel_path):
+            messagebox.showwarning("提醒", "ALL_MERGED.xlsx 不存在，請先執行合併！")
+            return
+
+        self.status.config(text="開始產生圖表預覽...")
+        self.progress["value"] = 0
+
+        self.run_stage("preview", self.process_preview_thread, excel_path, self.workers.get())
+
+    def process_preview_thread(self, excel_path, workers):
+        from .preview import render_previews
+
+        update_status, update_progress = self.bus.callbacks("preview")
+
+        ok, result = render_previews(
+            excel_path,
+            workers=workers,
+            progress_callback=update_progress,
+            status_callback=update_status
+        )
+
+        if not ok:
+            self.bus.publish("preview", "error", message=result)
+            return
+        webbrowser.open(pathlib.Path(result).resolve().as_uri())
+        self.bus.publish("preview", "done", message=f"圖表預覽已完成：\n{result}")
+
+# ============================================================
+# Main Entry Point
+# ============================================================
+
+def main():
+    multiprocessing.freeze_support()  # needed by the process pool in the .exe
+    root = tk.Tk()
+    App(root)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""Incremental merge: only read ALL_MERGED plus new / changed inputs."""
+
+import os
+
+from .cache import SplitSheets
+from .charts import is_chart_data_sheet, write_merged_sheet
+from .compact import compact_frame, prepend_row
+from .manifest import file_stat, content_hash, load_merge_manifest, save_merge_manifest
+from .journal import CORRUPT_ERRORS, quarantine_input
+from .merge import CELL_BYTES, batch_merge_split_files
+from .profiling import NULL
+from .reader import read_sheet_columns
+from .shard import INDEX_SHEET, ShardedWriter
+from .sharedx import is_shared_x
+from .spill import SpillStore
+from .writer import MAX_COLS
+from .zipindex import SheetIndex
+
+# ============================================================
+# Incremental Merge (manifest of already-merged inputs)
+# ============================================================
+# A rerun only reads ALL_MERGED plus the new/changed files; which columns
+# belong to which input comes from the manifest (see manifest.py).
+
+
+class _StaleManifest(Exception):
+    """ALL_MERGED.xlsx does not match its manifest → rebuild from scratch."""
+
+
+def _header_ranges(out_path, names):
+    """
+    {name: {sheet: [start, stop]}} from the file-name row of ALL_MERGED.
+    Shared-X sheets are left out: there one name is not one run of columns.
+    """
+    ranges = {n: {} for n in names}
+    wb = SheetIndex(out_path)
+    try:
+        sheets = [sh for sh in wb.sheetnames if not is_chart_data_sheet(sh)]
+        for ws in map(wb.__getitem__, sheets):
+            header = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+            if is_shared_x(header):
+                continue
+            c = 0
+            while c < len(header):
+                start, name = c, header[c]
+                while c < len(header) and header[c] == name:
+                    c += 1
+                if name in ranges:
+                    ranges[name][ws.title] = [start, c]
+    finally:
+        wb.close()
+    return ranges, sheets
+
+
+def incremental_merge(split_files, output_dir, batch_size=25, rebuild=False,
+                      charts=True, memory_budget=None, shard_mode="sheet", dtype="float64",
+                      chart_points=None, shared_x=False, workers=1, spill_limit=None,
+                      spill_dir=None, progress_callback=None, status_callback=None,
+                      instrument=None):
+    """
+    Merge _SPLIT.xlsx files into ALL_MERGED.xlsx, reusing the previous result:
+    - unchanged inputs (same size+mtime, or same content hash) are kept as-is,
+    - changed inputs replace their columns in place, new ones are appended,
+    - inputs whose content duplicates another input are skipped,
+    - inputs that disappeared are dropped.
+    Inputs that cannot be read are quarantined (journal.py) and left out.
+    Columns follow the previous merge's order, new inputs after it in
+    split_files order; without a manifest, split_files order.
+    workers: processes for the batch merges and the final merge (merge.py).
+    spill_limit / spill_dir: merged sheets past spill_limit bytes are built in
+    memory-mapped files (spill.py) by the batch and final merges.
+    Falls back to a full batch merge when there is no usable manifest, when
+    rebuild=True, when most of the inputs are new anyway, when the result
+    is (or would become) sharded past Excel's column limit, or when it has
+    (or switches to) the shared-X layout.
+    """
+
+    inst = instrument or NULL
+    out_path = os.path.join(output_dir, "ALL_MERGED.xlsx")
+    manifest = None if rebuild else load_merge_manifest(output_dir)
+    if manifest and manifest.get("shared_x", False) != shared_x:
+        manifest = None  # other column layout: nothing can be reused
+    old = {e["path"]: e for e in manifest["inputs"]} if manifest else {}
+
+    # ---------- classify inputs ----------
+    if status_callback:
+        status_callback("比對 manifest（檢查新增／變更檔案）…")
+
+    candidates = []
+    for f in split_files:
+        path = os.path.abspath(f)
+        size, mtime = file_stat(path)
+        e = old.get(path)
+        if e and e["size"] == size and e["mtime"] == mtime:
+            h = e["sha256"]
+        else:
+            with inst.timer("read", file=os.path.basename(path).replace("_SPLIT.xlsx", "")):
+                h = content_hash(path)
+        candidates.append({"path": path,
+                           "name": os.path.basename(path).replace("_SPLIT.xlsx", ""),
+                           "size": size, "mtime": mtime, "sha256": h})
+
+    # already-merged inputs first, so a new copy never displaces them
+    candidates.sort(key=lambda c: c["path"] not in old
+                    or old[c["path"]]["sha256"] != c["sha256"])
+
+    kept, added, duplicates, seen = [], [], {}, {}
+    for c in candidates:
+        if c["sha256"] in seen:
+            duplicates[c["path"]] = seen[c["sha256"]]
+            continue
+        seen[c["sha256"]] = c["path"]
+        e = old.get(c["path"])
+        if e and e["sha256"] == c["sha256"]:
+            c["columns"] = e["columns"]
+            kept.append(c)
+        else:
+            added.append(c)
+
+    if manifest and not added and len(kept) == len(old):
+        save_merge_manifest(output_dir, kept, manifest["sheets"], duplicates, shared_x)
+        if status_callback:
+            status_callback("沒有新的檔案，ALL_MERGED.xlsx 已是最新")
+        return True, out_path
+
+    if duplicates and status_callback:
+        status_callback(f"略過 {len(duplicates)} 個內容重複的檔案")
+
+    # already-merged inputs keep their place (a changed one its old columns),
+    # new ones go after them; the append and the full rebuild share this order
+    rank = {e["path"]: i for i, e in enumerate(manifest["inputs"])} if manifest else {}
+    inputs = sorted(kept + added, key=lambda e: rank.get(e["path"], len(rank)))
+
+    # ---------- incremental append ----------
+    if manifest and kept and len(added) <= len(kept) and not manifest.get("shared_x") \
+            and INDEX_SHEET not in manifest["sheets"]:
+        try:
+            sheets = _append_to_merged(out_path, manifest["sheets"], inputs, added,
+                                       charts, chart_points, dtype, spill_limit,
+                                       spill_dir, progress_callback, status_callback,
+                                       instrument)
+            save_merge_manifest(output_dir, inputs, sheets, duplicates)
+            return True, out_path
+        except _StaleManifest:
+            if status_callback:
+                status_callback("ALL_MERGED.xlsx 與 manifest 不符，改為完整重建…")
+
+    # ---------- full rebuild ----------
+    for e in inputs:
+        e.pop("columns", None)
+
+    ok, result = batch_merge_split_files(
+        [e["path"] for e in inputs], output_dir, batch_size=batch_size, charts=charts,
+        memory_budget=memory_budget, shard_mode=shard_mode, dtype=dtype,
+        chart_points=chart_points, shared_x=shared_x, resume=not rebuild, workers=workers,
+        spill_limit=spill_limit, spill_dir=spill_dir, progress_callback=progress_callback,
+        status_callback=status_callback, instrument=instrument)
+    if not ok:
+        return ok, result
+
+    inputs = [e for e in inputs if os.path.exists(e["path"])]  # not quarantined
+    ranges, sheets = _header_ranges(result, [e["name"] for e in inputs])
+    for e in inputs:
+        e["columns"] = ranges[e["name"]]
+    save_merge_manifest(output_dir, inputs, sheets, duplicates, shared_x)
+    return ok, result
+
+
+def _column_passes(ranges, rows, limit=None):
+    """
+    ranges cut into consecutive groups, each read in one pass over the
+    sheet: all in one (limit None), or about limit bytes of converted
+    cells per pass.
+    """
+    if limit is None or not rows:
+        return [ranges]
+    passes, cur, size = [], [], 0
+    for start, stop in ranges:
+        need = (stop - start) * rows * CELL_BYTES
+        if cur and size + need > limit:
+            passes.append(cur)
+            cur, size = [], 0
+        cur.append((start, stop))
+        size += need
+    if cur:
+        passes.append(cur)
+    return passes
+
+
+def _kept_parts(wb, sh, kept, rows, dtype, spill_limit, inst):
+    """
+    (entry, compacted columns) for each kept input, read from ALL_MERGED
+    one column range per input; with spill_limit, in passes of about that
+    many bytes, so no more of the old sheet is in memory at once.
+    """
+    if any(sh not in e["columns"] for e in kept):
+        raise _StaleManifest()
+    entries = iter(kept)
+    for group in _column_passes([tuple(e["columns"][sh]) for e in kept], rows, spill_limit):
+        with inst.timer("read", sheet=sh):
+            frames, width = read_sheet_columns(wb, sh, group)
+        for (start, stop), frame in zip(group, frames):
+            e = next(entries)
+            with inst.timer("transform", sheet=sh):
+                part = compact_frame(frame, dtype)
+            del frame
+            if stop > width or any(v != e["name"] for v in part.row(0)):
+                raise _StaleManifest()
+            yield e, part
+        del frames
+
+
+def _append_to_merged(out_path, sheet_order, inputs, added, charts=True, chart_points=None,
+                      dtype="float64", spill_limit=None, spill_dir=None,
+                      progress_callback=None, status_callback=None, instrument=None):
+    """
+    Rewrite ALL_MERGED with the inputs in their order: the kept ones from
+    their column ranges, the added ones (new or changed) from their files,
+    one sheet at a time (cache.SplitSheets). Unreadable added inputs are quarantined and removed from inputs
+    and added. Sheets are compacted to dtype and joined like the final
+    merge does (compact.py, spill.py), so an append writes what a full
+    rebuild of the same inputs would.
+    """
+
+    inst = instrument or NULL
+    out_dir = os.path.dirname(out_path)
+    sources = {}  # the added files, read one sheet at a time below
+
+    def quarantine(e, exc):
+        if e["path"] in sources:
+            sources.pop(e["path"]).close()
+        dest = quarantine_input(e["path"], out_dir)
+        if status_callback:
+            status_callback(f"無法讀取，已移至 {dest}：{type(exc).__name__}: {exc}")
+        added.remove(e)
+        inputs.remove(e)
+
+    tmp_path = out_path + ".tmp.xlsx"
+    wb = SheetIndex(out_path)
+    try:
+        if [sh for sh in wb.sheetnames if not is_chart_data_sheet(sh)] != sheet_order:
+            raise _StaleManifest()
+
+        for e in list(added):
+            try:
+                sources[e["path"]] = SplitSheets(e["path"], dtype)
+            except CORRUPT_ERRORS as exc:
+                quarantine(e, exc)
+        kept = [e for e in inputs if e["path"] not in sources]
+        common = [sh for sh in sheet_order
+                  if all(sh in src.sheetnames for src in sources.values())]
+
+        # the entries only get their new ranges once ALL_MERGED is replaced: a
+        # stale manifest falls back to a full rebuild with the entries as they were
+        columns = {e["path"]: {} for e in inputs}
+        writer = ShardedWriter(tmp_path)
+
+        for cur, sh in enumerate(common, start=1):
+            if status_callback:
+                status_callback(f"增量合併 → {sh}")
+
+            with SpillStore(spill_limit, spill_dir or out_dir, dtype) as store:
+                parts = _kept_parts(wb, sh, kept, wb[sh].max_row, dtype, spill_limit, inst)
+                pos = 0
+                for e in inputs:
+                    if e["path"] in sources:
+                        with inst.timer("read", sheet=sh, file=e["name"]):
+                            try:
+                                block = sources[e["path"]].read(sh)
+                            except CORRUPT_ERRORS as exc:
+                                # sheets already written hold it: rebuild without it
+                                quarantine(e, exc)
+                                raise _StaleManifest()
+                        with inst.timer("transform", sheet=sh):
+                            part = prepend_row(block, [e["name"]] * block.shape[1])
+                        del block
+                    else:
+                        part = next(parts)[1]
+                    width = part.shape[1]
+                    store.append(part)
+                    del part
+                    columns[e["path"]][sh] = [pos, pos + width]
+                    pos += width
+                if pos > MAX_COLS:  # too wide after the append → full rebuild shards it
+                    raise _StaleManifest()
+
+                with inst.timer("transform", sheet=sh):
+                    merged = store.sheet()
+                if store.spilled:
+                    inst.count("spilled_sheets", sheet=sh)
+                inst.count("cells", merged.size, sheet=sh)
+                with inst.timer("write", sheet=sh):
+                    write_merged_sheet(writer, sh, merged, charts, chart_points)
+                del merged
+
+            if progress_callback:
+                progress_callback(cur, len(common))
+
+        with inst.timer("write"):
+            writer.close()
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        wb.close()
+        for src in sources.values():
+            src.close()
+
+    os.replace(tmp_path, out_path)
+
+    for e in inputs:
+        e["columns"] = columns[e["path"]]
+    return common
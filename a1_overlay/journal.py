@@ -0,0 +1,119 @@
+"""MERGE_BATCH.journal.json: which batches of a merge are complete."""
+
+import json
+import os
+import shutil
+import zipfile
+import zlib
+
+from .cache import split_cache_dir
+from .manifest import file_stat
+
+# ============================================================
+# Batch Journal (resume an interrupted batch merge)
+# ============================================================
+# MERGE_BATCH.journal.json, next to the batch files:
+#   {"settings":    {"dtype": "float64", "shared_x": false},
+#    "batches":     {"MERGE_BATCH_1.xlsx": {"output": [size, mtime],
+#                                           "inputs": [[path, size, mtime], …]}},
+#    "quarantined": {path: error}}
+#
+# A batch file is written under a temporary name and renamed once it is
+# complete, then recorded (the journal is replaced by rename as well). A
+# rerun with the same settings takes a batch from the journal when the batch
+# file and every one of its inputs still have the recorded size and mtime;
+# everything else is merged again. _SPLIT.xlsx files that cannot be read are
+# moved to _quarantine/ and the merge goes on without them.
+
+JOURNAL_NAME = "MERGE_BATCH.journal.json"
+QUARANTINE_DIR = "_quarantine"
+
+# what a broken xlsx / cache raises while it is read (ParseError is a SyntaxError)
+CORRUPT_ERRORS = (zipfile.BadZipFile, zlib.error, KeyError, ValueError, EOFError,
+                  SyntaxError)
+
+
+def quarantine_input(path, output_dir):
+    """Move a broken _SPLIT.xlsx (and its columnar cache) to output_dir/_quarantine/."""
+    dest_dir = os.path.join(output_dir, QUARANTINE_DIR)
+    os.makedirs(dest_dir, exist_ok=True)
+    for src in (path, split_cache_dir(path)):
+        if not os.path.exists(src):
+            continue
+        dest = os.path.join(dest_dir, os.path.basename(src))
+        if os.path.isdir(dest):
+            shutil.rmtree(dest)
+        elif os.path.exists(dest):
+            os.remove(dest)
+        shutil.move(src, dest)
+    return os.path.join(dest_dir, os.path.basename(path))
+
+
+class CorruptInput(Exception):
+    """A _SPLIT.xlsx could not be read; .path, .error (message)."""
+
+    def __init__(self, path, error):
+        super().__init__(path, error)  # args survive the trip back from a worker
+        self.path = path
+        self.error = error
+
+    def __str__(self):
+        return f"{self.path}: {self.error}"
+
+
+class BatchJournal:
+    """
+    Checkpoints of one batch merge in output_dir. settings (the options that
+    change a batch file's content) must match for old entries to count;
+    resume=False starts a new journal.
+    """
+
+    def __init__(self, output_dir, settings, resume=True):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, JOURNAL_NAME)
+        self.settings = settings
+        self.batches = {}
+        self.quarantined = {}
+        if resume:
+            try:
+                with open(self.path, encoding="utf-8") as fp:
+                    journal = json.load(fp)
+                if journal["settings"] == settings:
+                    self.batches = journal["batches"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def completed(self, batch_output):
+        """Inputs of batch_output if it is a complete, unchanged batch, else None."""
+        e = self.batches.get(os.path.basename(batch_output))
+        if not e:
+            return None
+        try:
+            if list(file_stat(batch_output)) != e["output"]:
+                return None
+            if any(list(file_stat(p)) != [size, mtime] for p, size, mtime in e["inputs"]):
+                return None
+        except OSError:
+            return None
+        return [p for p, _, _ in e["inputs"]]
+
+    def record(self, batch_output, inputs):
+        self.batches[os.path.basename(batch_output)] = {
+            "output": list(file_stat(batch_output)),
+            "inputs": [[os.path.abspath(f), *file_stat(f)] for f in inputs],
+        }
+        self._save()
+
+    def quarantine(self, path, error):
+        """quarantine_input, recorded in the journal."""
+        dest = quarantine_input(path, self.output_dir)
+        self.quarantined[os.path.abspath(path)] = error
+        self._save()
+        return dest
+
+    def _save(self):
+        journal = {"settings": self.settings, "batches": self.batches,
+                   "quarantined": self.quarantined}
+        with open(self.path + ".tmp", "w", encoding="utf-8") as fp:
+            json.dump(journal, fp, ensure_ascii=False, indent=1)
+        os.replace(self.path + ".tmp", self.path)
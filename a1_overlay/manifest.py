@@ -0,0 +1,69 @@
+"""ALL_MERGED.manifest.json: which inputs are merged, and where."""
+
+import hashlib
+import json
+import os
+import zipfile
+
+# ============================================================
+# Merge manifest
+# ============================================================
+# ALL_MERGED.manifest.json records, for every merged _SPLIT.xlsx, its path,
+# size, mtime, content hash and the [start, stop) columns it occupies in each
+# ALL_MERGED sheet. In the shared-X layout (shared_x=true) an input's columns
+# are spread over the X groups, so no ranges are recorded for those sheets
+# and such a manifest is only used to skip a rerun with nothing new.
+
+MANIFEST_NAME = "ALL_MERGED.manifest.json"
+
+
+def content_hash(path):
+    """
+    Hash of an xlsx's content: name, CRC and size of every zip member except
+    docProps/ (creation time), so re-splitting the same data gives the same hash.
+    """
+    h = hashlib.sha256()
+    try:
+        with zipfile.ZipFile(path) as z:
+            for info in sorted(z.infolist(), key=lambda i: i.filename):
+                if not info.filename.startswith("docProps/"):
+                    h.update(f"{info.filename}\0{info.CRC}\0{info.file_size}\n".encode())
+    except zipfile.BadZipFile:
+        with open(path, "rb") as fp:
+            for chunk in iter(lambda: fp.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def file_stat(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime
+
+
+def load_merge_manifest(output_dir):
+    """The manifest, or None if missing or ALL_MERGED.xlsx changed since."""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    out_path = os.path.join(output_dir, "ALL_MERGED.xlsx")
+    try:
+        with open(path, encoding="utf-8") as fp:
+            manifest = json.load(fp)
+        if list(file_stat(out_path)) != manifest["output"]:
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    return manifest
+
+
+def save_merge_manifest(output_dir, inputs, sheets, duplicates, shared_x=False):
+    out_path = os.path.join(output_dir, "ALL_MERGED.xlsx")
+    manifest = {
+        "output": list(file_stat(out_path)),
+        "sheets": sheets,
+        "inputs": inputs,
+        "duplicates": duplicates,
+        "shared_x": shared_x,
+    }
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as fp:
+        json.dump(manifest, fp, ensure_ascii=False, indent=1)
+    os.replace(path + ".tmp", path)
@@ -0,0 +1,543 @@
+"""Batch merge (_SPLIT → MERGE_BATCH_n) and final merge (→ ALL_MERGED)."""
+
+import os
+import shutil
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from .cache import SplitSheets
+from .charts import write_merged_sheet
+from .compact import compact_frame, hstack, prepend_row
+from .journal import CORRUPT_ERRORS, JOURNAL_NAME, BatchJournal, CorruptInput
+from .profiling import NULL, Instrument
+from .reader import read_sheet_frame
+from .sharedx import has_xy_pairs, share_x
+from .spill import SpillStore, from_segment, segment_alloc, to_segment
+from .utils import current_rss, sanitize
+from .shard import ShardedWriter
+from .writer import MAX_COLS, StreamWriter
+from .zipindex import SheetIndex
+
+# ============================================================
+# Batch Merge Logic (Stable, Keep Sheet Order)
+# ============================================================
+
+# ---------- memory budget: estimate, batch sizing, RSS ----------
+
+CELL_BYTES = 40        # object-dtype DataFrame cell: pointer + boxed value
+MERGE_OVERHEAD = 1.5   # extra copies made while concatenating one sheet
+
+
+def cell_bytes(dtype=None):
+    """Bytes per cached cell: a CompactSheet body cell, or an object cell."""
+    return np.dtype(dtype).itemsize if dtype else CELL_BYTES
+
+
+def file_dimensions(split_path):
+    """
+    (cells of the largest sheet, widest sheet) of a _SPLIT.xlsx, from the
+    dimension record at the top of every sheet part (no cell is parsed).
+    """
+    with SheetIndex(split_path) as idx:
+        dims = [((ws.max_row or 0), (ws.max_column or 0)) for ws in idx.worksheets]
+    return max((r * c for r, c in dims), default=0), max((c for _, c in dims), default=0)
+
+
+def estimate_file_memory(split_path, dtype=None):
+    """
+    Rough in-memory size (bytes) a _SPLIT.xlsx adds to a batch: the merge
+    holds one sheet of every file at a time, so its largest sheet.
+    """
+    return int(file_dimensions(split_path)[0] * cell_bytes(dtype) * MERGE_OVERHEAD)
+
+
+def plan_batches(split_files, batch_size=25, memory_budget=None, estimates=None,
+                 widths=None):
+    """
+    Consecutive batches of split_files (order is kept, it is the column order).
+    Without memory_budget: fixed batch_size. With it: as many files per batch
+    as fit in the budget (always at least one).
+    widths (widest sheet per file): also keep every batch sheet within
+    Excel's column limit.
+    """
+    batches, cur, used, cols = [], [], 0, 0
+    for f in split_files:
+        need = estimates[f] if memory_budget else 1
+        width = widths[f] if widths else 0
+        if cur and (used + need > (memory_budget or batch_size) or cols + width > MAX_COLS):
+            batches.append(cur)
+            cur, used, cols = [], 0, 0
+        cur.append(f)
+        used += need
+        cols += width
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+def _merge_batch(b, batch_files, batch_output, dtype="float64", shared_x=False,
+                 spill_limit=None, spill_dir=None, status_callback=None, instrument=None):
+    """
+    Merge batch b (0-based) into batch_output (written under a temporary name and
+    renamed when complete). → peak RSS seen. Raises CorruptInput for a
+    file that cannot be read; nothing is left behind then.
+    spill_limit / spill_dir: see SpillStore (default folder: next to batch_output).
+    """
+    inst = instrument or NULL
+    peak = current_rss()
+    tag = f"MERGE_BATCH_{b+1}"  # instrument scope
+
+    # Index every file of this batch (sheet → XML part, or columnar cache if fresh);
+    # the merge is sheet-major and reads exactly one sheet of every file at a time
+    bases = {f: os.path.basename(f).replace("_SPLIT.xlsx", "") for f in batch_files}
+    tmp_path = batch_output + ".tmp.xlsx"
+    sources = {}
+    try:
+        for f in batch_files:
+            with inst.timer("read", file=bases[f], batch=tag):
+                try:
+                    sources[f] = SplitSheets(f, dtype)
+                except CORRUPT_ERRORS as e:
+                    raise CorruptInput(f, f"{type(e).__name__}: {e}") from e
+
+        # Determine sheet order using the first file of the batch
+        base_order = sources[batch_files[0]].sheetnames
+
+        # Find common sheets across all files in this batch
+        common = set(base_order)
+        for f in batch_files:
+            common &= set(sources[f].sheetnames)
+
+        writer = StreamWriter(tmp_path)
+
+        for sh in base_order:
+            if sh not in common:
+                continue
+
+            if status_callback:
+                status_callback(f"批次 {b+1} → 合併 Sheet：{sh}")
+
+            with SpillStore(spill_limit, spill_dir or os.path.dirname(batch_output),
+                            dtype) as store:
+                for f in batch_files:
+                    with inst.timer("read", file=bases[f], sheet=sh, batch=tag):
+                        try:
+                            block = sources[f].read(sh)
+                        except CORRUPT_ERRORS as e:
+                            raise CorruptInput(f, f"{sh}: {type(e).__name__}: {e}") from e
+                        store.append(block)
+                    inst.count("cache_bytes", block.nbytes, file=bases[f], batch=tag)
+                    del block
+                peak = max(peak, current_rss())
+                if store.spilled:
+                    inst.count("spilled_sheets", sheet=sh, batch=tag)
+
+                with inst.timer("transform", sheet=sh, batch=tag):
+                    merged = store.sheet()
+
+                    # Create a header row containing filenames (per two columns)
+                    header_row = []
+                    per_file_width = merged.shape[1] // len(batch_files)
+                    for f in batch_files:
+                        header_row += [bases[f]] * per_file_width
+
+                    final_df = prepend_row(merged, header_row)
+                    name = sanitize(sh)
+                    if shared_x and has_xy_pairs(name):
+                        final_df = share_x(final_df, alloc=store.alloc)
+                peak = max(peak, current_rss())
+                inst.count("cells", final_df.size, sheet=sh, batch=tag)
+
+                # Write into sheet
+                with inst.timer("write", sheet=sh, batch=tag):
+                    writer.write_frame(final_df, name)
+                del merged, final_df
+
+        with inst.timer("write", batch=tag):
+            writer.close()
+        os.replace(tmp_path, batch_output)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        for src in sources.values():
+            src.close()
+
+    return max(peak, current_rss())
+
+
+def _batch_job(b, batch_files, batch_output, dtype, shared_x, spill_limit=None,
+               spill_dir=None, instrumented=False):
+    """Worker entry point for one batch → (peak RSS, Instrument state or None)."""
+    inst = Instrument() if instrumented else None
+    peak = _merge_batch(b, batch_files, batch_output, dtype, shared_x, spill_limit,
+                        spill_dir, instrument=inst)
+    return peak, inst.state() if inst else None
+
+
+def batch_merge_split_files(split_files, output_dir, batch_size=25, charts=True,
+                            memory_budget=None, shard_mode="sheet", dtype="float64",
+                            chart_points=None, shared_x=False, resume=True, workers=1,
+                            spill_limit=None, spill_dir=None, final_merge=True,
+                            batch_callback=None, progress_callback=None,
+                            status_callback=None, instrument=None):
+    """
+    Merge _SPLIT.xlsx files in batches (MERGE_BATCH_n.xlsx), then merge the
+    batches into ALL_MERGED.xlsx.
+
+    memory_budget (bytes): size every batch from the estimated footprint of
+    its files instead of the fixed batch_size. batch_callback receives a dict
+    per batch {batch, files, estimated_bytes, peak_rss, seconds} for tuning.
+    Batches never exceed Excel's column limit; ALL_MERGED sheets that do are
+    sharded (shard_mode, see shard.py).
+    dtype ("float64" / "float32"): numeric body of the cached sheets
+    (compact.py); the merges run on those arrays.
+    chart_points: downsample charted series (see charts.py).
+    shared_x: store every distinct X column once per sheet (see sharedx.py).
+    resume: keep the batches an interrupted run completed (journal.py);
+    unreadable inputs are quarantined either way.
+    workers > 1: merge independent batches on a process pool (memory_budget
+    is then shared by the batches running at once) and read the final merge
+    on it too (see merge_final_batches).
+    spill_limit (bytes): a merged sheet whose blocks add up to more than this
+    is assembled in memory-mapped files under spill_dir (default: output_dir)
+    instead of RAM (spill.py); the output is the same.
+    final_merge=False: stop after the batches → (True, [MERGE_BATCH files]).
+    instrument (profiling.Instrument) collects read/transform/write timers.
+    """
+
+    inst = instrument or NULL
+    journal = BatchJournal(output_dir, {"dtype": dtype, "shared_x": shared_x}, resume)
+
+    def quarantine(f, error):
+        dest = journal.quarantine(f, error)
+        if status_callback:
+            status_callback(f"無法讀取，已移至 {dest}：{error}")
+
+    dims = {}
+    with inst.timer("read"):
+        for f in split_files:
+            try:
+                dims[f] = file_dimensions(f)
+            except CORRUPT_ERRORS as e:
+                quarantine(f, f"{type(e).__name__}: {e}")
+    split_files = [f for f in split_files if f in dims]
+
+    per_cell = cell_bytes(dtype) * MERGE_OVERHEAD
+    estimates = {f: int(cells * per_cell) for f, (cells, _) in dims.items()}
+    widths = {f: width for f, (_, width) in dims.items()}
+
+    # a batch the journal has (same files, from here on) is kept as it is,
+    # everything else is planned as usual
+    batch_budget = memory_budget
+    if memory_budget and workers > 1:
+        batch_budget = memory_budget / workers  # `workers` batches run at once
+    batches, rest = [], split_files
+    while rest:
+        done = journal.completed(os.path.join(output_dir, f"MERGE_BATCH_{len(batches) + 1}.xlsx"))
+        if done and [os.path.abspath(f) for f in rest[:len(done)]] == done:
+            n = len(done)
+        else:
+            n = len(plan_batches(rest, batch_size, batch_budget, estimates, widths)[0])
+        batches.append(rest[:n])
+        rest = rest[n:]
+
+    total_batches = len(batches)
+    outputs = {}  # batch index → MERGE_BATCH file
+    global_step = 0
+    global_total_steps = len(split_files)  # For UI progress
+
+    def advance(batch_files):
+        nonlocal global_step
+        global_step += len(batch_files)
+        if progress_callback:
+            progress_callback(global_step, global_total_steps)
+
+    def finished(b, planned, merged_files, peak, seconds):
+        tag = f"MERGE_BATCH_{b+1}"
+        batch_output = os.path.join(output_dir, f"{tag}.xlsx")
+        journal.record(batch_output, merged_files)
+        outputs[b] = batch_output
+
+        inst.count("files", len(merged_files), batch=tag)
+        report = {
+            "batch": b + 1,
+            "files": len(merged_files),
+            "estimated_bytes": sum(estimates[f] for f in merged_files),
+            "peak_rss": peak,
+            "seconds": seconds,
+        }
+        if status_callback:
+            status_callback(f"批次 {b+1} 完成：{len(merged_files)} 檔，"
+                            f"峰值記憶體 {peak / 2**20:.0f} MB")
+        if batch_callback:
+            batch_callback(report)
+        advance(planned)
+
+    todo = []  # (b, planned files, files still to merge)
+    for b, batch_files in enumerate(batches):
+        batch_output = os.path.join(output_dir, f"MERGE_BATCH_{b+1}.xlsx")
+        if journal.completed(batch_output) == [os.path.abspath(f) for f in batch_files]:
+            if status_callback:
+                status_callback(f"批次 {b+1}/{total_batches} 已完成（{JOURNAL_NAME}），略過")
+            inst.count("batches_resumed", batch=f"MERGE_BATCH_{b+1}")
+            outputs[b] = batch_output
+            advance(batch_files)
+        else:
+            todo.append((b, batch_files, list(batch_files)))
+
+    if workers <= 1 or len(todo) <= 1:
+        for b, planned, merged_files in todo:
+            if status_callback:
+                status_callback(f"批次 {b+1}/{total_batches}：讀取 {len(merged_files)} 檔案中…")
+            t0 = time.perf_counter()
+            batch_output = os.path.join(output_dir, f"MERGE_BATCH_{b+1}.xlsx")
+            while merged_files:
+                try:
+                    peak = _merge_batch(b, merged_files, batch_output, dtype, shared_x,
+                                        spill_limit, spill_dir, status_callback, instrument)
+                    break
+                except CorruptInput as e:
+                    quarantine(e.path, e.error)
+                    merged_files.remove(e.path)
+            if merged_files:
+                finished(b, planned, merged_files, peak, time.perf_counter() - t0)
+            else:
+                advance(planned)
+    else:
+        # independent batches on a process pool: at most `workers` at a time
+        # and, with a memory budget, only as many as their estimates fit in it
+        instrumented = bool(instrument and instrument.enabled)
+        queue, running = deque(todo), {}
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            while queue or running:
+                in_flight = sum(est for _, _, _, est, _ in running.values())
+                while queue and len(running) < workers:
+                    b, planned, merged_files = queue[0]
+                    est = sum(estimates[f] for f in merged_files)
+                    if running and memory_budget and in_flight + est > memory_budget:
+                        break
+                    queue.popleft()
+                    if status_callback:
+                        status_callback(f"批次 {b+1}/{total_batches}：讀取 {len(merged_files)} 檔案中…")
+                    batch_output = os.path.join(output_dir, f"MERGE_BATCH_{b+1}.xlsx")
+                    fut = pool.submit(_batch_job, b, merged_files, batch_output, dtype,
+                                      shared_x, spill_limit, spill_dir, instrumented)
+                    running[fut] = (b, planned, merged_files, est, time.perf_counter())
+                    in_flight += est
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    b, planned, merged_files, _, t0 = running.pop(fut)
+                    try:
+                        peak, state = fut.result()
+                    except CorruptInput as e:
+                        quarantine(e.path, e.error)
+                        merged_files.remove(e.path)
+                        if merged_files:
+                            queue.appendleft((b, planned, merged_files))
+                        else:
+                            advance(planned)
+                        continue
+                    if state:
+                        instrument.merge_state(state)
+                    finished(b, planned, merged_files, peak, time.perf_counter() - t0)
+
+    batch_results = [outputs[b] for b in sorted(outputs)]
+
+    if not batch_results:
+        return False, "沒有可合併的 _SPLIT.xlsx" + \
+            (f"（{len(journal.quarantined)} 個無法讀取，已隔離）" if journal.quarantined else "")
+    if not final_merge:
+        return True, batch_results
+
+    # ---------------------------------------------------------
+    # FINAL MERGE of all MERGE_BATCH_xxx → ALL_MERGED.xlsx
+    # ---------------------------------------------------------
+    if status_callback:
+        status_callback("開始最終合併所有批次結果…")
+
+    ok, result = merge_final_batches(
+        batch_results,
+        output_dir,
+        charts=charts,
+        chart_points=chart_points,
+        shared_x=shared_x,
+        shard_mode=shard_mode,
+        dtype=dtype,
+        workers=workers,
+        spill_limit=spill_limit,
+        spill_dir=spill_dir,
+        progress_callback=progress_callback,
+        status_callback=status_callback,
+        instrument=instrument
+    )
+
+    return ok, result
+
+
+# ============================================================
+# Final Merge (MERGE_BATCH → ALL_MERGED)
+# ============================================================
+
+_books = {}  # worker process: batch file → SheetIndex, kept open for every sheet
+
+
+def _book(path):
+    wb = _books.get(path)
+    if wb is None:
+        wb = _books[path] = SheetIndex(path)
+    return wb
+
+
+def _close_books():
+    """Pool initializer: a worker starts with no batch file open."""
+    _books.clear()
+
+
+def _read_block(batch_paths, sheet_name, dtype="float64", spill_limit=None,
+                segment_dir=None):
+    """
+    Worker entry point: one sheet of consecutive batch files, side by side
+    (a subtree of the final merge; hstack of hstacks is the same hstack).
+    Each batch file is indexed once per worker process (_book), not once
+    per sheet.
+    segment_dir (spilling on): the run is joined in a SpillStore and its
+    body written to a file in segment_dir; only the header and the file
+    name go back to the parent (spill.to_segment).
+    """
+    if segment_dir is None:
+        return hstack([compact_frame(read_sheet_frame(_book(path), sheet_name), dtype)
+                       for path in batch_paths], dtype)
+    with SpillStore(spill_limit, segment_dir, dtype) as store:
+        for path in batch_paths:
+            store.append(compact_frame(read_sheet_frame(_book(path), sheet_name), dtype))
+        return to_segment(store.sheet(alloc=segment_alloc(segment_dir)))
+
+
+def merge_final_batches(batch_results, output_dir, charts=True, shard_mode="sheet",
+                        dtype="float64", chart_points=None, shared_x=False, workers=1,
+                        spill_limit=None, spill_dir=None,
+                        progress_callback=None, status_callback=None, instrument=None):
+    """
+    Merge MERGE_BATCH_n.xlsx files side by side into ALL_MERGED.xlsx.
+
+    Every batch file is indexed once (zipindex.py) and kept open; each output
+    sheet is streamed from its XML part in every batch, concatenated in one
+    step and written immediately, so only one merged sheet is in memory at a
+    time and no other part of the batch files is parsed.
+    shared_x: X columns equal across batches are stored once (sharedx.py).
+    Sheets wider than Excel allows are sharded (shard_mode: "sheet" / "file").
+    Each batch sheet is compacted (dtype, see compact.py) as soon as it is
+    read, and the merge is a copy into one float array.
+
+    workers > 1: the merge is a two-level tree. The batches are cut into
+    `workers` runs of consecutive files; a process pool reads and joins the
+    runs of a sheet (the parsing is most of the work) while this process
+    joins the previous sheet's blocks and writes it. Two levels on purpose:
+    a join is one copy into a float array, far cheaper than the parsing,
+    so more levels would only add copies (and with spilling, more segment
+    files) while the parsing is already spread over every worker.
+
+    spill_limit / spill_dir: assemble a merged sheet larger than spill_limit
+    bytes in memory-mapped files (spill.py) under spill_dir (default:
+    output_dir); the writer and the charts stream it from there. With
+    workers > 1 the runs come back as segment files in that folder, so no
+    run of a spilled sheet is ever held in this process's memory.
+    """
+
+    inst = instrument or NULL
+    tags = [os.path.splitext(os.path.basename(f))[0] for f in batch_results]
+    with inst.timer("read"):
+        books = [SheetIndex(f) for f in batch_results]
+
+    pool, segment_dir = None, None
+    try:
+        base_order = books[0].sheetnames  # final sheet order is determined here
+        common = set.intersection(*(set(wb.sheetnames) for wb in books))
+
+        # final width of every sheet, known before anything is merged
+        wide = [sh for sh in base_order if sh in common
+                and sum(wb[sh].max_column or 0 for wb in books) > MAX_COLS]
+        if wide and status_callback:
+            status_callback(f"{len(wide)} 個 Sheet 超過 {MAX_COLS} 欄，將自動分段"
+                            f"（{'分頁' if shard_mode == 'sheet' else '分檔'}）")
+
+        out_path = os.path.join(output_dir, "ALL_MERGED.xlsx")
+        writer = ShardedWriter(out_path, shard_mode, status_callback)
+
+        sheets = [sh for sh in base_order if sh in common]
+        total_steps = len(sheets)
+        cur = 0
+
+        if workers > 1 and len(books) > 1:
+            n = min(workers, len(books))
+            runs = [batch_results[i * len(books) // n:(i + 1) * len(books) // n]
+                    for i in range(n)]
+            pool = ProcessPoolExecutor(max_workers=n, initializer=_close_books)
+            if spill_limit is not None:
+                segment_dir = tempfile.mkdtemp(prefix=".spill_", dir=spill_dir or output_dir)
+
+            def submit(sh):
+                return [pool.submit(_read_block, run, sh, dtype, spill_limit, segment_dir)
+                        for run in runs]
+
+            ahead = submit(sheets[0]) if sheets else None
+
+        for i, sh in enumerate(sheets):
+            if status_callback:
+                status_callback(f"最終合併 → {sh}")
+
+            segments = []
+            with SpillStore(spill_limit, spill_dir or output_dir, dtype) as store:
+                if pool:
+                    with inst.timer("read", sheet=sh):
+                        for fut in ahead:
+                            block = from_segment(fut.result())
+                            if isinstance(block.body, np.memmap):
+                                segments.append(block.body.filename)
+                            store.append(block)
+                            del block
+                    ahead = submit(sheets[i + 1]) if i + 1 < len(sheets) else None
+                else:
+                    for tag, wb in zip(tags, books):
+                        with inst.timer("read", sheet=sh, batch=tag):
+                            store.append(compact_frame(read_sheet_frame(wb, sh), dtype))
+                if store.spilled:
+                    inst.count("spilled_sheets", sheet=sh)
+                with inst.timer("transform", sheet=sh):
+                    merged = store.sheet()
+                    name = sanitize(sh)
+                    if shared_x and has_xy_pairs(name):
+                        merged = share_x(merged, alloc=store.alloc)
+                inst.count("cells", merged.size, sheet=sh)
+
+                with inst.timer("write", sheet=sh):
+                    write_merged_sheet(writer, name, merged, charts, chart_points)
+                del merged
+            for path in segments:  # this sheet's runs (Windows: may still be mapped)
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+            cur += 1
+            if progress_callback:
+                progress_callback(cur, total_steps)
+
+        with inst.timer("write"):
+            writer.close()
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+        if segment_dir:
+            shutil.rmtree(segment_dir, ignore_errors=True)
+        for wb in books:
+            wb.close()
+
+    return True, out_path
@@ -0,0 +1,101 @@
+"""Run the split over many files on a process pool."""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .profiling import Instrument
+from .split import split_excel_file
+from .utils import default_workers
+
+# ============================================================
+# Parallel Split Engine (process pool, largest first)
+# ============================================================
+
+def _split_job(job, input_path, output_dir, job_args, instrumented=False):
+    """
+    Worker entry point: run job(input_path, output_dir, *job_args), never raise.
+    instrumented=True passes the job its own Instrument and returns its state.
+    """
+    inst = Instrument() if instrumented else None
+    kwargs = {"instrument": inst} if instrumented else {}
+    t0 = time.perf_counter()
+    try:
+        out = job(input_path, output_dir, *job_args, **kwargs)
+        err = None
+    except Exception as e:
+        out = None
+        err = f"{type(e).__name__}: {e}"
+    return out, err, time.perf_counter() - t0, inst.state() if inst else None
+
+
+def split_files_parallel(input_paths, output_dir, workers=None,
+                         progress_callback=None, status_callback=None,
+                         eta_callback=None, result_callback=None,
+                         job=split_excel_file, job_args=(), instrument=None):
+    """
+    Split many workbooks on a ProcessPoolExecutor.
+
+    - Largest files are submitted first, so one big file does not end up
+      running alone at the end.
+    - Every file gives a result dict {input, output, error, seconds, bytes},
+      passed to result_callback as soon as it finishes; the full list (in
+      completion order) is returned.
+    - ETA is based on bytes processed, not files processed.
+    - workers=1 runs in this process (no pool).
+    - job(input_path, output_dir, *job_args) is what runs per file (must be
+      a module-level function); its return value becomes result["output"].
+    - instrument: each job gets its own Instrument (passed as instrument=...)
+      whose timers/counters are folded into this one when the file is done.
+    """
+
+    workers = workers or default_workers()
+    sizes = {f: os.path.getsize(f) for f in input_paths}
+    jobs = sorted(input_paths, key=lambda f: sizes[f], reverse=True)
+
+    total = len(jobs)
+    total_bytes = sum(sizes.values()) or 1
+    done_bytes = 0
+    results = []
+    start_time = time.perf_counter()
+    instrumented = bool(instrument and instrument.enabled)
+
+    def finish(f, out, err, seconds, state=None):
+        nonlocal done_bytes
+        if state:
+            instrument.merge_state(state)
+        res = {"input": f, "output": out, "error": err,
+               "seconds": seconds, "bytes": sizes[f]}
+        results.append(res)
+        done_bytes += sizes[f]
+
+        if status_callback:
+            if err:
+                status_callback(f"錯誤：{os.path.basename(f)} → {err}")
+            else:
+                status_callback(f"完成 {len(results)}/{total} → {os.path.basename(f)}")
+        if progress_callback:
+            progress_callback(len(results), total)
+        if eta_callback:
+            elapsed = time.perf_counter() - start_time
+            eta_callback(elapsed * (total_bytes - done_bytes) / max(done_bytes, 1))
+        if result_callback:
+            result_callback(res)
+
+    if workers <= 1 or total <= 1:
+        for f in jobs:
+            finish(f, *_split_job(job, f, output_dir, job_args, instrumented))
+        return results
+
+    with ProcessPoolExecutor(max_workers=min(workers, total)) as pool:
+        futures = {pool.submit(_split_job, job, f, output_dir, job_args, instrumented): f
+                   for f in jobs}
+        for fut in as_completed(futures):
+            f = futures[fut]
+            try:
+                out, err, seconds, state = fut.result()
+            except Exception as e:  # worker died (BrokenProcessPool, ...)
+                out, err, seconds, state = None, f"{type(e).__name__}: {e}", 0.0, None
+            finish(f, out, err, seconds, state)
+
+    return results
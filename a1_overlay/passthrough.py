@@ -0,0 +1,315 @@
+"""Raw passthrough: copy a sheet's XML part from the source xlsx into a written one."""
+
+import os
+import re
+import shutil
+import zipfile
+
+from openpyxl.packaging.relationship import get_rels_path
+
+from .reader import read_sheet_frame
+from .zipindex import SheetIndex
+
+# ============================================================
+# Raw Sheet Passthrough (Summary sheets copied as-is)
+# ============================================================
+# A Summary sheet is copied, not split. Reading it cell by cell and writing
+# it back costs as much as any other sheet and keeps only the values. Here
+# the split writes an empty placeholder sheet in its place, and once the
+# _SPLIT.xlsx is closed the placeholder's XML part is replaced by the source
+# sheet's own part, streamed from the source zip:
+#
+#   s="n" / style="n" / dxfId="n"   shifted onto the source's cell formats,
+#                                   fonts, fills, borders and number formats,
+#                                   appended to the output's styles.xml
+#   t="s" cells (shared strings)    become inline strings with the same rich
+#                                   text (the output has no shared strings)
+#   r:id parts (drawings, tables,   dropped: the parts they point at are not
+#   comments, external hyperlinks)  copied
+#
+# Formulas, merged cells, column widths, conditional formats and validations
+# come along untouched; no cell value is parsed. Formulas keep their cached
+# results, which is what every reader here uses (data_only); references to
+# sheets that are not in the _SPLIT.xlsx turn into #REF! only if Excel
+# recalculates.
+
+_CHUNK = 1 << 20  # sheet XML bytes per step; a step always ends after </row>
+
+_P = rb"(?:\w+:)?"  # namespace prefix of an element, if any
+
+_SHARED_CELL = re.compile(
+    rb"<(" + _P + rb")c\b([^>]*?)\st=\"s\"([^>]*)>\s*<" + _P + rb"v>\s*(\d+)\s*</"
+    + _P + rb"v>\s*</" + _P + rb"c>")
+_STYLE_ATTR = re.compile(rb"\ss=\"\d+\"")  # cells and rows (nothing else has an s)
+_COL_STYLE = re.compile(rb"\sstyle=\"\d+\"")
+_DXF_ID = re.compile(rb"\sdxfId=\"\d+\"")
+_TAB_SELECTED = re.compile(rb"\stabSelected=\"(?:1|true)\"")
+_SHEET_VIEW = re.compile(rb"<(" + _P + rb")sheetView\b")
+_ROOT = re.compile(rb"<(" + _P + rb")worksheet\b")
+
+# elements that point at other parts of the source package
+_REL_CONTAINERS = re.compile(
+    rb"<(" + _P + rb")(tableParts|oleObjects|controls)\b(?:[^>]*/>|.*?</\1\2>)", re.S)
+_REL_ELEMENTS = re.compile(rb"<" + _P + rb"\w+\b[^>]*\sr:id=\"[^\"]*\"[^>]*/>")
+_EMPTY_HYPERLINKS = re.compile(rb"<(" + _P + rb")hyperlinks\b[^>]*>\s*</\1hyperlinks>")
+
+_SI = re.compile(rb"<" + _P + rb"si\b[^>]*?(?:/>|>(.*?)</" + _P + rb"si>)", re.S)
+
+
+class RawSheet:
+    """
+    Stands in for the DataFrame of a sheet that is copied verbatim: sheet
+    title in the source workbook at path. frame() reads its values (for the
+    columnar cache and other consumers that need cells).
+    """
+
+    __slots__ = ("path", "title")
+
+    def __init__(self, path, title):
+        self.path = path
+        self.title = title
+
+    def frame(self):
+        with SheetIndex(self.path) as wb:
+            return read_sheet_frame(wb, self.title)
+
+
+# ---------- styles.xml ----------
+
+def _prefix(xml, tag):
+    m = re.search(rb"<(\w+:)?" + tag + rb"\b", xml)
+    return (m.group(1) or b"") if m else b""
+
+
+def _unprefix(xml, prefix):
+    return xml.replace(b"<" + prefix, b"<").replace(b"</" + prefix, b"</") if prefix else xml
+
+
+_CHILD = {b"numFmts": b"numFmt", b"fonts": b"font", b"fills": b"fill",
+          b"borders": b"border", b"cellStyleXfs": b"xf", b"cellXfs": b"xf", b"dxfs": b"dxf"}
+
+
+def _container(xml, tag):
+    """(match, [child elements]) of a styles.xml container (fonts, cellXfs, …)."""
+    m = re.search(rb"<" + tag + rb"\b[^>]*?(?:/>|>(.*?)</" + tag + rb">)", xml, re.S)
+    if m is None:
+        return None, []
+    child = _CHILD[tag]
+    items = re.findall(rb"<" + child + rb"\b[^>]*?(?:/>|>.*?</" + child + rb">)",
+                       m.group(1) or b"", re.S)
+    return m, items
+
+
+def _attr(xml, name):
+    m = re.search(rb"\s" + name + rb"=\"(\d+)\"", xml)
+    return int(m.group(1)) if m else None
+
+
+def _shift_attrs(xml, shifts):
+    """Rewrite the integer attributes in shifts {name: function} of one element."""
+    def sub(m):
+        return m.group(1) + str(shifts[m.group(2)](int(m.group(3)))).encode() + b'"'
+
+    names = b"|".join(re.escape(n) for n in shifts)
+    return re.sub(rb"(\s(" + names + rb")=\")(\d+)\"", sub, xml)
+
+
+def _append_children(xml, tag, items):
+    """xml with items added to the tag container (created when missing), count updated."""
+    if not items:
+        return xml
+    m, old = _container(xml, tag)
+    body = b"".join(old + items)
+    new = b"<" + tag + b' count="' + str(len(old) + len(items)).encode() + b'">' \
+        + body + b"</" + tag + b">"
+    if m is not None:
+        return xml[:m.start()] + new + xml[m.end():]
+    root = re.search(rb"<styleSheet\b[^>]*>", xml)  # only numFmts is ever missing: first child
+    return xml[:root.end()] + new + xml[root.end():]
+
+
+def merge_styles(out_xml, src_xml):
+    """
+    Append the formats of src_xml (a styles.xml) to out_xml. → (new out_xml,
+    function mapping a source cell-format index to its index in the result,
+    same for conditional formats).
+    """
+    src_xml = _unprefix(src_xml, _prefix(src_xml, b"styleSheet"))
+
+    _, out_fmts = _container(out_xml, b"numFmts")
+    _, src_fmts = _container(src_xml, b"numFmts")
+    next_id = max([_attr(f, b"numFmtId") for f in out_fmts] + [163]) + 1
+    fmt_ids = {}
+    for f in src_fmts:
+        fmt_ids[_attr(f, b"numFmtId")] = next_id
+        next_id += 1
+
+    offsets = {}
+    for tag in (b"fonts", b"fills", b"borders", b"cellStyleXfs", b"cellXfs", b"dxfs"):
+        offsets[tag] = len(_container(out_xml, tag)[1])
+    n_style_xfs = len(_container(src_xml, b"cellStyleXfs")[1])
+
+    shifts = {
+        b"numFmtId": lambda i: fmt_ids.get(i, i),  # built-in formats keep their id
+        b"fontId": lambda i: i + offsets[b"fonts"],
+        b"fillId": lambda i: i + offsets[b"fills"],
+        b"borderId": lambda i: i + offsets[b"borders"],
+        b"xfId": lambda i: i + offsets[b"cellStyleXfs"] if i < n_style_xfs else 0,
+    }
+    out_xml = _append_children(out_xml, b"numFmts",
+                               [_shift_attrs(f, shifts) for f in src_fmts])
+    for tag in (b"fonts", b"fills", b"borders", b"dxfs"):
+        items = _container(src_xml, tag)[1]
+        if tag == b"dxfs":
+            items = [_shift_attrs(d, {b"numFmtId": shifts[b"numFmtId"]}) for d in items]
+        out_xml = _append_children(out_xml, tag, items)
+    for tag in (b"cellStyleXfs", b"cellXfs"):
+        out_xml = _append_children(out_xml, tag,
+                                   [_shift_attrs(x, shifts) for x in _container(src_xml, tag)[1]])
+    # the cellStyles names stay the output's own: appended style xfs are unnamed
+
+    n_xfs = len(_container(src_xml, b"cellXfs")[1])
+    xf0, dxf0 = offsets[b"cellXfs"], offsets[b"dxfs"]
+    if not n_xfs:  # no stylesheet in the source: everything in the default format
+        return out_xml, (lambda i: 0), (lambda i: dxf0 + i)
+    return out_xml, (lambda i: xf0 + i if i < n_xfs else xf0), (lambda i: dxf0 + i)
+
+
+# ---------- the sheet part ----------
+
+def _shared_strings(archive, part):
+    """Inner XML of every <si> of a shared-strings part (prefix removed)."""
+    if part is None:
+        return []
+    data = archive.read(part)
+    prefix = _prefix(data, b"sst")
+    return [_unprefix(m.group(1) or b"", prefix) for m in _SI.finditer(data)]
+
+
+class _Shift(dict):
+    """name="n" → name="fn(n)", memoised: one dict lookup per attribute."""
+
+    def __init__(self, fn):
+        super().__init__()
+        self.fn = fn
+
+    def __missing__(self, match):
+        name, n = re.match(rb'\s(\w+)="(\d+)"', match).groups()
+        self[match] = b" " + name + b'="' + str(self.fn(int(n))).encode() + b'"'
+        return self[match]
+
+    def sub(self, pattern, data):
+        return pattern.sub(lambda m: self[m.group(0)], data)
+
+
+def _rewrite_rows(data, prefix, xf, dxf, strings):
+    def shared(m):
+        p, before, after, i = m.group(1), m.group(2), m.group(3), int(m.group(4))
+        inner = strings()[i]
+        if p:
+            inner = re.sub(rb"<(/?)(?=\w)(?!\w+:)", rb"<\1" + p, inner)
+        return (b"<" + p + b"c" + before + after + b' t="inlineStr"><' + p + b"is>"
+                + inner + b"</" + p + b"is></" + p + b"c>")
+
+    data = _SHARED_CELL.sub(shared, data)
+    data = xf.sub(_STYLE_ATTR, data)
+    # cells without a format: the source's default one (a plain replacement, no callback)
+    no_style = re.compile(rb"<" + re.escape(prefix) + rb"c(?=[\s/>])(?![^>]*\ss=\")")
+    data = no_style.sub(b"<" + prefix + b'c s="' + str(xf.fn(0)).encode() + b'"', data)
+    data = xf.sub(_COL_STYLE, data)
+    return dxf.sub(_DXF_ID, data)
+
+
+def _copy_sheet(src, part, dst, xf, dxf, strings, selected, has_rels):
+    """Stream the sheet part from src (zip file object) into dst, rewritten."""
+    xf, dxf = _Shift(xf), _Shift(dxf)
+    prefix, head, buf = None, True, b""
+    with src.open(part) as fp:
+        while True:
+            chunk = fp.read(_CHUNK)
+            buf += chunk
+            if prefix is None:
+                m = _ROOT.search(buf)
+                if m is None and chunk:
+                    continue
+                prefix = m.group(1) if m else b""
+                row_end = b"</" + prefix + b"row>"
+            cut = buf.rfind(row_end) + len(row_end) if chunk else len(buf)
+            if chunk and cut < len(row_end):
+                continue
+            data, buf = buf[:cut], buf[cut:]
+            if head:
+                data = _TAB_SELECTED.sub(b"", data)
+                if selected:
+                    data = _SHEET_VIEW.sub(lambda m: m.group(0) + b' tabSelected="1"', data,
+                                           count=1)
+                head = False
+            if not chunk and has_rels:
+                data = _REL_CONTAINERS.sub(b"", data)
+                data = _REL_ELEMENTS.sub(b"", data)
+                data = _EMPTY_HYPERLINKS.sub(b"", data)
+            dst.write(_rewrite_rows(data, prefix, xf, dxf, strings))
+            if not chunk:
+                break
+
+
+def copy_raw_sheets(out_path, raw):
+    """
+    Replace the placeholder sheets {sheet name: RawSheet} of the closed
+    workbook out_path by the source parts (see the notes above). The file is
+    rewritten under a temporary name and renamed.
+    """
+    with SheetIndex(out_path) as out:
+        targets = {out.parts[name]: sheet for name, sheet in raw.items()}
+        styles_part = out.styles
+
+    tmp_path = out_path + ".tmp"
+    sources = {}  # source path → (zip, parts, (xf, dxf, strings))
+    try:
+        with zipfile.ZipFile(out_path) as zin:
+            styles = zin.read(styles_part)
+
+            # one styles merge per source workbook
+            for sheet in raw.values():
+                if sheet.path in sources:
+                    continue
+                with SheetIndex(sheet.path) as index:
+                    parts, styles_src, strings_part = index.parts, index.styles, index.shared_strings
+                archive = zipfile.ZipFile(sheet.path)
+                sources[sheet.path] = archive, parts, None
+                styles, xf, dxf = merge_styles(
+                    styles, archive.read(styles_src) if styles_src else b"")
+                cache = []
+
+                def strings(archive=archive, part=strings_part, cache=cache):
+                    if not cache:  # only when a copied cell uses one
+                        cache.append(_shared_strings(archive, part))
+                    return cache[0]
+
+                sources[sheet.path] = archive, parts, (xf, dxf, strings)
+
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zout:
+                for info in zin.infolist():
+                    if info.filename == styles_part:
+                        zout.writestr(info, styles)
+                    elif info.filename in targets:
+                        sheet = targets[info.filename]
+                        archive, parts, rewrite = sources[sheet.path]
+                        part = parts[sheet.title]
+                        selected = _TAB_SELECTED.search(zin.read(info)) is not None
+                        has_rels = get_rels_path(part) in archive.namelist()
+                        large = archive.getinfo(part).file_size > 1 << 30
+                        with zout.open(info.filename, "w", force_zip64=large) as dst:
+                            _copy_sheet(archive, part, dst, *rewrite, selected, has_rels)
+                    else:
+                        with zin.open(info) as src, zout.open(info, "w") as dst:
+                            shutil.copyfileobj(src, dst, _CHUNK)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        for archive, _, _ in sources.values():
+            archive.close()
+    return out_path
@@ -0,0 +1,103 @@
+"""
+Split plans cached by workbook layout.
+
+Test rigs write thousands of workbooks with the same sheets and the same
+label rows (Excel row 2). The split of such a workbook is decided by that
+layout, so the plan (which columns become which output sheet) is stored
+once under a fingerprint of sheet names + label rows and replayed for every
+workbook with the same fingerprint, skipping label detection, the
+empty-block scan and the unique-name loop. Row 1 (title, run name, time
+stamp) is not part of the layout, and neither is anything but the name of
+a Summary sheet (copied as-is; its row 2 is already run data).
+"""
+
+import hashlib
+import json
+import os
+
+from pandas._libs.parsers import STR_NA_VALUES
+
+# ============================================================
+# Split Plans (layout fingerprint → persisted plan)
+# ============================================================
+# <output_dir>/.split_plans/<fingerprint>.json
+#   {"version": 1, "source": "<first workbook>", "sheets": [entry, ...]}
+#
+# one entry per source sheet, in workbook order:
+#   {"kind": "summary",  "names": [name]}
+#   {"kind": "label",    "names": [...], "blocks": [[col, name], ...]}
+#   {"kind": "fallback", "names": [...], "blocks": [[col, name], ...]}
+#   {"kind": "dynamic",  "names": [...]}   labels depend on the data → detect
+#
+# Everything that depends on more than the label rows is re-checked when a
+# plan is replayed (see split.py); a sheet that does not match is split the
+# normal way.
+
+PLAN_DIR = ".split_plans"
+PLAN_VERSION = 1
+LABEL_ROW = 1  # 0-based: Excel row 2, the row the split reads its labels from
+
+_memo = {}  # (directory, fingerprint) → plan, per process
+
+
+def plan_dir(output_dir):
+    return os.path.join(output_dir, PLAN_DIR)
+
+
+def layout_fingerprint(sheet_names, label_rows):
+    """sha1 of the sheet names and the label row of every sheet (None: not part of the layout)."""
+    payload = json.dumps([PLAN_VERSION, list(sheet_names), label_rows],
+                         default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def is_plain_label(value):
+    """
+    A text cell that pandas' parser returns unchanged (not NA, not a number,
+    not a boolean), so a label taken from it does not depend on the data.
+    """
+    if not isinstance(value, str):
+        return False
+    s = value.strip()
+    if not s or value in STR_NA_VALUES or s in STR_NA_VALUES:
+        return False
+    if s.lower() in ("true", "false"):
+        return False
+    try:
+        float(s)
+    except ValueError:
+        return True
+    return False
+
+
+def is_solid(value):
+    """A label-row cell that can never parse to NaN (a number or a plain label)."""
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return value == value
+    return is_plain_label(value)
+
+
+def load_plan(directory, fingerprint):
+    key = (directory, fingerprint)
+    if key not in _memo:
+        try:
+            with open(os.path.join(directory, f"{fingerprint}.json"), encoding="utf-8") as fp:
+                plan = json.load(fp)
+            _memo[key] = plan["sheets"] if plan.get("version") == PLAN_VERSION else None
+        except (OSError, ValueError, KeyError):
+            _memo[key] = None
+    return _memo[key]
+
+
+def save_plan(directory, fingerprint, sheets, source=None):
+    """Atomic write; safe with many worker processes saving the same plan."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{fingerprint}.json")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fp:
+        json.dump({"version": PLAN_VERSION, "source": source, "sheets": sheets},
+                  fp, ensure_ascii=False)
+    os.replace(tmp, path)
+    _memo[(directory, fingerprint)] = sheets
@@ -0,0 +1,214 @@
+"""Speculative pre-parse of selected workbooks into an on-disk LRU cache."""
+
+import functools
+import getpass
+import hashlib
+import os
+import pickle
+import re
+import stat
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from .reader import ParsedSheet, ParsedWorkbook, parse_workbook
+
+# ============================================================
+# Prefetch (parse while the user is still selecting files)
+# ============================================================
+# Files are picked in the GUI long before the split starts. The Prefetcher
+# parses the selected workbooks on a small process pool (the GUI stays
+# responsive) into
+#
+#   <tmp>/a1_overlay_parsed-<user>/<sha1(path, size, mtime)>.pkl
+#
+# holding every sheet as read_sheet_rows returns it. A split that is given
+# the cache folder (the GUI passes it; the CLI never does) opens that instead
+# of the xlsx when it exists (load_parsed), in whichever process it runs, so
+# the values are the ones the split would have read itself. An edited file
+# gets a new key; the oldest-used entries are deleted once the cache grows
+# past max_bytes.
+#
+# The entries are pickles, and loading a pickle runs code, so the folder is
+# per user, created with mode 0700, and nothing is written to or loaded from
+# it unless it (and the entry) belongs to the current user and nobody else
+# can write there (private_dir).
+
+
+def _user():
+    if hasattr(os, "getuid"):
+        return str(os.getuid())
+    return re.sub(r"[^0-9A-Za-z_.-]+", "_", getpass.getuser())
+
+
+PARSE_CACHE_DIR = os.path.join(tempfile.gettempdir(), f"a1_overlay_parsed-{_user()}")
+PREFETCH_MAX_BYTES = 2 * 2**30
+PREFETCH_WORKERS = 2
+_VERSION = 1
+
+
+def _owned(st):
+    """A stat result of something only the current user controls (POSIX)."""
+    if not hasattr(os, "getuid"):
+        return True  # Windows: the temp folder is already per user
+    return st.st_uid == os.getuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def private_dir(cache_dir=None, create=False):
+    """
+    True when cache_dir (default PARSE_CACHE_DIR) is a real folder of the
+    current user that no one else can write to; create=True makes it (0700).
+    """
+    cache_dir = cache_dir or PARSE_CACHE_DIR
+    try:
+        if create:
+            os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        st = os.lstat(cache_dir)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and _owned(st)
+
+
+def parsed_path(path, cache_dir=None):
+    """Cache entry of path for its current size + mtime (OSError if it is gone)."""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    key = hashlib.sha1(f"{path}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir or PARSE_CACHE_DIR, key + ".pkl")
+
+
+def prefetch_file(path, cache_dir=None):
+    """Worker entry point: parse path into the cache (no-op when it is there)."""
+    entry = parsed_path(path, cache_dir)
+    if os.path.exists(entry):
+        return entry
+
+    if not private_dir(os.path.dirname(entry), create=True):
+        raise PermissionError(f"parse cache folder is not private: {os.path.dirname(entry)}")
+    wb = parse_workbook(path)
+    sheets = [(ws.title, ws.rows, ws.width, ws.header) for ws in wb.worksheets]
+    tmp = f"{entry}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as fp:
+            pickle.dump((_VERSION, sheets), fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, entry)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return entry
+
+
+def load_parsed(path, cache_dir=None):
+    """
+    ParsedWorkbook of path from the cache, or None when it was not
+    prefetched or the cache is not private to the current user.
+    """
+    if not private_dir(cache_dir):
+        return None
+    try:
+        entry = parsed_path(path, cache_dir)
+        st = os.lstat(entry)
+        if not stat.S_ISREG(st.st_mode) or not _owned(st):
+            return None
+        with open(entry, "rb") as fp:
+            version, sheets = pickle.load(fp)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        return None
+    if version != _VERSION:
+        return None
+    try:
+        os.utime(entry)  # recently used: evicted last
+    except OSError:
+        pass
+    return ParsedWorkbook([ParsedSheet(*s) for s in sheets])
+
+
+def evict(cache_dir=None, max_bytes=PREFETCH_MAX_BYTES):
+    """Delete the least recently used entries until the cache fits max_bytes."""
+    cache_dir = cache_dir or PARSE_CACHE_DIR
+    entries = []
+    try:
+        for e in os.scandir(cache_dir):
+            if e.name.endswith(".pkl"):
+                st = e.stat()
+                entries.append((st.st_mtime, st.st_size, e.path))
+    except OSError:
+        return
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:  # being read right now (Windows)
+            pass
+
+
+class Prefetcher:
+    """
+    Keep the parse cache warm for the current selection:
+        update(paths)  start the files not cached yet (largest first, like
+                       the split), drop queued files no longer selected
+        cancel()       drop everything still queued (the real run starts)
+        close()        also stop the pool
+    Files that fail to parse are left to the split, which reports them.
+    """
+
+    def __init__(self, workers=PREFETCH_WORKERS, max_bytes=PREFETCH_MAX_BYTES,
+                 cache_dir=None):
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir or PARSE_CACHE_DIR
+        self._pool = None
+        self._queued = {}    # path → Future
+        self._failed = set()  # cache entries whose parse raised
+        self._lock = threading.RLock()  # Future.cancel() runs _done inline
+
+    def update(self, paths):
+        with self._lock:
+            wanted = set(paths)
+            for p, fut in list(self._queued.items()):
+                if p not in wanted:
+                    fut.cancel()
+
+            todo = []
+            for p in wanted:
+                try:
+                    entry = parsed_path(p, self.cache_dir)
+                    size = os.path.getsize(p)
+                except OSError:
+                    continue
+                if p not in self._queued and entry not in self._failed \
+                        and not os.path.exists(entry):
+                    todo.append((size, p, entry))
+            if not todo or not private_dir(self.cache_dir, create=True):
+                return
+
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            for _, p, entry in sorted(todo, reverse=True):
+                fut = self._pool.submit(prefetch_file, p, self.cache_dir)
+                self._queued[p] = fut
+                fut.add_done_callback(functools.partial(self._done, p, entry))
+
+    def _done(self, path, entry, fut):
+        with self._lock:
+            if self._queued.get(path) is fut:
+                del self._queued[path]
+            if fut.cancelled():
+                return
+            if fut.exception() is not None:
+                self._failed.add(entry)
+                return
+        evict(self.cache_dir, self.max_bytes)
+
+    def cancel(self):
+        self.update(())
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
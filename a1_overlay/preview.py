@@ -0,0 +1,202 @@
+"""Offline chart previews: PNG/SVG images of every ALL_MERGED sheet plus an HTML index."""
+
+import html
+import importlib.util
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .charts import (CHART_FIRST_ROW, CHART_HEIGHT, CHART_MAX_SERIES, CHART_WIDTH,
+                     chart_series, is_chart_data_sheet, series_values)
+from .compact import compact_frame
+from .downsample import downsample_series
+from .profiling import NULL, Instrument
+from .reader import read_sheet_frame
+from .shard import INDEX_SHEET
+from .sharedx import has_xy_pairs
+from .utils import default_workers
+from .zipindex import SheetIndex
+
+# ============================================================
+# Chart Previews (matplotlib, no Excel)
+# ============================================================
+# Looking at the curves used to mean opening ALL_MERGED.xlsx in Excel. The
+# preview draws the same charts headless, one image per chart:
+#
+#   <dir>/ALL_MERGED_preview/index.html        every sheet, its charts inline
+#                            003_<sheet>_1.png  chart 1 of the 3rd sheet …
+#
+# Same layout as the native charts (charts.py): the series chart_series
+# finds, at most 200 per chart, log X axis from 100, major + minor grid
+# lines, legend at the bottom, 900 x 500 pt. Every sheet is read (only its
+# own XML part, zipindex.py) and drawn in a worker process; series are
+# reduced to `points` points with log-X LTTB first, which looks the same at
+# this size and keeps thousands of series quick. Needs matplotlib (optional).
+
+PREVIEW_FORMATS = ("png", "svg")
+PREVIEW_POINTS = 2000
+PREVIEW_DPI = 96
+
+_INDEX = "index.html"
+
+
+def preview_dir(excel_path):
+    """<dir>/<workbook>_preview next to the workbook."""
+    stem = os.path.splitext(os.path.basename(excel_path))[0]
+    return os.path.join(os.path.dirname(os.path.abspath(excel_path)), f"{stem}_preview")
+
+
+def _image_name(i, sheet_name, n, fmt):
+    return f"{i:03d}_{re.sub(r'[^0-9A-Za-z_.()-]+', '_', sheet_name)}_{n}.{fmt}"
+
+
+def _series_name(label, k):
+    """Legend entry: the row-1 cell of the Y column, like the Excel series name."""
+    if label is None or label == "" or (isinstance(label, float) and label != label):
+        return f"Series {k + 1}"
+    return str(label)
+
+
+def _draw_chart(path, title, names, pairs, dpi):
+    from matplotlib.figure import Figure  # optional dependency
+
+    fig = Figure(figsize=(CHART_WIDTH / 72, CHART_HEIGHT / 72))
+    ax = fig.add_subplot()
+    for name, (x, y) in zip(names, pairs):
+        ax.plot(x, y, linewidth=0.8, label=name)
+
+    ax.set_title(title)
+    ax.set_xscale("log")
+    ax.set_xlim(left=100)
+    ax.minorticks_on()
+    ax.grid(True, which="major", linewidth=0.6)
+    ax.grid(True, which="minor", linewidth=0.3, alpha=0.5)
+    if names:
+        ax.legend(loc="upper center", bbox_to_anchor=(0.5, -0.08), ncol=min(len(names), 8),
+                  fontsize=6, frameon=False)
+    fig.savefig(path, dpi=dpi, bbox_inches="tight")
+
+
+def _render_sheet(excel_path, i, sheet_name, out_dir, fmt, points, instrumented=False):
+    """
+    Worker entry point: draw the charts of sheet i, never raise.
+    → (image files, series count, error, Instrument state or None)
+    """
+    inst = Instrument() if instrumented else NULL
+    try:
+        with inst.timer("read", sheet=sheet_name):
+            with SheetIndex(excel_path) as wb:
+                frame = compact_frame(read_sheet_frame(wb, sheet_name))
+        series = chart_series(frame)
+        row0 = frame.row(0) if series else []
+
+        images = []
+        for n, start in enumerate(range(0, len(series), CHART_MAX_SERIES)):
+            group = series[start:start + CHART_MAX_SERIES]
+            with inst.timer("transform", sheet=sheet_name):
+                pairs = series_values(frame, group, CHART_FIRST_ROW)
+                pairs = downsample_series(pairs, points or max(len(x) for x, _ in pairs))
+            names = [_series_name(row0[y], start + k) for k, (_, y, _) in enumerate(group)]
+            name = _image_name(i, sheet_name, n + 1, fmt)
+            with inst.timer("write", sheet=sheet_name):
+                _draw_chart(os.path.join(out_dir, name), f"Chart {n + 1}", names, pairs,
+                            PREVIEW_DPI)
+            images.append(name)
+        return images, len(series), None, inst.state() if instrumented else None
+    except Exception as e:
+        return [], 0, f"{type(e).__name__}: {e}", inst.state() if instrumented else None
+
+
+def _write_index(path, title, sheets):
+    """sheets: [(sheet name, images, series count, error)] in workbook order."""
+    esc = html.escape
+    out = ["<!DOCTYPE html>", '<html><head><meta charset="utf-8">',
+           f"<title>{esc(title)}</title>",
+           "<style>body{font-family:sans-serif;margin:2em}"
+           "img{max-width:100%;border:1px solid #ccc;margin:.5em 0}"
+           ".err{color:#b00}.none{color:#888}</style>",
+           f"</head><body><h1>{esc(title)}</h1><ol>"]
+    for k, (name, images, count, _) in enumerate(sheets):
+        out.append(f'<li><a href="#s{k}">{esc(name)}</a> ({count})</li>')
+    out.append("</ol>")
+    for k, (name, images, count, error) in enumerate(sheets):
+        out.append(f'<h2 id="s{k}">{esc(name)}</h2>')
+        if error:
+            out.append(f'<p class="err">{esc(error)}</p>')
+        elif not images:
+            out.append('<p class="none">no series</p>')
+        else:
+            out.append(f"<p>{count} series, {len(images)} chart(s)</p>")
+        for img in images:
+            out.append(f'<img src="{esc(img)}" alt="{esc(img)}" loading="lazy">')
+    out.append("</body></html>")
+    with open(path, "w", encoding="utf-8") as fp:
+        fp.write("\n".join(out) + "\n")
+
+
+def render_previews(excel_path, output_dir=None, fmt="png", points=PREVIEW_POINTS,
+                    workers=None, progress_callback=None, status_callback=None,
+                    instrument=None):
+    """
+    Draw the charts of every data sheet of excel_path (ALL_MERGED.xlsx or a
+    shard of it) into output_dir (default: preview_dir) as fmt ("png" /
+    "svg") images, plus index.html. points: series longer than that are
+    reduced (None / 0: every point). workers: sheets drawn at once
+    (default_workers(); 1 = this process). → (ok, index.html path or error).
+    """
+    if fmt not in PREVIEW_FORMATS:
+        raise ValueError(f"format must be one of {PREVIEW_FORMATS}, not {fmt!r}")
+    if importlib.util.find_spec("matplotlib") is None:
+        return False, "圖表預覽需要 matplotlib（pip install matplotlib）"
+
+    out_dir = output_dir or preview_dir(excel_path)
+    os.makedirs(out_dir, exist_ok=True)
+    for name in os.listdir(out_dir):  # images of an earlier run
+        if name.endswith(tuple(f".{f}" for f in PREVIEW_FORMATS)):
+            os.remove(os.path.join(out_dir, name))
+
+    with SheetIndex(excel_path) as wb:
+        sheets = [sh for sh in wb.sheetnames if not is_chart_data_sheet(sh)
+                  and has_xy_pairs(sh) and sh != INDEX_SHEET]
+    total = len(sheets)
+    workers = workers or default_workers()
+    instrumented = bool(instrument and instrument.enabled)
+    results = {}
+    t0 = time.perf_counter()
+
+    def finish(i, images, count, error, state):
+        if state:
+            instrument.merge_state(state)
+        results[i] = (sheets[i], images, count, error)
+        if status_callback:
+            if error:
+                status_callback(f"錯誤：{sheets[i]} → {error}")
+            else:
+                status_callback(f"預覽 {len(results)}/{total} → {sheets[i]}（{count} 條曲線）")
+        if progress_callback:
+            progress_callback(len(results), total)
+
+    if workers <= 1 or total <= 1:
+        for i, sh in enumerate(sheets):
+            finish(i, *_render_sheet(excel_path, i, sh, out_dir, fmt, points, instrumented))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, total)) as pool:
+            futures = {pool.submit(_render_sheet, excel_path, i, sh, out_dir, fmt, points,
+                                   instrumented): i
+                       for i, sh in enumerate(sheets)}
+            for fut in as_completed(futures):
+                try:
+                    res = fut.result()
+                except Exception as e:  # worker died (BrokenProcessPool, ...)
+                    res = [], 0, f"{type(e).__name__}: {e}", None
+                finish(futures[fut], *res)
+
+    index = os.path.join(out_dir, _INDEX)
+    _write_index(index, f"{os.path.basename(excel_path)} – chart preview",
+                 [results[i] for i in range(total)])
+
+    charts = sum(len(images) for _, images, _, _ in results.values())
+    if status_callback:
+        status_callback(f"預覽完成：{charts} 張圖，{time.perf_counter() - t0:.1f} 秒 → {index}")
+    return True, index
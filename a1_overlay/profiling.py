@@ -0,0 +1,200 @@
+"""
+Hot-path instrumentation: cumulative timers and counters per phase, with an
+optional cProfile / tracemalloc hook and a JSON run report.
+
+Phases used by the pipeline:
+    read       zip / XML streaming and cell conversion (openpyxl, cache reads)
+    transform  TextParser, concat, header rows, sheet-name sanitising
+    write      sheet cells, charts, writer.close (xlsx serialisation)
+
+Every timer can be scoped to a file, a sheet and/or a batch; the report has
+totals plus per-file, per-sheet and per-batch breakdowns.
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+from .utils import current_rss, peak_rss
+
+SCOPES = ("file", "sheet", "batch")
+
+
+def _phase_table():
+    return defaultdict(lambda: [0.0, 0])  # phase → [seconds, calls]
+
+
+class Instrument:
+    """
+    with inst.timer("read", file=f, sheet=sh): ...
+    inst.count("cells", n, file=f)
+
+    profile=True wraps start()/stop() in cProfile, trace_memory=True in
+    tracemalloc; both end up in the report.
+    """
+
+    enabled = True
+
+    def __init__(self, profile=False, trace_memory=False):
+        self.totals = _phase_table()
+        self.scoped = {s: defaultdict(_phase_table) for s in SCOPES}
+        self.counters = defaultdict(int)
+        self.scoped_counters = {s: defaultdict(lambda: defaultdict(int)) for s in SCOPES}
+        self.profile = None
+        if profile:
+            import cProfile  # only when asked for (pstats is slow to import)
+            self.profile = cProfile.Profile()
+        self.trace_memory = trace_memory
+        self.meta = {}
+        self._t0 = None
+        self._wall = None
+        self._tracemalloc = None
+
+    # ---------- hot path ----------
+    @contextmanager
+    def timer(self, phase, **scope):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - t0, **scope)
+
+    def add(self, phase, seconds, calls=1, **scope):
+        t = self.totals[phase]
+        t[0] += seconds
+        t[1] += calls
+        for s, key in scope.items():
+            if key is not None:
+                t = self.scoped[s][key][phase]
+                t[0] += seconds
+                t[1] += calls
+
+    def count(self, name, n=1, **scope):
+        self.counters[name] += n
+        for s, key in scope.items():
+            if key is not None:
+                self.scoped_counters[s][key][name] += n
+
+    # ---------- run lifetime ----------
+    def start(self):
+        self._t0 = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+        if self.profile:
+            self.profile.enable()
+        return self
+
+    def stop(self):
+        if self.profile:
+            self.profile.disable()
+        if self.trace_memory and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._tracemalloc = {
+                "current_bytes": current,
+                "peak_bytes": peak,
+                "top": [{"where": str(st.traceback[0]), "bytes": st.size, "count": st.count}
+                        for st in snapshot.statistics("lineno")[:25]],
+            }
+        if self._t0 is not None:
+            self._wall = time.perf_counter() - self._t0
+        return self
+
+    # ---------- worker processes ----------
+    def state(self):
+        """Plain-dict timers/counters (picklable) to send back from a worker."""
+        return {
+            "totals": dict(self.totals),
+            "scoped": {s: {k: dict(v) for k, v in d.items()} for s, d in self.scoped.items()},
+            "counters": dict(self.counters),
+            "scoped_counters": {s: {k: dict(v) for k, v in d.items()}
+                                for s, d in self.scoped_counters.items()},
+        }
+
+    def merge_state(self, state):
+        """Fold a worker's state() into this instrument."""
+        for phase, (sec, calls) in state["totals"].items():
+            t = self.totals[phase]
+            t[0] += sec
+            t[1] += calls
+        for s, keys in state["scoped"].items():
+            for key, phases in keys.items():
+                for phase, (sec, calls) in phases.items():
+                    t = self.scoped[s][key][phase]
+                    t[0] += sec
+                    t[1] += calls
+        for name, n in state["counters"].items():
+            self.counters[name] += n
+        for s, keys in state["scoped_counters"].items():
+            for key, names in keys.items():
+                for name, n in names.items():
+                    self.scoped_counters[s][key][name] += n
+
+    # ---------- report ----------
+    def report(self):
+        def table(phases):
+            return {p: {"seconds": round(sec, 6), "calls": calls}
+                    for p, (sec, calls) in sorted(phases.items())}
+
+        rep = {
+            "meta": self.meta,
+            "wall_seconds": self._wall,
+            "rss_bytes": current_rss(),
+            "peak_rss_bytes": peak_rss(),
+            "totals": table(self.totals),
+            "counters": dict(self.counters),
+        }
+        for s in SCOPES:
+            keys = set(self.scoped[s]) | set(self.scoped_counters[s])
+            rep[f"per_{s}"] = {
+                str(k): {"timers": table(self.scoped[s].get(k, {})),
+                         "counters": dict(self.scoped_counters[s].get(k, {}))}
+                for k in sorted(keys, key=str)
+            }
+        if self._tracemalloc:
+            rep["tracemalloc"] = self._tracemalloc
+        if self.profile:
+            import io
+            import pstats
+
+            out = io.StringIO()
+            stats = pstats.Stats(self.profile, stream=out)
+            stats.sort_stats("cumulative").print_stats(40)
+            rep["cprofile_top"] = out.getvalue().splitlines()
+        return rep
+
+    def write_report(self, path):
+        """Write the JSON report (and <path>.prof when profiling) → path."""
+        with open(path, "w", encoding="utf-8") as fp:
+            json.dump(self.report(), fp, ensure_ascii=False, indent=1)
+        if self.profile:
+            self.profile.dump_stats(os.path.splitext(path)[0] + ".prof")
+        return path
+
+
+class _NullInstrument(Instrument):
+    """Does nothing; the default, so un-instrumented runs pay ~nothing."""
+
+    enabled = False
+    _null = nullcontext()
+
+    def timer(self, phase, **scope):
+        return self._null
+
+    def add(self, phase, seconds, calls=1, **scope):
+        pass
+
+    def count(self, name, n=1, **scope):
+        pass
+
+
+NULL = _NullInstrument()
+
+
+def report_path(output_dir, name="ALL_MERGED"):
+    """Where a run's report goes: next to its main output."""
+    return os.path.join(output_dir, f"{name}.report.json")
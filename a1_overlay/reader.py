@@ -0,0 +1,218 @@
+"""Workbook reader: open an xlsx once, stream every sheet once."""
+
+import re
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from pandas.errors import EmptyDataError
+from pandas.io.parsers import TextParser
+
+# ============================================================
+# Workbook Reader (open once, stream every sheet once)
+# ============================================================
+
+LABEL_RE = re.compile(r".+\(\d+\)")
+
+
+def is_split_label(label):
+    """True for column labels of the form xxx(123)."""
+    return isinstance(label, str) and LABEL_RE.match(label.strip()) is not None
+
+
+def label_columns(row1):
+    """Columns (every second one) whose row-1 label matches xxx(123)."""
+    return [col for col in range(0, len(row1), 2) if is_split_label(row1[col])]
+
+
+def open_workbook(path):
+    """
+    Open an .xlsx/.xlsm a single time in streaming (read-only) mode.
+    Same options pandas.read_excel uses, so values come back identical.
+    """
+    return load_workbook(path, read_only=True, data_only=True, keep_links=False)
+
+
+class ParsedSheet:
+    """
+    A worksheet already streamed (prefetch.py): title, rows and width as
+    read_sheet_rows returns them, the first two rows as read_header_rows
+    does. read_sheet_rows / read_header_rows take it in place of the
+    openpyxl worksheet.
+    """
+
+    __slots__ = ("title", "rows", "width", "header")
+
+    def __init__(self, title, rows, width, header):
+        self.title = title
+        self.rows = rows
+        self.width = width
+        self.header = header
+
+
+class ParsedWorkbook:
+    """ParsedSheets standing in for the read-only workbook (sheetnames, worksheets, [name])."""
+
+    def __init__(self, sheets):
+        self.worksheets = sheets
+
+    @property
+    def sheetnames(self):
+        return [ws.title for ws in self.worksheets]
+
+    def __getitem__(self, name):
+        return next(ws for ws in self.worksheets if ws.title == name)
+
+    def close(self):
+        pass
+
+
+def parse_workbook(path):
+    """Stream every sheet of a workbook once → ParsedWorkbook."""
+    wb = open_workbook(path)
+    try:
+        return ParsedWorkbook([ParsedSheet(ws.title, *read_sheet_rows(ws), read_header_rows(ws))
+                               for ws in wb.worksheets])
+    finally:
+        wb.close()
+
+
+def _convert_cell(cell):
+    """Cell → Python value, exactly like pandas' openpyxl reader does it."""
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        val = int(cell.value)
+        if val == cell.value:
+            return val
+        return float(cell.value)
+    return cell.value
+
+
+def _is_blank(value):
+    return value is None or value == ""
+
+
+def read_sheet_rows(ws, prune_labels=False):
+    """
+    Stream the rows of one worksheet exactly once.
+
+    Returns (rows, width): the cell values as pandas.read_excel(header=None)
+    would see them (trailing empty rows trimmed, rows padded to equal width).
+
+    prune_labels=True: once row 1 is known and contains xxx(123) labels, the
+    columns after the last labelled pair are never converted, since the split
+    does not emit them.
+    """
+    if isinstance(ws, ParsedSheet):
+        return _prune_parsed(ws) if prune_labels else (ws.rows, ws.width)
+    ws.reset_dimensions()
+
+    rows = []
+    last_row = -1
+    width = 0       # width of the full sheet (what pandas would report)
+    keep = None     # leading columns worth converting (None → all)
+
+    for r, row in enumerate(ws.rows):
+        n = len(row)
+        while n and _is_blank(row[n - 1].value):
+            n -= 1
+        if n:
+            last_row = r
+            width = max(width, n)
+
+        if keep is not None:
+            n = min(n, keep)
+        rows.append([_convert_cell(c) for c in row[:n]])
+
+        if r == 1 and prune_labels:
+            labelled = label_columns(rows[1])
+            if labelled:
+                keep = labelled[-1] + 2
+                rows = [x[:keep] for x in rows]
+
+    rows = rows[:last_row + 1]
+    if keep is not None:
+        width = min(width, keep)
+
+    return [x + [""] * (width - len(x)) for x in rows], width
+
+
+def _prune_parsed(ws):
+    """read_sheet_rows(prune_labels=True) of a ParsedSheet (parsed in full)."""
+    labelled = label_columns(ws.rows[1]) if len(ws.rows) > 1 else []
+    if not labelled:
+        return ws.rows, ws.width
+    keep = labelled[-1] + 2
+    return [x[:keep] for x in ws.rows], min(ws.width, keep)
+
+
+def read_header_rows(ws, n=2):
+    """First n rows of a sheet, converted like read_sheet_rows (trailing blanks trimmed)."""
+    if isinstance(ws, ParsedSheet):
+        if n <= len(ws.header):
+            return [list(x) for x in ws.header[:n]]
+        rows = ws.header + ws.rows[len(ws.header):n]  # past row 2: trailing blank rows are gone
+    else:
+        ws.reset_dimensions()
+        rows = ([_convert_cell(c) for c in row] for row in ws.rows)
+    header = []
+    for r, values in enumerate(rows):
+        if r >= n:
+            break
+        values = list(values)
+        while values and _is_blank(values[-1]):
+            values.pop()
+        header.append(values)
+    return header
+
+
+def rows_to_frame(rows, start=0, stop=None):
+    """
+    DataFrame for rows[:, start:stop], parsed the same way pd.read_excel parses
+    a sheet (NA strings, numeric inference per column).
+    """
+    if start or stop is not None:
+        rows = [x[start:stop] for x in rows]
+    try:
+        return TextParser(rows, header=None, skip_blank_lines=False).read()
+    except EmptyDataError:
+        return pd.DataFrame()
+
+
+def read_sheet_frame(wb, sheet_name):
+    """One sheet of an open workbook as pd.read_excel(header=None) returns it."""
+    rows, _ = read_sheet_rows(wb[sheet_name])
+    return rows_to_frame(rows)
+
+
+def read_sheet_columns(wb, sheet_name, ranges):
+    """
+    ([DataFrame of columns start:stop for every (start, stop) in ranges],
+    sheet width): what read_sheet_frame(wb, sheet_name).iloc[:, start:stop]
+    gives, in one pass over the sheet that converts only those cells.
+    """
+    ws = wb[sheet_name]
+    ws.reset_dimensions()
+
+    parts = [[] for _ in ranges]
+    last_row = -1
+    width = 0
+    for r, row in enumerate(ws.rows):
+        n = len(row)
+        while n and _is_blank(row[n - 1].value):
+            n -= 1
+        if n:
+            last_row = r
+            width = max(width, n)
+        for rows, (start, stop) in zip(parts, ranges):
+            rows.append([_convert_cell(c) for c in row[start:min(stop, n)]])
+
+    frames = []
+    for rows, (start, stop) in zip(parts, ranges):
+        w = max(0, min(stop, width) - start)
+        frames.append(rows_to_frame([x + [""] * (w - len(x)) for x in rows[:last_row + 1]]))
+    return frames, width
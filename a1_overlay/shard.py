@@ -0,0 +1,150 @@
+"""Sharding of merged sheets wider than Excel's 16,384 columns."""
+
+import os
+
+import pandas as pd
+from xlsxwriter.utility import xl_col_to_name
+
+from .compact import CompactSheet
+from .sharedx import SHARED_X
+from .utils import sanitize
+from .writer import MAX_COLS, StreamWriter
+
+# ============================================================
+# Column Sharding (ALL_MERGED sheets past 16,384 columns)
+# ============================================================
+# Row 1 of every merged sheet holds the source file name over each of its
+# columns. A sheet wider than Excel allows is cut between sources (a source
+# is only cut itself if it alone is too wide; shared-X sheets are cut
+# between groups, see sharedx.py) into
+#   mode "sheet":  <sheet>, <sheet>_part2, <sheet>_part3 … in the same workbook
+#   mode "file":   <sheet> in ALL_MERGED.xlsx, ALL_MERGED_002.xlsx, …
+# and a Shard_Index sheet in the main workbook maps every source to its
+# shard and columns.
+
+SHARD_MODES = ("sheet", "file")
+INDEX_SHEET = "Shard_Index"
+
+
+def header_spans(df):
+    """[(source, start, stop)]: runs of equal values in row 1 (the file names)."""
+    if df.shape[0] == 0 or df.shape[1] == 0:
+        return []
+    header = df.row(0) if isinstance(df, CompactSheet) else df.iloc[0].tolist()
+    spans, start = [], 0
+    for c in range(1, len(header) + 1):
+        if c == len(header) or header[c] != header[start]:
+            spans.append((header[start], start, c))
+            start = c
+    return spans
+
+
+def group_spans(spans):
+    """Shared-X sheets: one span per X column and its Y columns, never cut apart."""
+    groups = []
+    for source, start, stop in spans:
+        if source == SHARED_X or not groups:
+            groups.append((source, start, stop))
+        else:
+            groups[-1] = (groups[-1][0], groups[-1][1], stop)
+    return groups
+
+
+def plan_shards(spans, max_cols=MAX_COLS):
+    """
+    [(start, stop)] column ranges of at most max_cols, cutting only between
+    spans (and at even offsets inside a span that alone is too wide, so X/Y
+    pairs stay together).
+    """
+    shards, start, stop = [], 0, 0
+    for _, s, e in spans:
+        if stop - start + (e - s) > max_cols and stop > start:
+            shards.append((start, stop))
+            start = s
+        while e - start > max_cols:
+            cut = start + max_cols - max_cols % 2
+            shards.append((start, cut))
+            start = cut
+        stop = e
+    if stop > start:
+        shards.append((start, stop))
+    return shards
+
+
+def shard_sheet_name(sheet_name, part):
+    if part == 1:
+        return sheet_name
+    suffix = f"_part{part}"
+    return sanitize(sheet_name)[:31 - len(suffix)] + suffix
+
+
+def shard_path(out_path, part):
+    if part == 1:
+        return out_path
+    base, ext = os.path.splitext(out_path)
+    return f"{base}_{part:03d}{ext}"
+
+
+class ShardedWriter:
+    """
+    StreamWriter for ALL_MERGED.xlsx that shards sheets too wide for Excel.
+    write_merged() returns the pieces written, as
+    [(stream_writer, worksheet, sheet_name, frame)], so charts (and their
+    chart-data sheets) can be added to each.
+    """
+
+    def __init__(self, out_path, mode="sheet", status_callback=None):
+        if mode not in SHARD_MODES:
+            raise ValueError(f"shard mode must be one of {SHARD_MODES}, not {mode!r}")
+        self.out_path = out_path
+        self.mode = mode
+        self.status_callback = status_callback
+        self.writers = {1: StreamWriter(out_path)}
+        self.index = []  # rows of the Shard_Index sheet
+
+    @property
+    def paths(self):
+        return [w.path for _, w in sorted(self.writers.items())]
+
+    def _writer(self, part):
+        if self.mode == "sheet":
+            return self.writers[1]
+        if part not in self.writers:
+            self.writers[part] = StreamWriter(shard_path(self.out_path, part))
+        return self.writers[part]
+
+    def write_merged(self, df, sheet_name):
+        if df.shape[1] <= MAX_COLS:
+            w = self.writers[1]
+            return [(w, w.write_frame(df, sheet_name), sheet_name, df)]
+
+        spans = header_spans(df)
+        shared = any(source == SHARED_X for source, _, _ in spans)
+        shards = plan_shards(group_spans(spans) if shared else spans, MAX_COLS)
+        if self.status_callback:
+            self.status_callback(f"{sheet_name} 共 {df.shape[1]} 欄，超過 Excel 上限，"
+                                 f"分成 {len(shards)} 段")
+
+        pieces = []
+        for part, (start, stop) in enumerate(shards, start=1):
+            w = self._writer(part)
+            name = sheet_name if self.mode == "file" else shard_sheet_name(sheet_name, part)
+            frame = df.columns(start, stop) if isinstance(df, CompactSheet) \
+                else df.iloc[:, start:stop]
+            pieces.append((w, w.write_frame(frame, name), name, frame))
+
+            book = os.path.basename(w.path)
+            for source, s, e in spans:
+                s, e = max(s, start), min(e, stop)
+                if s < e:
+                    self.index.append([source, sheet_name, book, name, part,
+                                       xl_col_to_name(s - start), xl_col_to_name(e - start - 1)])
+        return pieces
+
+    def close(self):
+        if self.index:
+            header = ["Source", "Sheet", "Workbook", "Shard sheet", "Shard",
+                      "First column", "Last column"]
+            self.writers[1].write_frame(pd.DataFrame([header] + self.index), INDEX_SHEET)
+        for _, w in sorted(self.writers.items()):
+            w.close()
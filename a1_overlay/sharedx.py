@@ -0,0 +1,101 @@
+"""Shared-X layout: one X column per distinct X vector, the Y columns after it."""
+
+import hashlib
+
+import numpy as np
+
+from .compact import SCAN_ROWS, CompactSheet
+from .writer import MAX_COLS
+
+# ============================================================
+# Shared X (de-duplicated frequency columns)
+# ============================================================
+# Merged sheets hold one X/Y pair per input, and in a sweep campaign the X
+# (frequency) column is the same in nearly every input. With shared_x the
+# merge hashes every X column (label / name / unit rows and the numbers; not
+# the file-name row, nor the title row that the first column of every run
+# carries) and keeps one copy per distinct vector, with the header of the
+# first input that has it:
+#
+#   row 1:   [shared X]  r0   r1   r2  … | [shared X]  r7 …
+#   rows 2+: X           Y    Y    Y   … | X'          Y  …
+#
+# Groups are ordered by their first input; a group never gets wider than
+# Excel allows (a new group with the same X is started instead), so shards
+# can always be cut between groups. Charts plot every Y of a group against
+# its X column. Summary sheets are tables, not X/Y pairs, and keep their
+# columns.
+
+SHARED_X = "[shared X]"
+KEY_ROW = 2  # first merged row that is part of an X column's identity
+
+
+def has_xy_pairs(sheet_name):
+    """False for Summary sheets (copied tables: no charts, no shared X)."""
+    return not sheet_name.lower().startswith("summary")
+
+
+def is_shared_x(row0):
+    return any(v == SHARED_X for v in row0)
+
+
+def _column_groups(row0):
+    """
+    [(x_col, [y_cols])] of a merged sheet from its file-name row: groups
+    headed by SHARED_X, or plain X/Y pairs.
+    """
+    if not is_shared_x(row0):
+        return [(c, [c + 1] if c + 1 < len(row0) else []) for c in range(0, len(row0), 2)]
+    groups = []
+    for c, v in enumerate(row0):
+        if v == SHARED_X:
+            groups.append((c, []))
+        elif groups:
+            groups[-1][1].append(c)
+    return groups
+
+
+def x_groups(sheet):
+    """[(x_col, [y_cols])] of a DataFrame or CompactSheet (see _column_groups)."""
+    if sheet.shape[0] == 0:
+        return []
+    row0 = sheet.row(0) if isinstance(sheet, CompactSheet) else sheet.iloc[0].tolist()
+    return _column_groups(row0)
+
+
+def _x_keys(sheet, xs):
+    """Hash of every column in xs (header from KEY_ROW, then the body), row block by row block."""
+    hashes = [hashlib.sha1(repr(sheet.header[KEY_ROW:, c].tolist()).encode("utf-8"))
+              for c in xs]
+    for r0 in range(0, sheet.body.shape[0], SCAN_ROWS):
+        block = np.ascontiguousarray(sheet.body[r0:r0 + SCAN_ROWS, xs].T)
+        for h, col in zip(hashes, block):
+            h.update(col.tobytes())
+    return [h.digest() for h in hashes]
+
+
+def share_x(sheet, max_cols=MAX_COLS, alloc=None):
+    """
+    Merged CompactSheet (file-name row first; X/Y pairs, or the shared-X
+    groups of sheets merged earlier) → shared-X layout with every distinct
+    X column once. alloc(shape, dtype): where the new body goes (spill.py).
+    """
+    column_groups = _column_groups(sheet.row(0))
+    keys = _x_keys(sheet, [x for x, _ in column_groups])
+    groups = {}
+    for key, (x, ys) in zip(keys, column_groups):
+        groups.setdefault(key, (x, []))[1].extend(ys)
+
+    order, x_pos = [], []
+    for x, ys in groups.values():
+        for start in range(0, max(len(ys), 1), max_cols - 1):
+            x_pos.append(len(order))
+            order.append(x)
+            order.extend(ys[start:start + max_cols - 1])
+
+    header = sheet.header[:, order]
+    header[0, x_pos] = SHARED_X
+    body = (alloc or np.empty)((sheet.body.shape[0], len(order)), dtype=sheet.body.dtype)
+    for r0 in range(0, len(body), SCAN_ROWS):
+        body[r0:r0 + SCAN_ROWS] = sheet.body[r0:r0 + SCAN_ROWS, order]
+    return CompactSheet(header, body)
@@ -0,0 +1,133 @@
+"""On-disk (numpy.memmap) store for the column blocks of one merged sheet."""
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .compact import CompactSheet, hstack
+
+# ============================================================
+# Spill Store (merged sheets larger than memory)
+# ============================================================
+# A merge reads one sheet of every input and joins them side by side; for a
+# big campaign that one merged sheet may not fit in RAM. A SpillStore takes
+# the blocks one at a time (append) and keeps them in memory until they add
+# up to more than `limit` bytes; from then on every block body goes to its
+# own file in a temporary folder and is only reopened as a read-only memmap.
+# sheet() joins the blocks with the usual hstack rules into one more memmap,
+# so the result is an ordinary CompactSheet whose body pages in from disk:
+# the writer streams it CHUNK_ROWS at a time, shards are views of it and the
+# charts read it a few columns at a time.
+#
+#   <dir>/.spill_xxxx/00000.f64 …   spilled block bodies
+#                     merged.f64     the joined body (sheet())
+#                     more.f64 …     alloc() (shared-X regrouping)
+#
+# Below the limit nothing touches the disk and sheet() is plain hstack.
+#
+# Blocks built in another process (the final merge's workers) travel as
+# segments: the worker writes the body into a file in a folder the parent
+# owns (segment_alloc) and sends back only the header, file name and shape
+# (to_segment); the parent maps the file read-only (from_segment). Such a
+# block is already on disk, so spilling leaves it where it is.
+
+
+def segment_alloc(directory):
+    """alloc(shape, dtype) that puts every body in a new file under directory."""
+    def alloc(shape, dtype):
+        if 0 in shape:
+            return np.empty(shape, dtype=dtype)
+        fd, path = tempfile.mkstemp(suffix=".seg", dir=directory)
+        os.close(fd)
+        return np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+    return alloc
+
+
+def to_segment(sheet):
+    """A CompactSheet with a segment_alloc body → (header, file, shape, dtype) to send."""
+    if not isinstance(sheet.body, np.memmap):
+        return sheet
+    sheet.body.flush()
+    return sheet.header, sheet.body.filename, sheet.body.shape, sheet.body.dtype.str
+
+
+def from_segment(segment):
+    """to_segment's result → CompactSheet over a read-only memmap of the file."""
+    if isinstance(segment, CompactSheet):
+        return segment
+    header, path, shape, dtype = segment
+    return CompactSheet(header, np.memmap(path, dtype=dtype, mode="r", shape=shape))
+
+
+class SpillStore:
+    """
+    Column blocks (CompactSheets) of one merged sheet, spilled to memmaps in
+    a temporary folder under directory (default: the system temp folder)
+    once they outgrow limit bytes (None: never). Use as a context manager;
+    the files are deleted on close().
+    """
+
+    def __init__(self, limit, directory=None, dtype="float64"):
+        self.limit = limit
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        self.blocks = []
+        self.path = None  # temporary folder, once something was spilled
+        self._in_memory = 0
+        self._files = 0
+
+    @property
+    def spilled(self):
+        return self.path is not None
+
+    def alloc(self, shape, dtype=None):
+        """Uninitialised array: a fresh memmap once the store spills, else in memory."""
+        dtype = np.dtype(dtype or self.dtype)
+        if not self.spilled or 0 in shape:
+            return np.empty(shape, dtype=dtype)
+        path = os.path.join(self.path, f"{self._files:05d}.{dtype.str[1:]}")
+        self._files += 1
+        return np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+
+    def _spill(self, block):
+        if block.body.size == 0 or isinstance(block.body, np.memmap):
+            return block  # nothing to move, or already on disk (segments)
+        body = self.alloc(block.body.shape, block.body.dtype)
+        body[:] = block.body
+        body.flush()
+        return CompactSheet(block.header, np.memmap(body.filename, dtype=body.dtype,
+                                                    mode="r", shape=body.shape))
+
+    def append(self, block):
+        if not self.spilled and self.limit is not None \
+                and self._in_memory + block.body.nbytes > self.limit:
+            self.path = tempfile.mkdtemp(prefix=".spill_", dir=self.directory)
+            self.blocks = [self._spill(b) for b in self.blocks]
+        if self.spilled:
+            block = self._spill(block)
+        else:
+            self._in_memory += block.body.nbytes
+        self.blocks.append(block)
+
+    def sheet(self, alloc=None):
+        """
+        The blocks side by side (hstack), on disk when the store has spilled
+        (alloc: somewhere else, e.g. segment_alloc).
+        """
+        merged = hstack(self.blocks, self.dtype, alloc=alloc or self.alloc)
+        self.blocks = []
+        return merged
+
+    def close(self):
+        self.blocks = []
+        if self.path:
+            shutil.rmtree(self.path, ignore_errors=True)  # Windows: a map may still be open
+            self.path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
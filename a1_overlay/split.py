@@ -0,0 +1,324 @@
+"""Split one raw TX/MI workbook into its _SPLIT.xlsx sheets."""
+
+import os
+
+import numpy as np
+
+from .cache import write_split_cache
+from .compact import CompactSheet
+from .passthrough import RawSheet, copy_raw_sheets
+from .plans import (LABEL_ROW, is_plain_label, is_solid, layout_fingerprint,
+                    load_plan, plan_dir, save_plan)
+from .prefetch import load_parsed
+from .profiling import NULL
+from .reader import (_is_blank, label_columns, open_workbook, read_header_rows,
+                     read_sheet_rows, rows_to_frame)
+from .utils import make_short_name, sanitize
+from .writer import StreamWriter
+
+# ============================================================
+# Split Excel Sheets (Your Latest Split Logic)
+# ============================================================
+
+def _unique_sheet_name(name, taken):
+    new_sheet = sanitize(name)
+    base = new_sheet
+    cnt = 1
+    while new_sheet in taken:
+        new_sheet = sanitize(f"{base}_{cnt}")
+        cnt += 1
+    return new_sheet
+
+
+def _is_summary(sheet_name):
+    return sheet_name.lower().startswith("summary")
+
+
+def split_base_name(input_path):
+    """File name without .xlsx/.xlsm — used for _SPLIT files and merge headers."""
+    return os.path.basename(input_path).replace(".xlsx", "").replace(".xlsm", "")
+
+
+def _fallback_block(rows, col):
+    """Parsed two-column block at col, or None when the block is empty."""
+    # Skip if this block is entirely empty (no parse needed)
+    if all(_is_blank(v) for x in rows for v in x[col:col + 2]):
+        return None
+
+    block = rows_to_frame(rows, col, col + 2)
+    if block.dropna(how="all").empty:
+        return None
+    return block
+
+
+def _fallback_label(block, col):
+    label = str(block.iat[1, 0]).strip()
+
+    if label == "" or label.lower() == "nan":
+        label = f"Block_{col//2 + 1}"
+    return label
+
+
+def _detect_blocks(rows, total_cols, short, taken, entry, tick):
+    """
+    Yield (new_sheet, col, block) for one sheet (the caller adds every
+    new_sheet to taken before asking for the next one) and describe the
+    split in entry for the plan cache.
+    """
+    row1 = rows[1]
+
+    # ----------------------------------------------------------
+    # Step 1: Detect columns matching label format xxx(123)
+    # ----------------------------------------------------------
+    regex_cols = label_columns(row1)
+
+    # ----------------------------------------------------------
+    # Step 2: If regex columns exist → Use label split
+    # ----------------------------------------------------------
+    if len(regex_cols) > 0:
+        entry["kind"] = "label"
+        for col in regex_cols:
+            with tick():
+                label = row1[col].strip()
+                block = rows_to_frame(rows, col, col + 2)
+                new_sheet = _unique_sheet_name(f"{short}_{label}", taken)
+            yield new_sheet, col, block
+
+    else:
+        # ------------------------------------------------------
+        # Step 3: Fallback — every two columns
+        # ------------------------------------------------------
+        entry["kind"] = "fallback"
+        for col in range(0, total_cols, 2):
+            with tick():
+                block = _fallback_block(rows, col)
+                if block is None:
+                    continue
+
+                label = _fallback_label(block, col)
+                if not _label_from_header(rows, col, label):
+                    entry["kind"] = "dynamic"
+
+                new_sheet = _unique_sheet_name(f"{short}_{label}", taken)
+            yield new_sheet, col, block
+
+
+# ---------- replaying a cached plan ----------
+
+def _label_from_header(rows, col, label):
+    """True when a fallback label follows from the label row alone."""
+    v = rows[LABEL_ROW][col]
+    if v == "":
+        return label == f"Block_{col//2 + 1}"
+    return is_plain_label(v) and v.strip() == label
+
+
+def _label_backed(rows, col):
+    """The block is non-empty whatever the other rows hold."""
+    return any(is_solid(v) for v in rows[LABEL_ROW][col:col + 2])
+
+
+def _replay_blocks(entry, rows, total_cols):
+    """
+    [(new_sheet, col, block or None)] for one sheet following its cached plan
+    entry, or None when the sheet does not fit the plan. block None means
+    "parse when it is written".
+
+    A label split depends on the label row only. For a fallback split, the
+    blocks with a real label are known to be non-empty; the rest are
+    checked exactly like the normal split does.
+    """
+    if entry["kind"] == "label":
+        return [(name, col, None) for col, name in entry["blocks"]]
+
+    planned = {col: name for col, name in entry["blocks"]}
+    out = []
+    for col in range(0, total_cols, 2):
+        if _label_backed(rows, col):
+            block, present = None, True
+        else:
+            block = _fallback_block(rows, col)
+            present = block is not None
+
+        if present != (col in planned):
+            return None
+        if present:
+            out.append((planned.pop(col), col, block))
+
+    return None if planned else out
+
+
+def iter_split_sheets(input_path, instrument=None, plans_dir=None, verify_plans=False,
+                      raw_summary=False, parsed_dir=None):
+    """
+    Yield (sheet_name, DataFrame) for every sheet the split produces, in order:
+    - Sheets named Summary are copied as-is (raw_summary=True: as a RawSheet,
+      whose XML write_split_file copies from the source without reading it).
+    - If a column label matches xxx(number), split by that.
+    - Otherwise fallback: split every two columns as a block.
+
+    The workbook is opened once and every sheet is streamed once; only the
+    columns that end up in the output are parsed. parsed_dir: the folder the
+    GUI pre-parses selected workbooks into (prefetch.py); a workbook found
+    there is taken from that cache instead.
+
+    plans_dir: reuse / store split plans keyed by the workbook layout (see
+    plans.py). verify_plans=True also runs the normal detection on every
+    replayed sheet and falls back to it if the two disagree.
+    """
+
+    inst = instrument or NULL
+    file = split_base_name(input_path)
+
+    with inst.timer("read", file=file):
+        wb = load_parsed(input_path, parsed_dir) if parsed_dir else None
+        if wb is None:
+            wb = open_workbook(input_path)
+        else:
+            inst.count("prefetch_hits", file=file)
+    taken = set()  # output sheet names already used
+
+    plan, fingerprint, recorded, dirty = None, None, [], True
+    if plans_dir:
+        with inst.timer("read", file=file):
+            # Summary sheets hold run data from row 2 on: their name is the layout
+            labels = [None if _is_summary(ws.title)
+                      else read_header_rows(ws, LABEL_ROW + 1)[LABEL_ROW:]
+                      for ws in wb.worksheets]
+        fingerprint = layout_fingerprint(wb.sheetnames, labels)
+        plan = load_plan(plans_dir, fingerprint)
+        if plan is not None and len(plan) != len(wb.worksheets):
+            plan = None
+        dirty = plan is None
+        inst.count("plan_misses" if dirty else "plan_hits", file=file)
+
+    try:
+        for i, ws in enumerate(wb.worksheets):
+            sh = ws.title
+            entry = plan[i] if plan else None
+
+            def tick():
+                return inst.timer("transform", file=file, sheet=sh)
+
+            # ---------- Summary sheet: copy directly ----------
+            if _is_summary(sh):
+                if raw_summary:
+                    name, df = sanitize(sh), RawSheet(input_path, sh)
+                else:
+                    with inst.timer("read", file=file, sheet=sh):
+                        rows, _ = read_sheet_rows(ws)
+                    with tick():
+                        name, df = sanitize(sh), rows_to_frame(rows)
+                taken.add(name)
+                recorded.append({"kind": "summary", "names": [name]})
+                inst.count("sheets", file=file)
+                yield name, df
+                continue
+
+            short = make_short_name(sh)
+            with inst.timer("read", file=file, sheet=sh):
+                rows, total_cols = read_sheet_rows(ws, prune_labels=True)
+            inst.count("sheets", file=file)
+            inst.count("cells", len(rows) * total_cols, file=file, sheet=sh)
+            if len(rows) < 2:
+                raise IndexError(f"sheet {sh!r} has no label row (row 2)")
+
+            blocks = None
+            if entry and entry["kind"] in ("label", "fallback"):
+                with tick():
+                    blocks = _replay_blocks(entry, rows, total_cols)
+                if blocks is not None and verify_plans:
+                    probe, seen, detected = {}, set(taken), []
+                    for name, col, block in _detect_blocks(rows, total_cols, short,
+                                                           seen, probe, tick):
+                        seen.add(name)
+                        detected.append((name, col, block))
+                    if [b[:2] for b in detected] != [b[:2] for b in blocks]:
+                        blocks = None
+                    else:
+                        blocks = detected
+                if blocks is None:
+                    inst.count("plan_fallbacks", file=file, sheet=sh)
+
+            if blocks is None:
+                new = {"kind": None, "names": [], "blocks": []}
+                source = _detect_blocks(rows, total_cols, short, taken, new, tick)
+            else:
+                new = {"kind": entry["kind"], "names": [], "blocks": []}
+                source = iter(blocks)
+
+            for new_sheet, col, block in source:
+                if block is None:
+                    with tick():
+                        block = rows_to_frame(rows, col, col + 2)
+                taken.add(new_sheet)
+                new["names"].append(new_sheet)
+                new["blocks"].append([col, new_sheet])
+                inst.count("blocks", file=file, sheet=sh)
+                yield new_sheet, block
+
+            if new["kind"] == "dynamic":
+                del new["blocks"]
+            recorded.append(new)
+
+            if new != entry:
+                dirty = True
+                if entry and new["names"] != entry["names"]:
+                    plan = None  # later names may shift: stop replaying
+
+        if plans_dir and dirty:
+            save_plan(plans_dir, fingerprint, recorded, os.path.basename(input_path))
+    finally:
+        wb.close()
+
+
+def write_split_file(sheets, out_path, instrument=None):
+    """
+    Write (sheet_name, DataFrame) pairs into one _SPLIT.xlsx. A RawSheet
+    gets an empty placeholder that its source XML replaces (passthrough.py).
+    """
+    inst = instrument or NULL
+    file = os.path.basename(out_path).replace("_SPLIT.xlsx", "")
+
+    writer = StreamWriter(out_path)
+    raw = {}
+    for name, df in sheets:
+        with inst.timer("write", file=file):
+            if isinstance(df, RawSheet):
+                raw[name] = df
+                df = CompactSheet(np.empty((0, 0), dtype=object), np.empty((0, 0)))
+            writer.write_frame(df, name)
+    with inst.timer("write", file=file):
+        writer.close()
+    if raw:
+        with inst.timer("write", file=file):
+            copy_raw_sheets(out_path, raw)
+        inst.count("raw_sheets", len(raw), file=file)
+    return out_path
+
+
+def split_excel_file(input_path, output_dir, cache_format=None, plans=False,
+                     verify_plans=False, raw_summary=True, parsed_dir=None,
+                     instrument=None):
+    """
+    Split the given Excel file into <name>_SPLIT.xlsx (see iter_split_sheets).
+    cache_format="parquet"/"arrow" also writes the columnar sidecar cache.
+    plans=True reuses split plans stored in <output_dir>/.split_plans.
+    raw_summary: copy Summary sheets as raw XML (formats, formulas, merged
+    cells kept; see passthrough.py) instead of re-writing their values.
+    parsed_dir: pre-parsed workbooks to use when present (prefetch.py).
+    """
+    out_path = os.path.join(output_dir, f"{split_base_name(input_path)}_SPLIT.xlsx")
+    sheets = iter_split_sheets(input_path, instrument,
+                               plan_dir(output_dir) if plans else None, verify_plans,
+                               raw_summary, parsed_dir)
+
+    if not cache_format:
+        return write_split_file(sheets, out_path, instrument)
+
+    sheets = list(sheets)
+    write_split_file(sheets, out_path, instrument)
+    with (instrument or NULL).timer("write", file=split_base_name(input_path)):
+        write_split_cache([(name, df.frame() if isinstance(df, RawSheet) else df)
+                           for name, df in sheets], out_path, cache_format)
+    return out_path
@@ -0,0 +1,88 @@
+"""Small helpers shared by every stage (no pandas needed)."""
+
+import os
+import sys
+
+# ============================================================
+# Utility
+# ============================================================
+
+def sanitize(name: str) -> str:
+    """Make sheet names safe for Excel."""
+    invalid = [":", "\\", "/", "?", "*", "[", "]"]
+    for c in invalid:
+        name = name.replace(c, "_")
+    return name[:31]
+
+
+def make_short_name(sheet_name):
+    """Generate short sheet name for split."""
+    parts = sheet_name.split()
+    if len(parts) >= 2:
+        short = parts[0] + "_" + "".join(w[0] for w in parts[1:])
+    else:
+        short = sheet_name[:10]
+    return sanitize(short)
+
+
+def default_workers():
+    """Leave one core for the GUI / OS."""
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def _win_memory_counters():
+    """PROCESS_MEMORY_COUNTERS of this process (Windows only), or None."""
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + \
+                   [(n, ctypes.c_size_t) for n in (
+                       "PeakWorkingSetSize", "WorkingSetSize",
+                       "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                       "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage",
+                       "PagefileUsage", "PeakPagefileUsage")]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    if ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(),
+            ctypes.byref(counters), counters.cb):
+        return counters
+    return None
+
+
+def current_rss():
+    """Resident set size of this process in bytes (0 if it cannot be read)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+
+    try:
+        with open("/proc/self/statm") as fp:
+            return int(fp.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    if os.name == "nt":
+        counters = _win_memory_counters()
+        if counters:
+            return counters.WorkingSetSize
+
+    return 0
+
+
+def peak_rss():
+    """Highest RSS this process ever had, in bytes (0 if it cannot be read)."""
+    if os.name == "nt":
+        counters = _win_memory_counters()
+        return counters.PeakWorkingSetSize if counters else 0
+
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux: KiB
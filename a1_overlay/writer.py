@@ -0,0 +1,120 @@
+"""Streaming xlsx writer: DataFrames straight into xlsxwriter, constant memory."""
+
+import datetime
+import warnings
+
+import numpy as np
+import xlsxwriter
+
+from .compact import CompactSheet, split_numbers
+
+# ============================================================
+# Stream Writer (replaces pd.ExcelWriter + DataFrame.to_excel)
+# ============================================================
+# DataFrame.to_excel formats every cell in Python (ExcelFormatter → one
+# ExcelCell object → a style lookup → worksheet.write) and xlsxwriter keeps
+# the whole workbook in memory until close(). Here every sheet is written
+# top to bottom in constant_memory mode (one row in memory), a chunk of rows
+# at a time: numbers go from a float64 array through write_number, and NaN
+# cells are dropped by a mask instead of being looked at one by one. Only
+# the few non-numeric cells (labels, file names) take the per-cell path.
+# A CompactSheet (compact.py) skips even the number check for its body.
+#
+# The cells written are the ones to_excel(header=False, index=False) writes,
+# so the file reads back identically.
+
+MAX_ROWS, MAX_COLS = 1048576, 16384
+CHUNK_ROWS = 512
+
+DATETIME_FORMAT = "YYYY-MM-DD HH:MM:SS"  # pandas' ExcelWriter defaults
+DATE_FORMAT = "YYYY-MM-DD"
+
+
+class StreamWriter:
+    """
+    What the pipeline used of pd.ExcelWriter(path, engine="xlsxwriter"):
+    .book and .sheets (for charts), write_frame() instead of to_excel, close().
+    Sheets are written one after the other; a sheet is final once written.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.book = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self.sheets = {}
+        self._plain = self.book.add_format()  # what to_excel passes with every cell
+        self._formats = {}
+
+    def _format(self, num_format):
+        if num_format not in self._formats:
+            self._formats[num_format] = self.book.add_format({"num_format": num_format})
+        return self._formats[num_format]
+
+    def _write_other(self, ws, r, c, v):
+        """One non-numeric cell, converted the way pandas' Excel writer does."""
+        if isinstance(v, (bool, np.bool_)):
+            ws.write_boolean(r, c, bool(v), self._plain)
+        elif isinstance(v, (float, np.floating)):  # ±inf (NaN never gets here)
+            ws.write(r, c, "inf" if v > 0 else "-inf", self._plain)
+        elif isinstance(v, datetime.datetime):
+            if v.tzinfo is not None:
+                raise ValueError("Excel does not support datetimes with timezones.")
+            ws.write_datetime(r, c, v, self._format(DATETIME_FORMAT))
+        elif isinstance(v, datetime.date):
+            ws.write_datetime(r, c, v, self._format(DATE_FORMAT))
+        elif isinstance(v, datetime.timedelta):
+            ws.write_number(r, c, v.total_seconds() / 86400, self._format("0"))
+        else:
+            v = str(v)
+            if len(v) > 32767:
+                warnings.warn(f"Cell contents too long ({len(v)}), "
+                              "truncated to 32767 characters", UserWarning)
+            ws.write(r, c, v, self._plain)
+
+    def _write_rows(self, ws, r0, values):
+        """One chunk of rows (2-D array) from row r0 down."""
+        nums, other = split_numbers(values)
+        finite = np.isfinite(nums)
+        if other is None:
+            other = np.isinf(nums)
+        else:
+            other |= np.isinf(nums)
+        other_rows = other.any(axis=1)
+        write_number = ws.write_number
+
+        for i in range(len(nums)):
+            r = r0 + i
+            cols = np.flatnonzero(finite[i])
+            for c, v in zip(cols.tolist(), nums[i, cols].tolist()):
+                write_number(r, c, v)
+            if other_rows[i]:
+                for c in np.flatnonzero(other[i]).tolist():
+                    self._write_other(ws, r, c, values[i, c])
+
+    def write_frame(self, df, sheet_name):
+        """
+        df.to_excel(writer, sheet_name, index=False, header=False), streamed.
+        df may also be a CompactSheet (header rows, then the float body).
+        """
+        n_rows, n_cols = df.shape
+        if n_rows > MAX_ROWS or n_cols > MAX_COLS:
+            raise ValueError(
+                f"This sheet is too large! Your sheet size is: {n_rows}, {n_cols} "
+                f"Max sheet size is: {MAX_ROWS}, {MAX_COLS}")
+
+        ws = self.book.add_worksheet(sheet_name)
+        self.sheets[sheet_name] = ws
+
+        if isinstance(df, CompactSheet):
+            h = df.header.shape[0]
+            if h:
+                self._write_rows(ws, 0, df.header)
+            for r0 in range(0, df.body.shape[0], CHUNK_ROWS):
+                self._write_rows(ws, h + r0, df.body[r0:r0 + CHUNK_ROWS])
+            return ws
+
+        for r0 in range(0, n_rows, CHUNK_ROWS):
+            self._write_rows(ws, r0, df.iloc[r0:r0 + CHUNK_ROWS].to_numpy())
+        return ws
+
+    def close(self):
+        self.book.close()
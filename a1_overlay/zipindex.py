@@ -0,0 +1,180 @@
+"""Zip-level sheet index: read one sheet of an xlsx without loading the rest."""
+
+import zipfile
+
+from openpyxl import load_workbook
+from openpyxl.packaging.manifest import Manifest
+from openpyxl.packaging.relationship import get_dependents, get_rels_path
+from openpyxl.reader.strings import read_string_table
+from openpyxl.styles.stylesheet import Stylesheet
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900
+from openpyxl.xml.constants import (ARC_CONTENT_TYPES, ARC_STYLE, REL_NS, SHARED_STRINGS,
+                                    SHEET_MAIN_NS)
+from openpyxl.xml.functions import fromstring
+
+try:
+    from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+except ImportError:  # moved in another openpyxl: see SheetIndex._internals
+    ReadOnlyWorksheet = None
+
+# ============================================================
+# Sheet Index (sheet name → XML part inside the zip)
+# ============================================================
+# An xlsx is a zip: xl/workbook.xml names the sheets, its .rels points every
+# sheet at an XML part (xl/worksheets/sheetN.xml) and at the shared parts
+# every sheet may depend on (xl/sharedStrings.xml, xl/styles.xml).
+#
+# load_workbook(read_only=True) parses the shared strings and the whole
+# stylesheet up front. SheetIndex only reads [Content_Types].xml,
+# workbook.xml and its .rels; a sheet part is streamed when that sheet is
+# read, the shared strings are loaded the first time a cell refers to one
+# and the stylesheet when the first sheet is read (dates need the number
+# formats). The sheets are openpyxl's own read-only worksheets, so values
+# come back exactly as open_workbook() returns them.
+#
+# ReadOnlyWorksheet is private to openpyxl and reads a few private
+# attributes of its parent (the ones below). The first sheet a process
+# opens is tried on its first row; if openpyxl no longer fits (AttributeError,
+# TypeError), every SheetIndex from then on serves its sheets from
+# load_workbook(read_only=True) instead: slower to open, same values. The
+# zip-level index (.parts, .styles, .shared_strings) does not depend on it.
+
+_WORKSHEET = "/worksheet"
+_OFFICE_DOCUMENT = "/officeDocument"
+
+
+class _LazyStrings:
+    """Shared-strings table, read from the zip on first use."""
+
+    def __init__(self, archive, part):
+        self._archive = archive
+        self._part = part
+        self._strings = None
+
+    def _load(self):
+        if self._strings is None:
+            if self._part is None:
+                self._strings = []
+            else:
+                with self._archive.open(self._part) as src:
+                    self._strings = read_string_table(src)
+        return self._strings
+
+    @property
+    def loaded(self):
+        return self._strings is not None
+
+    def __getitem__(self, i):
+        return self._load()[i]
+
+    def __len__(self):
+        return len(self._load())
+
+
+class SheetIndex:
+    """
+    Open an xlsx once and index its parts:
+        .parts           {sheet name: XML part}, in workbook order
+        .shared_strings  part name (or None), loaded on demand
+        .styles          part name (or None), loaded on demand
+    idx[sheet] is an openpyxl read-only worksheet; idx stands in for the
+    read-only workbook (sheetnames, worksheets, [name], close()).
+    """
+
+    data_only = True  # what ReadOnlyWorksheet asks its parent
+    _internals = None if ReadOnlyWorksheet else False  # fits this openpyxl? (None: not tried)
+
+    def __init__(self, path):
+        self.path = path
+        self._workbook = None  # load_workbook fallback, see the notes above
+        self._archive = zipfile.ZipFile(path)
+        try:
+            self._index()
+        except BaseException:
+            self._archive.close()
+            raise
+        self._strings = _LazyStrings(self._archive, self.shared_strings)
+        self._stylesheet = None
+
+    def _index(self):
+        names = set(self._archive.namelist())
+        root = get_dependents(self._archive, "_rels/.rels")
+        wb_part = next((r.target for r in root if r.Type.endswith(_OFFICE_DOCUMENT)),
+                       "xl/workbook.xml")
+
+        rels = {}
+        rels_path = get_rels_path(wb_part)
+        if rels_path in names:
+            rels = {r.Id: r for r in get_dependents(self._archive, rels_path)}
+
+        # found where openpyxl looks for them
+        package = Manifest.from_tree(fromstring(self._archive.read(ARC_CONTENT_TYPES)))
+        ct = package.find(SHARED_STRINGS)
+        self.shared_strings = ct.PartName[1:] if ct is not None else None
+        self.styles = ARC_STYLE if ARC_STYLE in names else None
+
+        node = fromstring(self._archive.read(wb_part))
+        pr = node.find(f"{{{SHEET_MAIN_NS}}}workbookPr")
+        date1904 = pr is not None and pr.get("date1904") in ("1", "true")
+        self.epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+
+        self.parts = {}
+        for sheet in node.iterfind(f"{{{SHEET_MAIN_NS}}}sheets/{{{SHEET_MAIN_NS}}}sheet"):
+            r = rels.get(sheet.get(f"{{{REL_NS}}}id"))
+            if r is not None and r.Type.endswith(_WORKSHEET) and r.target in names:
+                self.parts[sheet.get("name")] = r.target
+
+    # ---------- what ReadOnlyWorksheet reads from its parent ----------
+    def _styles(self):
+        if self._stylesheet is None:
+            sheet = None
+            if self.styles:
+                sheet = Stylesheet.from_tree(fromstring(self._archive.read(self.styles)))
+            self._stylesheet = sheet if sheet is not None and sheet.cell_styles else False
+        return self._stylesheet
+
+    @property
+    def _date_formats(self):
+        return self._styles().date_formats if self._styles() else set()
+
+    @property
+    def _timedelta_formats(self):
+        return self._styles().timedelta_formats if self._styles() else set()
+
+    # ---------- workbook-like access ----------
+    @property
+    def sheetnames(self):
+        return list(self.parts)
+
+    @property
+    def worksheets(self):
+        return [self[name] for name in self.parts]
+
+    def __getitem__(self, name):
+        if SheetIndex._internals is not False:
+            try:
+                ws = ReadOnlyWorksheet(self, name, self.parts[name], self._strings)
+                if SheetIndex._internals is None:
+                    next(ws.iter_rows(max_row=1), None)
+                    SheetIndex._internals = True
+                return ws
+            except (AttributeError, TypeError):
+                SheetIndex._internals = False
+        if self._workbook is None:
+            self._workbook = load_workbook(self.path, read_only=True, data_only=True,
+                                           keep_links=False)
+        return self._workbook[name]
+
+    def __contains__(self, name):
+        return name in self.parts
+
+    def close(self):
+        if self._workbook is not None:
+            self._workbook.close()
+        self._archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1 @@
+"""Synthetic inputs and a benchmark harness for the split / merge stages."""
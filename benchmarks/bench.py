@@ -0,0 +1,214 @@
+"""
+Benchmark harness for split, batch merge, final merge and the one-shot run.
+
+    python -m benchmarks.bench                          # all scenarios → bench_results.json
+    python -m benchmarks.bench -s smoke -s wide -o r.json
+    python -m benchmarks.bench --baseline last_release.json   # exit 1 on regressions
+
+Each (scenario, stage) runs in a fresh process, so the recorded peak RSS is
+that stage's own (worker processes of a parallel split are not included).
+Per stage the JSON has wall time, peak RSS, RSS right after imports and the
+size of everything the stage wrote.
+"""
+
+import argparse
+import glob
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from .synth import make_dataset
+
+SCENARIOS = {
+    "smoke":    dict(files=4, sheets=3, rows=200, pairs=6, layout="mixed", summary=True),
+    "label":    dict(files=30, sheets=6, rows=1000, pairs=8, layout="label", summary=True),
+    "fallback": dict(files=30, sheets=6, rows=1000, pairs=8, layout="fallback", summary=False),
+    "wide":     dict(files=120, sheets=3, rows=400, pairs=16, layout="label", summary=True),
+    "tall":     dict(files=10, sheets=4, rows=20000, pairs=4, layout="label", summary=True),
+}
+
+STAGES = ["split", "batch_merge", "final_merge", "split_merge"]
+
+# imported before a stage's clock starts (pandas, openpyxl, xlsxwriter come
+# with them): import cost is not part of any stage
+STAGE_MODULES = ["a1_overlay.fused", "a1_overlay.merge", "a1_overlay.parallel"]
+
+
+# ============================================================
+# Stages (run inside a fresh child process)
+# ============================================================
+
+def _stage(stage, data_dir, work_dir, workers):
+    from a1_overlay.fused import split_and_merge
+    from a1_overlay.merge import batch_merge_split_files, merge_final_batches
+    from a1_overlay.parallel import split_files_parallel
+
+    inputs = sorted(glob.glob(os.path.join(data_dir, "*.xlsx")))
+    split_dir = os.path.join(work_dir, "split")
+    merge_dir = os.path.join(work_dir, "batch_merge")
+    out_dir = os.path.join(work_dir, stage)
+    os.makedirs(out_dir, exist_ok=True)
+
+    if stage == "split":
+        results = split_files_parallel(inputs, out_dir, workers=workers)
+        errors = [r["error"] for r in results if r["error"]]
+        if errors:
+            raise RuntimeError(errors[0])
+    elif stage == "batch_merge":  # MERGE_BATCH_n only; final_merge is its own stage
+        batch_merge_split_files(sorted(glob.glob(os.path.join(split_dir, "*_SPLIT.xlsx"))),
+                                out_dir, final_merge=False)
+    elif stage == "final_merge":
+        batches = sorted(glob.glob(os.path.join(merge_dir, "MERGE_BATCH_*.xlsx")),
+                         key=lambda f: int(f.rsplit("_", 1)[1].split(".")[0]))
+        merge_final_batches(batches, out_dir)
+    elif stage == "split_merge":
+        split_and_merge(inputs, out_dir, workers=workers)
+    else:
+        raise ValueError(stage)
+
+    return out_dir
+
+
+def _child(stage, data_dir, work_dir, workers, conn):
+    try:
+        from a1_overlay.utils import current_rss, peak_rss
+        for module in STAGE_MODULES:
+            importlib.import_module(module)
+
+        baseline = current_rss()
+        t0 = time.perf_counter()
+        out_dir = _stage(stage, data_dir, work_dir, workers)
+        seconds = time.perf_counter() - t0
+
+        files = [os.path.join(out_dir, f) for f in os.listdir(out_dir)]
+        conn.send({
+            "seconds": seconds,
+            "peak_rss": peak_rss(),
+            "baseline_rss": baseline,
+            "output_bytes": sum(os.path.getsize(f) for f in files if os.path.isfile(f)),
+            "output_files": len(files),
+        })
+    except Exception as e:
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_stage(stage, data_dir, work_dir, workers=1):
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    p = ctx.Process(target=_child, args=(stage, data_dir, work_dir, workers, child))
+    p.start()
+    child.close()
+    result = parent.recv()
+    p.join()
+    return result
+
+
+# ============================================================
+# Harness
+# ============================================================
+
+def dataset_dir(root, name, params):
+    """Generate the scenario inputs once and reuse them on later runs."""
+    tag = "_".join(f"{k}{v}" for k, v in sorted(params.items()))
+    path = os.path.join(root, f"{name}__{tag}")
+    if not glob.glob(os.path.join(path, "*.xlsx")):
+        make_dataset(path, **params)
+    return path
+
+
+def run_benchmarks(scenarios, stages=STAGES, data_root=None, workers=1, log=print):
+    data_root = data_root or os.path.join(tempfile.gettempdir(), "a1_overlay_bench")
+    records = []
+
+    for name in scenarios:
+        params = SCENARIOS[name]
+        data_dir = dataset_dir(data_root, name, params)
+        work_dir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+        try:
+            for stage in stages:
+                res = run_stage(stage, data_dir, work_dir, workers)
+                rec = {"scenario": name, "stage": stage, **params, "workers": workers, **res}
+                records.append(rec)
+                if "error" in res:
+                    log(f"{name:<9} {stage:<12} ERROR {res['error']}")
+                else:
+                    log(f"{name:<9} {stage:<12} {res['seconds']:8.2f} s  "
+                        f"peak {res['peak_rss'] / 2**20:7.0f} MB  "
+                        f"out {res['output_bytes'] / 2**20:7.1f} MB")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return records
+
+
+def environment():
+    import numpy
+    import pandas
+
+    return {
+        "python": sys.version.split()[0],
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(records, baseline, tolerance):
+    """Lines describing (scenario, stage) pairs slower / bigger than baseline."""
+    old = {(r["scenario"], r["stage"]): r for r in baseline["results"] if "error" not in r}
+    problems = []
+    for r in records:
+        b = old.get((r["scenario"], r["stage"]))
+        if b is None or "error" in r:
+            continue
+        for key in ("seconds", "peak_rss"):
+            if b[key] and r[key] > b[key] * (1 + tolerance):
+                problems.append(f"{r['scenario']}/{r['stage']}: {key} "
+                                f"{b[key]:.4g} → {r[key]:.4g} (x{r[key] / b[key]:.2f})")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench",
+                                     description=__doc__.split("\n\n")[0])
+    parser.add_argument("-s", "--scenario", action="append", choices=list(SCENARIOS),
+                        help="scenario to run (repeatable; default: all)")
+    parser.add_argument("--stage", action="append", choices=STAGES,
+                        help="stage to run (repeatable; default: all, in order)")
+    parser.add_argument("-o", "--out", default="bench_results.json")
+    parser.add_argument("-j", "--workers", type=int, default=1)
+    parser.add_argument("--data-dir", help="where generated inputs are kept")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown / memory growth vs baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    stages = [s for s in STAGES if s in (args.stage or STAGES)]
+    records = run_benchmarks(args.scenario or list(SCENARIOS), stages,
+                             args.data_dir, args.workers)
+
+    with open(args.out, "w", encoding="utf-8") as fp:
+        json.dump({"environment": environment(), "results": records}, fp, indent=1)
+    print(f"→ {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fp:
+            problems = compare(records, json.load(fp), args.tolerance)
+        for line in problems:
+            print("REGRESSION", line)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Synthetic TX/MI workbooks that look like the real rig output:
+
+    row 1   title
+    row 2   labels: "Ch3(5180)" pairs (label layout) or free text / blank (fallback)
+    row 3   column names (Freq / Level)
+    row 4   units
+    row 5+  X = frequency sweep (log spaced from 100 Hz), Y = noisy curve
+
+Written with xlsxwriter in constant_memory mode so generating a few hundred
+files stays fast.
+"""
+
+import os
+
+import numpy as np
+import xlsxwriter
+
+SHEET_NAMES = ["TX Power 2G", "TX EVM 5G", "MI Sweep Low", "MI Sweep High",
+               "RX Sens 2G", "RX Sens 5G", "Spur Scan", "Harmonics"]
+
+
+def sheet_name(i):
+    base = SHEET_NAMES[i % len(SHEET_NAMES)]
+    return base if i < len(SHEET_NAMES) else f"{base} {i // len(SHEET_NAMES) + 1}"
+
+
+def make_workbook(path, sheets=4, rows=500, pairs=8, layout="label",
+                  summary=True, seed=0):
+    """
+    Write one synthetic raw workbook.
+
+    layout: "label"    every pair labelled xxx(123)
+            "fallback" no xxx(123) labels, some blank pairs (skipped by split)
+            "mixed"    even sheets label, odd sheets fallback
+    """
+    rng = np.random.default_rng(seed)
+    x = np.geomspace(100, 1e6, rows)
+
+    wb = xlsxwriter.Workbook(path, {"constant_memory": True})
+
+    if summary:
+        ws = wb.add_worksheet("Summary")
+        ws.write_row(0, 0, ["Item", "Result", "Limit", "Note"])
+        for r in range(1, 21):
+            ws.write_row(r, 0, [f"Test {r}", float(rng.normal()), 1.0,
+                                "PASS" if r % 5 else "FAIL"])
+
+    for s in range(sheets):
+        ws = wb.add_worksheet(sheet_name(s))
+        labelled = layout == "label" or (layout == "mixed" and s % 2 == 0)
+        blank = {p for p in range(pairs) if not labelled and p % 4 == 3}
+
+        # constant_memory: rows must be written top to bottom
+        ws.write(0, 0, f"{sheet_name(s)} — synthetic run {seed}")
+        for p in range(pairs):
+            if p not in blank:
+                ws.write(1, 2 * p, f"Ch{p}({5000 + 20 * p})" if labelled else f"Trace {p}")
+        for r, names in ((2, ("Freq", "Level")), (3, ("Hz", "dBm"))):
+            for p in range(pairs):
+                if p not in blank:
+                    ws.write_row(r, 2 * p, names)
+
+        curves = -30 + 10 * np.sin(np.log10(x)[:, None] + rng.uniform(0, 6, pairs)) \
+            + rng.normal(0, 0.3, (rows, pairs))
+        for r in range(rows):
+            for p in range(pairs):
+                if p not in blank:
+                    ws.write_number(4 + r, 2 * p, x[r])
+                    ws.write_number(4 + r, 2 * p + 1, curves[r, p])
+
+    wb.close()
+    return path
+
+
+def make_dataset(out_dir, files=10, **kwargs):
+    """files x make_workbook(...) into out_dir → list of paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    return [make_workbook(os.path.join(out_dir, f"RUN_{i:04d}.xlsx"), seed=i, **kwargs)
+            for i in range(files)]
@@ -0,0 +1,10 @@
+import pytest
+
+from benchmarks.synth import make_dataset
+
+
+@pytest.fixture
+def raw_files(tmp_path):
+    """Three small synthetic rig workbooks (label + fallback sheets, Summary)."""
+    return make_dataset(str(tmp_path / "raw"), files=3, sheets=3, rows=30, pairs=4,
+                        layout="mixed")
@@ -0,0 +1,245 @@
+"""
+Split / batch merge / final merge of the original "A1 - V3.py" (the
+pandas-only parts, before the a1_overlay package), kept as the reference
+the package's output is compared against.
+"""
+
+import os
+import re
+
+import pandas as pd
+
+
+def sanitize(name: str) -> str:
+    """Make sheet names safe for Excel."""
+    invalid = [":", "\\", "/", "?", "*", "[", "]"]
+    for c in invalid:
+        name = name.replace(c, "_")
+    return name[:31]
+
+
+def make_short_name(sheet_name):
+    """Generate short sheet name for split."""
+    parts = sheet_name.split()
+    if len(parts) >= 2:
+        short = parts[0] + "_" + "".join(w[0] for w in parts[1:])
+    else:
+        short = sheet_name[:10]
+    return sanitize(short)
+
+
+# ============================================================
+# Split Excel Sheets (Your Latest Split Logic)
+# ============================================================
+
+def split_excel_file(input_path, output_dir):
+    """
+    Split the given Excel file into many smaller sheets based on your rules:
+    - Sheets named Summary are copied as-is.
+    - If a column label matches xxx(number), split by that.
+    - Otherwise fallback: split every two columns as a block.
+    """
+
+    xls = pd.ExcelFile(input_path)
+    base_name = os.path.basename(input_path).replace(".xlsx", "").replace(".xlsm", "")
+    out_path = os.path.join(output_dir, f"{base_name}_SPLIT.xlsx")
+
+    writer = pd.ExcelWriter(out_path, engine="xlsxwriter")
+
+    for sh in xls.sheet_names:
+
+        df = pd.read_excel(input_path, sheet_name=sh, header=None)
+
+        # ---------- Summary sheet: copy directly ----------
+        if sh.lower().startswith("summary"):
+            df.to_excel(writer, sheet_name=sanitize(sh), index=False, header=False)
+            continue
+
+        short = make_short_name(sh)
+        row1 = df.iloc[1].tolist()
+        total_cols = df.shape[1]
+
+        # ----------------------------------------------------------
+        # Step 1: Detect columns matching label format xxx(123)
+        # ----------------------------------------------------------
+        regex_cols = []
+        for col in range(0, total_cols, 2):
+            if col < len(row1):
+                label = row1[col]
+                if isinstance(label, str) and re.match(r".+\(\d+\)", label.strip()):
+                    regex_cols.append(col)
+
+        # ----------------------------------------------------------
+        # Step 2: If regex columns exist → Use label split
+        # ----------------------------------------------------------
+        if len(regex_cols) > 0:
+            for col in regex_cols:
+                label = row1[col].strip()
+                block = df.iloc[:, col:col+2]
+
+                new_sheet = sanitize(f"{short}_{label}")
+                base = new_sheet
+                cnt = 1
+                while new_sheet in writer.sheets:
+                    new_sheet = sanitize(f"{base}_{cnt}")
+                    cnt += 1
+
+                block.to_excel(writer, sheet_name=new_sheet, index=False, header=False)
+
+        else:
+            # ------------------------------------------------------
+            # Step 3: Fallback — every two columns
+            # ------------------------------------------------------
+            for col in range(0, total_cols, 2):
+
+                # Skip if this block is entirely empty
+                if df.iloc[:, col:col+2].dropna(how="all").empty:
+                    continue
+
+                label = row1[col] if col < len(row1) else f"Col{col}"
+                label = str(label).strip()
+
+                if label == "" or label.lower() == "nan":
+                    label = f"Block_{col//2 + 1}"
+
+                block = df.iloc[:, col:col+2]
+
+                new_sheet = sanitize(f"{short}_{label}")
+                base = new_sheet
+                cnt = 1
+                while new_sheet in writer.sheets:
+                    new_sheet = sanitize(f"{base}_{cnt}")
+                    cnt += 1
+
+                block.to_excel(writer, sheet_name=new_sheet, index=False, header=False)
+
+    writer.close()
+    return out_path
+
+# ============================================================
+# Batch Merge Logic (Stable, Keep Sheet Order)
+# ============================================================
+
+def batch_merge_split_files(split_files, output_dir, batch_size=25,
+                            progress_callback=None, status_callback=None):
+
+    batch_results = []
+    total_batches = (len(split_files) + batch_size - 1) // batch_size
+    global_step = 0
+    global_total_steps = len(split_files)  # For UI progress
+
+    for b in range(total_batches):
+
+        batch_files = split_files[b*batch_size:(b+1)*batch_size]
+
+        if status_callback:
+            status_callback(f"批次 {b+1}/{total_batches}：讀取 {len(batch_files)} 檔案中…")
+
+        # Load this batch into memory (sheet_name=None → read all sheets)
+        cache = {f: pd.read_excel(f, sheet_name=None, header=None) for f in batch_files}
+
+        # Determine sheet order using the first file of the batch
+        base_order = list(cache[batch_files[0]].keys())
+
+        # Find common sheets across all files in this batch
+        common = set(base_order)
+        for f in batch_files:
+            common &= set(cache[f].keys())
+
+        # Output for this batch
+        batch_output = os.path.join(output_dir, f"MERGE_BATCH_{b+1}.xlsx")
+        writer = pd.ExcelWriter(batch_output, engine="xlsxwriter")
+
+        for sh in base_order:
+            if sh not in common:
+                continue
+
+            if status_callback:
+                status_callback(f"批次 {b+1} → 合併 Sheet：{sh}")
+
+            # Merge all sheets from cache
+            merged_list = [cache[f][sh] for f in batch_files]
+            merged = pd.concat(merged_list, axis=1, ignore_index=True)
+
+            # Create a header row containing filenames (per two columns)
+            header_row = []
+            per_file_width = merged.shape[1] // len(batch_files)
+            for f in batch_files:
+                header_row += [os.path.basename(f).replace("_SPLIT.xlsx", "")] * per_file_width
+
+            final_df = pd.DataFrame([header_row])
+            final_df = pd.concat([final_df, merged], axis=0, ignore_index=True)
+
+            # Write into sheet
+            final_df.to_excel(writer, sheet_name=sanitize(sh), index=False, header=False)
+
+        writer.close()
+        batch_results.append(batch_output)
+
+        # Progress update
+        global_step += len(batch_files)
+        if progress_callback:
+            progress_callback(global_step, global_total_steps)
+
+        del cache  # free memory
+
+    # ---------------------------------------------------------
+    # FINAL MERGE of all MERGE_BATCH_xxx → ALL_MERGED.xlsx
+    # ---------------------------------------------------------
+    if status_callback:
+        status_callback("開始最終合併所有批次結果…")
+
+    ok, result = merge_final_batches(
+        batch_results,
+        output_dir,
+        progress_callback=progress_callback,
+        status_callback=status_callback
+    )
+
+    return ok, result
+
+
+# ============================================================
+# Final Merge (MERGE_BATCH → ALL_MERGED)
+# ============================================================
+
+def merge_final_batches(batch_results, output_dir,
+                        progress_callback=None, status_callback=None):
+
+    first = pd.ExcelFile(batch_results[0])
+    base_order = first.sheet_names  # final sheet order is determined here
+
+    sets = [set(pd.ExcelFile(f).sheet_names) for f in batch_results]
+    common = set.intersection(*sets)
+
+    out_path = os.path.join(output_dir, "ALL_MERGED.xlsx")
+    writer = pd.ExcelWriter(out_path, engine="xlsxwriter")
+
+    total_steps = len(common)
+    cur = 0
+
+    for sh in base_order:
+        if sh not in common:
+            continue
+
+        if status_callback:
+            status_callback(f"最終合併 → {sh}")
+
+        merged = None
+
+        for f in batch_results:
+            df = pd.read_excel(f, sheet_name=sh, header=None)
+
+            if merged is None:
+                merged = df
+            else:
+                merged = pd.concat([merged, df], axis=1, ignore_index=True)
+
+        merged.to_excel(writer, sheet_name=sanitize(sh), index=False, header=False)
+
+        cur += 1
+        if progress_callback:
+            progress_callback(cur, total_steps)
+
+    writer.close()
+    return True, out_path
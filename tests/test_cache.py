@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from a1_overlay.cache import (CACHE_MANIFEST, load_split_sheets, read_split_cache,
+                              split_cache_dir, write_split_cache)
+from a1_overlay.merge import batch_merge_split_files
+from a1_overlay.split import split_excel_file
+
+from .test_incremental import _assert_same
+
+pytest.importorskip("pyarrow")
+
+
+def _split(raw_files, out, cache_format=None):
+    out.mkdir()
+    return [split_excel_file(f, str(out), cache_format=cache_format) for f in raw_files]
+
+
+def _merge(split, out):
+    out.mkdir()
+    ok, merged = batch_merge_split_files(split, str(out), batch_size=2, charts=False)
+    assert ok
+    return merged
+
+
+@pytest.mark.parametrize("cache_format", ["parquet", "arrow"])
+def test_merge_from_cache_matches_xlsx(raw_files, tmp_path, cache_format):
+    plain = _split(raw_files, tmp_path / "plain")
+    cached = _split(raw_files, tmp_path / "cached", cache_format)
+    assert all(read_split_cache(f) is not None for f in cached)
+    _assert_same(_merge(cached, tmp_path / "from_cache"), _merge(plain, tmp_path / "from_xlsx"))
+
+
+def test_outdated_cache_is_ignored(raw_files, tmp_path):
+    split = _split(raw_files, tmp_path / "split", "parquet")
+    expected = _merge(split, tmp_path / "expected")
+
+    # the cache of the first file now holds another file's sheets…
+    write_split_cache(list(load_split_sheets(split[1]).items()), split[0])
+    assert read_split_cache(split[0]) is not None
+
+    # …but the xlsx is newer, so the xlsx is read
+    cache_mtime = os.path.getmtime(os.path.join(split_cache_dir(split[0]), CACHE_MANIFEST))
+    os.utime(split[0], (cache_mtime + 10, cache_mtime + 10))
+    assert read_split_cache(split[0]) is None
+    _assert_same(_merge(split, tmp_path / "merged"), expected)
@@ -0,0 +1,37 @@
+import zipfile
+
+from a1_overlay.charts import add_charts_to_merged_excel
+from a1_overlay.incremental import incremental_merge
+from a1_overlay.manifest import load_merge_manifest
+from a1_overlay.profiling import Instrument
+from a1_overlay.reader import read_sheet_frame
+from a1_overlay.split import split_excel_file
+from a1_overlay.zipindex import SheetIndex
+
+
+def _frames(path):
+    with SheetIndex(path) as wb:
+        return {sh: read_sheet_frame(wb, sh) for sh in wb.sheetnames}
+
+
+def test_redraw_copies_summary_and_keeps_manifest(raw_files, tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    split = [split_excel_file(f, str(out)) for f in raw_files]
+    ok, merged = incremental_merge(split, str(out), charts=False)
+    assert ok
+    before = _frames(merged)
+    summary = [sh for sh in before if sh.lower().startswith("summary")]
+    assert summary
+
+    inst = Instrument()
+    assert add_charts_to_merged_excel(merged, instrument=inst)
+
+    after = _frames(merged)
+    assert list(after) == list(before)
+    for sh in before:
+        assert after[sh].equals(before[sh]), sh
+    assert not set(summary) & set(inst.scoped["sheet"])  # copied, not read
+    with zipfile.ZipFile(merged) as z:
+        assert any(n.startswith("xl/charts/") for n in z.namelist())
+    assert load_merge_manifest(str(out)) is not None  # output stat refreshed
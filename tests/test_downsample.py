@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from a1_overlay.downsample import downsample_series, lttb_indices
+
+
+def _sweep(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.logspace(2, 6, n)
+    return x, np.sin(np.log10(x) * 3) + rng.normal(0, 0.1, n)
+
+
+def _lttb(x, y, n_out):
+    """Plain one-series LTTB, written out point by point."""
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    edges = [int(i * every) + 1 for i in range(n_out - 1)]
+    edges[-1] = n - 1
+    kept, a = [0], 0
+    for i in range(n_out - 2):
+        nxt = range(edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = sum(x[j] for j in nxt) / len(nxt)
+        avg_y = sum(y[j] for j in nxt) / len(nxt)
+        best = max(range(edges[i], edges[i + 1]),
+                   key=lambda b: abs((x[a] - avg_x) * (y[b] - y[a])
+                                     - (x[a] - x[b]) * (avg_y - y[a])))
+        kept.append(best)
+        a = best
+    return kept + [n - 1]
+
+
+def test_endpoints_kept_and_length():
+    x, y = _sweep(1000)
+    (kx, ky), = downsample_series([(x, y)], 50)
+    assert len(kx) == len(ky) == 50
+    assert (kx[0], ky[0], kx[-1], ky[-1]) == (x[0], y[0], x[-1], y[-1])
+    assert np.all(np.diff(kx) > 0)  # original order
+
+
+def test_short_series_unchanged():
+    x, y = _sweep(40)
+    (kx, ky), = downsample_series([(x, y)], 50)
+    np.testing.assert_array_equal(kx, x)
+    np.testing.assert_array_equal(ky, y)
+
+
+def test_gaps_and_nonpositive_x_dropped():
+    x, y = _sweep(300)
+    x[:5] = [-1.0, 0.0, np.nan, 150.0, 160.0]
+    y[100:120] = np.nan
+    (kx, ky), = downsample_series([(x, y)], 30)
+    assert len(kx) == 30
+    assert np.all(np.isfinite(kx)) and np.all(np.isfinite(ky)) and np.all(kx > 0)
+    assert kx[0] == 150.0 and kx[-1] == x[-1]
+
+
+def test_log_x_buckets_by_decade():
+    # X one decade apart: in log X the points are evenly spaced; the second
+    # bucket (rows 3..5) keeps row 5 in log X but row 4 on a linear axis
+    x = 10.0 ** np.arange(7)
+    y = np.array([0, 1, 0, 1, 1.1, 1, 0])
+    (log_x, _), = downsample_series([(x, y)], 4)
+    (lin_x, _), = downsample_series([(x, y)], 4, log_x=False)
+    np.testing.assert_array_equal(log_x, x[[0, 1, 5, 6]])
+    np.testing.assert_array_equal(lin_x, x[[0, 1, 4, 6]])
+
+
+@pytest.mark.parametrize("n, n_out", [(500, 37), (101, 3), (64, 63)])
+def test_matches_plain_lttb(n, n_out):
+    series = [_sweep(n, seed) for seed in range(3)]  # reduced together (same length)
+    lx = np.log10(np.stack([x for x, _ in series]))
+    ys = np.stack([y for _, y in series])
+    idx = lttb_indices(lx, ys, n_out)
+    for row, (x, y) in enumerate(series):
+        assert idx[row].tolist() == _lttb(np.log10(x), y, n_out)
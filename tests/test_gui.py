@@ -0,0 +1,16 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+
+def test_window_module_loads_no_pipeline():
+    code = ("import sys, a1_overlay.gui; "
+            "print(sorted(m for m in ('pandas', 'numpy', 'openpyxl', 'xlsxwriter') "
+            "if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         check=True, cwd=os.path.dirname(os.path.dirname(__file__))).stdout
+    assert out.strip() == "[]"
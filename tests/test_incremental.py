@@ -0,0 +1,153 @@
+import json
+
+import pytest
+
+from benchmarks.synth import make_workbook
+from a1_overlay.incremental import incremental_merge
+from a1_overlay.manifest import MANIFEST_NAME
+from a1_overlay.merge import batch_merge_split_files
+from a1_overlay.profiling import Instrument
+from a1_overlay.reader import read_sheet_columns, read_sheet_frame
+from a1_overlay.split import split_excel_file
+from a1_overlay.zipindex import SheetIndex
+
+
+def _frames(path):
+    with SheetIndex(path) as wb:
+        return {sh: read_sheet_frame(wb, sh) for sh in wb.sheetnames}
+
+
+def _assert_same(got, expected):
+    got, expected = _frames(got), _frames(expected)
+    assert list(got) == list(expected)
+    for sh in expected:
+        assert got[sh].equals(expected[sh]), sh
+
+
+def _split(raw_files, out):
+    out.mkdir()
+    return [split_excel_file(f, str(out)) for f in raw_files]
+
+
+def test_shared_x_append_rebuilds(raw_files, tmp_path):
+    split = _split(raw_files, tmp_path / "split")
+    out = tmp_path / "out"
+    out.mkdir()
+    ok, _ = incremental_merge(split[:2], str(out), charts=False, shared_x=True)
+    assert ok
+    with open(out / MANIFEST_NAME, encoding="utf-8") as fp:
+        manifest = json.load(fp)
+    assert all(sh.lower().startswith("summary")
+               for e in manifest["inputs"] for sh in e["columns"])
+
+    ok, merged = incremental_merge(split, str(out), charts=False, shared_x=True)
+    assert ok
+
+    full = tmp_path / "full"
+    full.mkdir()
+    ok, expected = batch_merge_split_files(split, str(full), charts=False, shared_x=True)
+    _assert_same(merged, expected)
+
+
+@pytest.mark.parametrize("dtype, spill_limit", [("float64", None), ("float32", None),
+                                                ("float64", 1)])
+def test_append_matches_full_rebuild(raw_files, tmp_path, dtype, spill_limit):
+    split = _split(raw_files, tmp_path / "split")
+    out = tmp_path / "out"
+    out.mkdir()
+    inst = Instrument()
+    assert incremental_merge(split[:2], str(out), dtype=dtype)[0]
+    ok, merged = incremental_merge(split, str(out), dtype=dtype, spill_limit=spill_limit,
+                                   instrument=inst)
+    assert ok
+    assert inst.counters.get("files", 0) == 0  # appended, not rebuilt
+    if spill_limit:  # the old sheet is read one kept input per pass
+        assert inst.counters.get("spilled_sheets", 0) > 0
+
+    full = tmp_path / "full"
+    full.mkdir()
+    ok, expected = batch_merge_split_files(split, str(full), dtype=dtype)
+    _assert_same(merged, expected)
+
+
+def test_changed_input_keeps_its_place(raw_files, tmp_path):
+    split = _split(raw_files, tmp_path / "split")
+    out = tmp_path / "out"
+    out.mkdir()
+    assert incremental_merge(split, str(out))[0]
+
+    # the middle input changes under the same name
+    make_workbook(raw_files[1], sheets=3, rows=30, pairs=4, layout="mixed", seed=7)
+    assert split_excel_file(raw_files[1], str(tmp_path / "split")) == split[1]
+    inst = Instrument()
+    ok, merged = incremental_merge(split, str(out), instrument=inst)
+    assert ok
+    assert inst.counters.get("files", 0) == 0  # appended, not rebuilt
+
+    full = tmp_path / "full"
+    full.mkdir()
+    ok, expected = batch_merge_split_files(split, str(full))
+    _assert_same(merged, expected)
+
+
+def test_append_reads_added_sheets_one_at_a_time(raw_files, tmp_path, monkeypatch):
+    from a1_overlay import cache, incremental
+
+    split = _split(raw_files, tmp_path / "split")
+    out = tmp_path / "out"
+    out.mkdir()
+    assert incremental_merge(split[:2], str(out))[0]
+
+    log = []
+    read, write = cache.SplitSheets.read, incremental.write_merged_sheet
+    monkeypatch.setattr(cache.SplitSheets, "read",
+                        lambda self, sh: log.append(("read", sh)) or read(self, sh))
+    monkeypatch.setattr(incremental, "write_merged_sheet",
+                        lambda writer, sh, *a: log.append(("write", sh)) or write(writer, sh, *a))
+    inst = Instrument()
+    assert incremental_merge(split, str(out), instrument=inst)[0]
+    assert inst.counters.get("files", 0) == 0  # appended, not rebuilt
+
+    sheets = [sh for _, sh in log[::2]]
+    assert log == [(op, sh) for sh in sheets for op in ("read", "write")]
+
+
+def test_read_sheet_columns(raw_files, tmp_path):
+    split = _split(raw_files, tmp_path / "split")
+    with SheetIndex(split[0]) as wb:
+        for sh in wb.sheetnames:
+            full = read_sheet_frame(wb, sh)
+            ranges = [(c, min(c + 2, full.shape[1])) for c in range(0, full.shape[1], 2)]
+            frames, width = read_sheet_columns(wb, sh, ranges)
+            assert width == full.shape[1]
+            for (start, stop), frame in zip(ranges, frames):
+                expected = full.iloc[:, start:stop]
+                expected.columns = range(stop - start)
+                assert frame.equals(expected), (sh, start)
+
+
+def test_stale_manifest_falls_back_cleanly(raw_files, tmp_path):
+    split = _split(raw_files, tmp_path / "split")
+    out = tmp_path / "out"
+    out.mkdir()
+    assert incremental_merge(split[:2], str(out))[0]
+
+    # a range of the last sheet no longer matches: found after the others are read
+    path = out / MANIFEST_NAME
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    last = manifest["sheets"][-1]
+    manifest["inputs"][1]["columns"][last] = [0, 2]
+    path.write_text(json.dumps(manifest), encoding="utf-8")
+
+    inst = Instrument()
+    ok, merged = incremental_merge(split, str(out), instrument=inst)
+    assert ok
+    assert inst.counters.get("files", 0) + inst.counters.get("batches_resumed", 0) > 0  # rebuilt
+
+    fresh = tmp_path / "fresh"
+    fresh.mkdir()
+    assert incremental_merge(split, str(fresh))[0]
+    got = json.loads(path.read_text(encoding="utf-8"))["inputs"]
+    expected = json.loads((fresh / MANIFEST_NAME).read_text(encoding="utf-8"))["inputs"]
+    assert [sorted(e) for e in got] == [sorted(e) for e in expected]
+    assert [e["columns"] for e in got] == [e["columns"] for e in expected]
@@ -0,0 +1,97 @@
+import json
+import os
+import pickle
+import zipfile
+
+import pytest
+
+from a1_overlay.journal import JOURNAL_NAME, QUARANTINE_DIR, CorruptInput
+from a1_overlay.merge import batch_merge_split_files
+from a1_overlay.profiling import Instrument
+from a1_overlay.split import split_excel_file
+
+from .test_incremental import _assert_same
+
+
+def _split(raw_files, out):
+    out.mkdir()
+    return [split_excel_file(f, str(out)) for f in raw_files]
+
+
+def _truncate_file(path):
+    with open(path, "rb") as fp:
+        data = fp.read()
+    with open(path, "wb") as fp:
+        fp.write(data[:len(data) // 2])
+
+
+def _truncate_sheet(path):
+    """Cut the last sheet part in half: the dimension record is still there."""
+    with zipfile.ZipFile(path) as z:
+        parts = {info: z.read(info) for info in z.infolist()}
+    last = max((i for i in parts if i.filename.startswith("xl/worksheets/sheet")),
+               key=lambda i: int(i.filename[len("xl/worksheets/sheet"):-4]))
+    parts[last] = parts[last][:len(parts[last]) // 2]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for info, data in parts.items():
+            z.writestr(info, data)
+
+
+def test_resume_skips_completed_batches(raw_files, tmp_path):
+    split = _split(raw_files, tmp_path / "split")
+    out = tmp_path / "out"
+    out.mkdir()
+    ok, first = batch_merge_split_files(split, str(out), batch_size=1)
+    assert ok
+    expected = tmp_path / "expected.xlsx"
+    os.replace(first, expected)
+
+    inst = Instrument()
+    ok, merged = batch_merge_split_files(split, str(out), batch_size=1, instrument=inst)
+    assert ok
+    assert inst.counters["batches_resumed"] == 3 and inst.counters.get("files", 0) == 0
+    _assert_same(merged, expected)
+
+    # a touched input only redoes its own batch
+    st = os.stat(split[1])
+    os.utime(split[1], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    inst = Instrument()
+    assert batch_merge_split_files(split, str(out), batch_size=1, instrument=inst)[0]
+    assert inst.counters["batches_resumed"] == 2 and inst.counters["files"] == 1
+
+    # other settings: nothing is taken from the journal
+    inst = Instrument()
+    assert batch_merge_split_files(split, str(out), batch_size=1, dtype="float32",
+                                   instrument=inst)[0]
+    assert inst.counters.get("batches_resumed", 0) == 0 and inst.counters["files"] == 3
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("corrupt", [_truncate_file, _truncate_sheet])
+def test_corrupt_input_is_quarantined(raw_files, tmp_path, workers, corrupt):
+    split = _split(raw_files, tmp_path / "split")
+    corrupt(split[1])
+    out = tmp_path / "out"
+    out.mkdir()
+    messages = []
+    # batch_size=2: the broken file shares a batch with a good one
+    ok, merged = batch_merge_split_files(split, str(out), batch_size=2, workers=workers,
+                                         status_callback=messages.append)
+    assert ok
+    assert not os.path.exists(split[1])
+    assert os.path.exists(out / QUARANTINE_DIR / os.path.basename(split[1]))
+    with open(out / JOURNAL_NAME, encoding="utf-8") as fp:
+        assert list(json.load(fp)["quarantined"]) == [os.path.abspath(split[1])]
+    assert any(QUARANTINE_DIR in m for m in messages)
+
+    good = tmp_path / "good"
+    good.mkdir()
+    ok, expected = batch_merge_split_files([split[0], split[2]], str(good), batch_size=2)
+    _assert_same(merged, expected)
+
+
+def test_corrupt_input_pickles():
+    e = pickle.loads(pickle.dumps(CorruptInput("/x/A_SPLIT.xlsx", "TX: ParseError: boom")))
+    assert isinstance(e, CorruptInput)
+    assert (e.path, e.error) == ("/x/A_SPLIT.xlsx", "TX: ParseError: boom")
+    assert str(e) == "/x/A_SPLIT.xlsx: TX: ParseError: boom"
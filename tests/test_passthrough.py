@@ -0,0 +1,112 @@
+import re
+import zipfile
+
+import pytest
+import xlsxwriter
+from openpyxl import load_workbook
+
+from a1_overlay.passthrough import RawSheet, copy_raw_sheets
+from a1_overlay.split import split_excel_file
+
+
+@pytest.fixture
+def styled_source(tmp_path):
+    """A raw workbook whose Summary sheet has shared strings, formats and merges."""
+    path = tmp_path / "RUN_0001.xlsx"
+    wb = xlsxwriter.Workbook(str(path))  # writes shared strings (openpyxl does not)
+    ws = wb.add_worksheet("Summary")
+    title = wb.add_format({"bold": True, "font_size": 14, "font_color": "#0000FF",
+                           "align": "center"})
+    item = wb.add_format({"bg_color": "#FFFF00", "bottom": 1})
+    value = wb.add_format({"num_format": "0.000"})
+    ratio = wb.add_format({"num_format": "0.00%"})
+    ws.merge_range("A1:C1", "Report", title)
+    ws.write_row(1, 0, ["Item", "Result", "Ratio"])
+    for r, (name, v, q) in enumerate([("TX", 1.25, 0.5), ("RX", -3.5, 0.125),
+                                      ("TX", 7, 1)], start=2):
+        ws.write(r, 0, name, item)
+        ws.write(r, 1, v, value)
+        ws.write(r, 2, q, ratio)
+    ws.set_column(0, 0, 25)
+
+    data = wb.add_worksheet("TX Power 2G")
+    data.write(0, 0, "title")
+    data.write_row(1, 0, ["Ch1(5180)"])
+    data.write_row(2, 0, ["Freq", "Level"])
+    for r in range(5):
+        data.write_row(3 + r, 0, [100 * (r + 1), -r])
+    wb.close()
+
+    with zipfile.ZipFile(path) as z:  # the test is about shared strings
+        assert b't="s"' in z.read("xl/worksheets/sheet1.xml")
+    return str(path)
+
+
+def _summary_xml(path):
+    with zipfile.ZipFile(path) as z:
+        wb = load_workbook(path)
+        index = wb.sheetnames.index("Summary") + 1
+        return z.read(f"xl/worksheets/sheet{index}.xml")
+
+
+def test_summary_copied_with_formats(styled_source, tmp_path):
+    out = tmp_path / "split"
+    out.mkdir()
+    split = split_excel_file(styled_source, str(out), raw_summary=True)
+
+    xml = _summary_xml(split)
+    assert b't="s"' not in xml
+    assert b't="inlineStr"' in xml
+
+    src = load_workbook(styled_source)["Summary"]
+    got = load_workbook(split)["Summary"]
+    assert [[c.value for c in row] for row in got.iter_rows()] == \
+        [[c.value for c in row] for row in src.iter_rows()]
+    assert {str(r) for r in got.merged_cells.ranges} == {"A1:C1"}
+    assert got.column_dimensions["A"].width == src.column_dimensions["A"].width > 25
+
+    assert got["A1"].font.bold and got["A1"].font.size == 14
+    assert got["A1"].font.color.rgb == "FF0000FF"
+    assert got["A1"].alignment.horizontal == "center"
+    for r in range(3, 6):
+        assert got.cell(r, 2).number_format == "0.000"
+        assert got.cell(r, 3).number_format == "0.00%"
+        assert got.cell(r, 1).fill.fgColor.rgb == "FFFFFF00"
+        assert got.cell(r, 1).border.bottom.style == "thin"
+
+
+def test_split_sheets_keep_their_styles(styled_source, tmp_path):
+    # the output's own formats (written before the copy) must not shift
+    out = tmp_path / "split"
+    out.mkdir()
+    raw = split_excel_file(styled_source, str(out), raw_summary=True)
+    wb = load_workbook(raw)
+    data = [sh for sh in wb.sheetnames if sh != "Summary"]
+    assert data
+    for sh in data:
+        for row in wb[sh].iter_rows():
+            for c in row:
+                assert not c.font.bold
+                assert c.number_format == "General"
+
+
+def test_rich_text_survives(tmp_path):
+    src = tmp_path / "rich.xlsx"
+    book = xlsxwriter.Workbook(str(src))
+    ws = book.add_worksheet("Summary")
+    bold = book.add_format({"bold": True})
+    ws.write_rich_string(0, 0, "plain ", bold, "bold", " tail")
+    ws.write(1, 0, "a & b <c>")
+    book.close()
+
+    out = tmp_path / "out.xlsx"
+    placeholder = xlsxwriter.Workbook(str(out))
+    placeholder.add_worksheet("Summary")
+    placeholder.close()
+    copy_raw_sheets(str(out), {"Summary": RawSheet(str(src), "Summary")})
+
+    xml = _summary_xml(str(out))
+    assert re.search(rb"<is><r>.*?<b/>.*?bold</t></r>", xml)
+    ws = load_workbook(out)["Summary"]
+    assert ws["A1"].value == "plain bold tail"
+    assert ws["A2"].value == "a & b <c>"
@@ -0,0 +1,35 @@
+import glob
+import os
+
+from a1_overlay.profiling import Instrument
+from a1_overlay.plans import PLAN_DIR
+from a1_overlay.split import split_excel_file
+from a1_overlay.zipindex import SheetIndex
+from a1_overlay.reader import read_sheet_frame
+
+
+def _frames(path):
+    with SheetIndex(path) as wb:
+        return {sh: read_sheet_frame(wb, sh) for sh in wb.sheetnames}
+
+
+def test_same_layout_reuses_one_plan(raw_files, tmp_path):
+    # same sheets and label rows; titles and Summary values differ per run
+    out = tmp_path / "split"
+    out.mkdir()
+    inst = Instrument()
+    outputs = [split_excel_file(f, str(out), plans=True, instrument=inst) for f in raw_files]
+
+    counts = inst.counters
+    assert counts.get("plan_misses") == 1
+    assert counts.get("plan_hits") == len(raw_files) - 1
+    assert len(glob.glob(os.path.join(out, PLAN_DIR, "*.json"))) == 1
+
+    plain = tmp_path / "plain"
+    plain.mkdir()
+    for f, replayed in zip(raw_files, outputs):
+        expected = _frames(split_excel_file(f, str(plain)))
+        got = _frames(replayed)
+        assert list(got) == list(expected)
+        for sh in expected:
+            assert got[sh].equals(expected[sh]), sh
@@ -0,0 +1,54 @@
+import os
+import pickle
+
+import pytest
+
+from a1_overlay.prefetch import load_parsed, parsed_path, prefetch_file, private_dir
+from a1_overlay.profiling import Instrument
+from a1_overlay.split import split_excel_file
+
+posix = pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+
+
+def test_split_reads_cache_only_when_given(raw_files, tmp_path):
+    cache = str(tmp_path / "parsed")
+    prefetch_file(raw_files[0], cache)
+    assert load_parsed(raw_files[0], cache) is not None
+
+    for parsed_dir, hits in ((None, 0), (cache, 1)):
+        out = tmp_path / f"out{hits}"
+        out.mkdir()
+        inst = Instrument()
+        split_excel_file(raw_files[0], str(out), parsed_dir=parsed_dir, instrument=inst)
+        assert inst.counters.get("prefetch_hits", 0) == hits
+
+
+@posix
+def test_cache_folder_is_private(raw_files, tmp_path):
+    cache = str(tmp_path / "parsed")
+    prefetch_file(raw_files[0], cache)
+    assert os.stat(cache).st_mode & 0o777 == 0o700
+
+
+@posix
+def test_shared_folder_is_not_loaded(raw_files, tmp_path):
+    cache = tmp_path / "shared"
+    cache.mkdir()
+    os.chmod(cache, 0o777)
+    entry = parsed_path(raw_files[0], str(cache))
+    with open(entry, "wb") as fp:  # anyone could have planted this
+        pickle.dump((1, []), fp)
+
+    assert not private_dir(str(cache))
+    assert load_parsed(raw_files[0], str(cache)) is None
+    with pytest.raises(PermissionError):
+        prefetch_file(raw_files[1], str(cache))
+
+
+@posix
+@pytest.mark.skipif(getattr(os, "geteuid", lambda: -1)() != 0, reason="needs root")
+def test_foreign_entry_is_not_loaded(raw_files, tmp_path):
+    cache = str(tmp_path / "parsed")
+    entry = prefetch_file(raw_files[0], cache)
+    os.chown(entry, 12345, 12345)
+    assert load_parsed(raw_files[0], cache) is None
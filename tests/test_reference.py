@@ -0,0 +1,72 @@
+"""The package's split and merges give what the original A1 - V3.py gave."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from a1_overlay.fused import split_and_merge
+from a1_overlay.merge import batch_merge_split_files
+from a1_overlay.split import split_excel_file
+
+from . import reference_v3
+
+
+def _assert_same_workbook(got, expected):
+    got = pd.read_excel(got, sheet_name=None, header=None)
+    expected = pd.read_excel(expected, sheet_name=None, header=None)
+    assert list(got) == list(expected)
+    for sh in expected:
+        pd.testing.assert_frame_equal(got[sh], expected[sh], obj=sh)
+
+
+@pytest.fixture
+def reference(raw_files, tmp_path):
+    """(_SPLIT.xlsx files, ALL_MERGED.xlsx) of the original script."""
+    out = tmp_path / "reference"
+    out.mkdir()
+    split = [reference_v3.split_excel_file(f, str(out)) for f in raw_files]
+    ok, merged = reference_v3.batch_merge_split_files(split, str(out), batch_size=2)
+    assert ok
+    return split, merged
+
+
+@pytest.mark.parametrize("plans", [False, True])
+def test_split_matches_reference(raw_files, reference, tmp_path, plans):
+    out = tmp_path / "split"
+    out.mkdir()
+    for f, expected in zip(raw_files, reference[0]):
+        got = split_excel_file(f, str(out), plans=plans)
+        assert os.path.basename(got) == os.path.basename(expected)
+        _assert_same_workbook(got, expected)
+
+
+@pytest.mark.parametrize("options", [{}, {"workers": 2}, {"memory_budget": 1}])
+def test_merge_matches_reference(raw_files, reference, tmp_path, options):
+    out = tmp_path / "merge"
+    out.mkdir()
+    split = [split_excel_file(f, str(out)) for f in raw_files]
+    ok, merged = batch_merge_split_files(split, str(out), batch_size=2, **options)
+    assert ok
+    _assert_same_workbook(merged, reference[1])
+
+
+def test_parallel_final_merge_matches_serial(reference, tmp_path):
+    merged = {}
+    for workers in (1, 2):
+        out = tmp_path / f"workers{workers}"
+        out.mkdir()
+        ok, merged[workers] = batch_merge_split_files(reference[0], str(out), batch_size=1,
+                                                      workers=workers)
+        assert ok
+    _assert_same_workbook(merged[2], merged[1])
+    _assert_same_workbook(merged[1], reference[1])
+
+
+@pytest.mark.parametrize("options", [{}, {"spill_limit": 1}])
+def test_split_and_merge_matches_reference(raw_files, reference, tmp_path, options):
+    out = tmp_path / "fused"
+    out.mkdir()
+    ok, merged = split_and_merge(raw_files, str(out), workers=1, **options)
+    assert ok
+    _assert_same_workbook(merged, reference[1])
@@ -0,0 +1,114 @@
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+import xlsxwriter
+
+from a1_overlay.charts import add_charts_to_merged_excel
+from a1_overlay.merge import merge_final_batches
+from a1_overlay.reader import read_sheet_frame
+from a1_overlay.shard import INDEX_SHEET, plan_shards, shard_path
+from a1_overlay.writer import MAX_COLS
+from a1_overlay.zipindex import SheetIndex
+
+SOURCES_PER_BATCH = MAX_COLS // 4 + 1  # two batches of X/Y pairs: just past the limit
+
+
+def test_plan_cuts_between_sources():
+    spans = [("a", 0, 4), ("b", 4, 8), ("c", 8, 10)]
+    assert plan_shards(spans, 8) == [(0, 8), (8, 10)]
+    assert plan_shards(spans, 6) == [(0, 4), (4, 10)]
+    # a source wider than a shard is cut at even offsets (X/Y pairs stay together)
+    assert plan_shards([("a", 0, 10)], 5) == [(0, 4), (4, 8), (8, 10)]
+
+
+def _read(path):
+    with SheetIndex(path) as wb:
+        return {sh: read_sheet_frame(wb, sh) for sh in wb.sheetnames}
+
+
+def _batch(path, first, rows=3):
+    """MERGE_BATCH-like workbook: one sheet, file-name row over X/Y pairs, rows of data."""
+    wb = xlsxwriter.Workbook(path, {"constant_memory": True})
+    ws = wb.add_worksheet("TX_Ch1(5180)")
+    names = [f"RUN_{first + i:05d}" for i in range(SOURCES_PER_BATCH) for _ in range(2)]
+    ws.write_row(0, 0, names)
+    ws.write_row(1, 0, ["Freq", "Level"] * SOURCES_PER_BATCH)
+    for r in range(rows):
+        ws.write_row(2 + r, 0, [v for i in range(SOURCES_PER_BATCH)
+                                for v in (100.0 * (r + 1), first + i + r / 10)])
+    wb.close()
+    return path
+
+
+@pytest.fixture
+def wide_batches(tmp_path):
+    return [_batch(str(tmp_path / f"MERGE_BATCH_{b + 1}.xlsx"), b * SOURCES_PER_BATCH)
+            for b in range(2)]
+
+
+@pytest.mark.parametrize("mode", ["sheet", "file"])
+def test_wide_sheet_is_sharded(wide_batches, tmp_path, mode):
+    out = tmp_path / "out"
+    out.mkdir()
+    ok, merged = merge_final_batches(wide_batches, str(out), charts=False, shard_mode=mode)
+    assert ok
+
+    expected = pd.concat([_read(f)["TX_Ch1(5180)"] for f in wide_batches],
+                         axis=1, ignore_index=True)
+    assert expected.shape[1] > MAX_COLS
+
+    if mode == "sheet":
+        book = _read(merged)
+        assert list(book) == ["TX_Ch1(5180)", "TX_Ch1(5180)_part2", INDEX_SHEET]
+        parts = [book["TX_Ch1(5180)"], book["TX_Ch1(5180)_part2"]]
+        books = [os.path.basename(merged)] * 2
+    else:
+        second = shard_path(merged, 2)
+        book, other = _read(merged), _read(second)
+        assert list(book) == ["TX_Ch1(5180)", INDEX_SHEET]
+        assert list(other) == ["TX_Ch1(5180)"]
+        parts = [book["TX_Ch1(5180)"], other["TX_Ch1(5180)"]]
+        books = [os.path.basename(merged), os.path.basename(second)]
+
+    assert all(p.shape[1] <= MAX_COLS for p in parts)
+    joined = pd.concat(parts, axis=1, ignore_index=True)
+    pd.testing.assert_frame_equal(joined, expected)
+
+    # no source is cut: the first shard ends on a source boundary
+    first = parts[0].iloc[0]
+    assert first.iloc[-1] != parts[1].iat[0, 0]
+
+    index = book[INDEX_SHEET]
+    assert index.iloc[0].tolist() == ["Source", "Sheet", "Workbook", "Shard sheet", "Shard",
+                                      "First column", "Last column"]
+    rows = index.iloc[1:]
+    assert len(rows) == 2 * SOURCES_PER_BATCH  # every source once
+    assert set(rows[2]) == set(books)
+    assert rows[0].tolist() == list(np.unique(expected.iloc[0].to_numpy()))
+    last = rows.iloc[-1].tolist()
+    assert last[4] == 2
+    assert last[6] == xlsxwriter.utility.xl_col_to_name(parts[1].shape[1] - 1)
+
+
+def test_redraw_charts_every_file_shard(tmp_path):
+    batches = [_batch(str(tmp_path / f"MERGE_BATCH_{b + 1}.xlsx"), b * SOURCES_PER_BATCH,
+                      rows=5) for b in range(2)]  # data down to the first charted row
+    out = tmp_path / "out"
+    out.mkdir()
+    ok, merged = merge_final_batches(batches, str(out), charts=False, shard_mode="file")
+    assert ok
+    books = [merged, shard_path(merged, 2)]
+    before = [_read(b) for b in books]
+
+    assert add_charts_to_merged_excel(merged)
+
+    for path, frames in zip(books, before):
+        after = _read(path)
+        assert list(after) == list(frames)
+        for sh in frames:
+            pd.testing.assert_frame_equal(after[sh], frames[sh], obj=sh)
+        with zipfile.ZipFile(path) as z:
+            assert any(n.startswith("xl/charts/") for n in z.namelist()), path
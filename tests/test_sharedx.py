@@ -0,0 +1,33 @@
+import os
+
+from a1_overlay.charts import is_chart_data_sheet
+from a1_overlay.merge import batch_merge_split_files
+from a1_overlay.reader import read_sheet_frame
+from a1_overlay.sharedx import SHARED_X, has_xy_pairs
+from a1_overlay.split import split_excel_file
+from a1_overlay.zipindex import SheetIndex
+
+
+def test_identical_x_is_stored_once(raw_files, tmp_path):
+    # every run sweeps the same frequencies; run titles differ (first pair)
+    out = tmp_path / "out"
+    out.mkdir()
+    split = [split_excel_file(f, str(out)) for f in raw_files]
+    ok, merged = batch_merge_split_files(split, str(out), batch_size=2, charts=False,
+                                         shared_x=True)
+    assert ok
+
+    n = len(raw_files)
+    names = [os.path.basename(f)[:-len(".xlsx")] for f in raw_files]
+    with SheetIndex(merged) as wb, SheetIndex(split[0]) as first_run:
+        sheets = [sh for sh in wb.sheetnames if has_xy_pairs(sh)
+                  and not is_chart_data_sheet(sh)]
+        assert sheets
+        for sh in sheets:
+            df = read_sheet_frame(wb, sh)
+            assert df.shape[1] == 1 + n, sh
+            assert df.iat[0, 0] == SHARED_X
+            assert df.iloc[0, 1:].tolist() == names
+            # the shared X column keeps the first run's header (its title)
+            first = read_sheet_frame(first_run, sh)
+            assert df.iloc[1:5, 0].tolist() == first.iloc[:4, 0].tolist()
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from a1_overlay import merge
+from a1_overlay.merge import batch_merge_split_files, merge_final_batches
+from a1_overlay.reader import read_sheet_frame
+from a1_overlay.spill import SpillStore
+from a1_overlay.split import split_excel_file
+from a1_overlay.zipindex import SheetIndex
+
+
+def _frames(path):
+    with SheetIndex(path) as wb:
+        return {sh: read_sheet_frame(wb, sh) for sh in wb.sheetnames}
+
+
+class _Watched(SpillStore):
+    """SpillStore that records the largest block it was handed in RAM."""
+
+    peak = 0
+
+    def append(self, block):
+        if not isinstance(block.body, np.memmap):
+            _Watched.peak = max(_Watched.peak, block.body.nbytes)
+        super().append(block)
+
+    def sheet(self, alloc=None):
+        merged = super().sheet(alloc)
+        if self.spilled:
+            assert isinstance(merged.body, np.memmap)
+        return merged
+
+
+@pytest.fixture
+def batches(raw_files, tmp_path):
+    out = tmp_path / "batches"
+    out.mkdir()
+    split = [split_excel_file(f, str(out)) for f in raw_files]
+    ok, files = batch_merge_split_files(split, str(out), batch_size=1, final_merge=False)
+    assert ok and len(files) == len(raw_files)
+    return files
+
+
+def test_parallel_spilled_merge_holds_no_run_in_memory(batches, tmp_path, monkeypatch):
+    plain = tmp_path / "plain"
+    plain.mkdir()
+    _, expected = merge_final_batches(batches, str(plain), charts=False)
+
+    monkeypatch.setattr(merge, "SpillStore", _Watched)
+    _Watched.peak = 0
+    out = tmp_path / "spilled"
+    out.mkdir()
+    ok, merged = merge_final_batches(batches, str(out), charts=False, workers=2,
+                                     spill_limit=1, spill_dir=str(tmp_path))
+    assert ok
+    # the runs arrive as segment files, never as arrays in this process, and
+    # the merged sheet is built on disk
+    assert _Watched.peak == 0
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith(".spill_")] == []
+
+    got, want = _frames(merged), _frames(expected)
+    assert list(got) == list(want)
+    for sh in want:
+        assert got[sh].equals(want[sh]), sh
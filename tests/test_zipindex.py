@@ -0,0 +1,47 @@
+import pytest
+from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+
+from a1_overlay import zipindex
+from a1_overlay.reader import open_workbook, read_sheet_frame
+from a1_overlay.split import split_excel_file
+from a1_overlay.zipindex import SheetIndex
+
+
+class _Moved(ReadOnlyWorksheet):
+    """A ReadOnlyWorksheet that wants a parent attribute SheetIndex lacks."""
+
+    def _cells_by_row(self, *args, **kwargs):
+        return self.parent._renamed_internal
+
+
+def _frames(wb):
+    return {sh: read_sheet_frame(wb, sh) for sh in wb.sheetnames}
+
+
+@pytest.mark.parametrize("worksheet", [_Moved, None])  # None: the import failed
+def test_falls_back_to_load_workbook(raw_files, tmp_path, monkeypatch, worksheet):
+    split = split_excel_file(raw_files[0], str(tmp_path))
+    wb = open_workbook(split)
+    try:
+        expected = _frames(wb)
+    finally:
+        wb.close()
+
+    monkeypatch.setattr(zipindex, "ReadOnlyWorksheet", worksheet)
+    monkeypatch.setattr(SheetIndex, "_internals", None)
+    with SheetIndex(split) as idx:
+        got = _frames(idx)
+        assert idx._workbook is not None
+    assert SheetIndex._internals is False
+    assert list(got) == list(expected)
+    for sh in expected:
+        assert got[sh].equals(expected[sh]), sh
+
+
+def test_uses_its_own_worksheets(raw_files, tmp_path, monkeypatch):
+    split = split_excel_file(raw_files[0], str(tmp_path))
+    monkeypatch.setattr(SheetIndex, "_internals", None)
+    with SheetIndex(split) as idx:
+        _frames(idx)
+        assert idx._workbook is None
+    assert SheetIndex._internals is True